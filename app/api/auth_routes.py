@@ -1,10 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 from datetime import timedelta
-from app.database import get_db
+from app.database import get_db, run_db
 from app.models.user import User
-from app.auth.jwt import JWTHandler, PasswordHandler
-from app.auth.dependencies import get_current_user
+from app.auth.jwt import JWTHandler
+from app.auth.dependencies import get_current_user, get_read_user
+from app.auth.admission import (
+    admit_login,
+    admit_password_change,
+    admit_register,
+    client_ip,
+    record_password_failure,
+    record_password_success,
+)
+from app.auth.password_pool import HashingBusy, password_pool
 from app.core.config import get_settings
 from app.schemas.user import (
     UserCreate,
@@ -18,9 +27,29 @@ router = APIRouter(prefix="/api/auth", tags=["auth"])
 settings = get_settings()
 
 
-@router.post("/register", response_model=UserResponse)
-def register(user: UserCreate, db: Session = Depends(get_db)):
-    """Register a new user."""
+def _busy_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Server is busy, please try again shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
+async def _hash_password(password: str) -> str:
+    try:
+        return await password_pool.hash(password)
+    except HashingBusy:
+        raise _busy_exception()
+
+
+async def _verify_password(password: str, hashed_password: str) -> tuple[bool, str | None]:
+    try:
+        return await password_pool.verify(password, hashed_password)
+    except HashingBusy:
+        raise _busy_exception()
+
+
+def _check_available(db: Session, user: UserCreate) -> None:
     # Check if email already exists
     existing_email = db.query(User).filter(User.email == user.email).first()
     if existing_email:
@@ -36,9 +65,27 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already taken"
         )
+
+
+def _save_user(db: Session, user: User) -> User:
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+# The password routes are async so that waiting on the hashing pool does not
+# hold a request thread; their (short) database work goes through run_db.
+
+
+@router.post("/register", response_model=UserResponse)
+async def register(user: UserCreate, request: Request, db: Session = Depends(get_db)):
+    """Register a new user."""
+    admit_register(client_ip(request))
+    await run_db(_check_available, db, user)
     
     # Hash password
-    hashed_password = PasswordHandler.hash_password(user.password)
+    hashed_password = await _hash_password(user.password)
     
     # Create new user (active by default, no email verification)
     new_user = User(
@@ -49,24 +96,35 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
         is_active=True
     )
     
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-    
-    return new_user
+    return await run_db(_save_user, db, new_user)
+
+
+def _user_by_email(db: Session, email: str) -> User | None:
+    return db.query(User).filter(User.email == email).first()
 
 
 @router.post("/login", response_model=Token)
-def login(credentials: UserLogin, db: Session = Depends(get_db)):
-    """Login with email and password."""
+async def login(credentials: UserLogin, request: Request, db: Session = Depends(get_db)):
+    """Login with email and password.
+
+    Busy IPs and accounts with repeated failures are refused before any
+    bcrypt work; a hash made with an outdated cost is replaced on success.
+    """
+    admit_login(client_ip(request), credentials.email)
+
     # Find user by email
-    user = db.query(User).filter(User.email == credentials.email).first()
-    
-    if not user or not PasswordHandler.verify_password(credentials.password, user.hashed_password):
+    user = await run_db(_user_by_email, db, credentials.email)
+
+    valid, new_hash = False, None
+    if user:
+        valid, new_hash = await _verify_password(credentials.password, user.hashed_password)
+    if not valid:
+        record_password_failure(credentials.email)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
         )
+    record_password_success(credentials.email)
     
     # Check if user is active
     if not user.is_active:
@@ -74,17 +132,25 @@ def login(credentials: UserLogin, db: Session = Depends(get_db)):
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User account is inactive"
         )
+
+    if new_hash:
+        user.hashed_password = new_hash
+        await run_db(_save_user, db, user)
     
-    # Create tokens
+    return _issue_tokens(user)
+
+
+def _issue_tokens(user: User) -> Token:
+    """Create an access/refresh token pair carrying the user's current claims."""
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = JWTHandler.create_token(
-        data={"sub": str(user.id)},
+        data=JWTHandler.user_claims(user),
         expires_delta=access_token_expires,
         token_type="access"
     )
     
     refresh_token = JWTHandler.create_token(
-        data={"sub": str(user.id)},
+        data=JWTHandler.user_claims(user),
         expires_delta=timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
         token_type="refresh"
     )
@@ -98,8 +164,15 @@ def login(credentials: UserLogin, db: Session = Depends(get_db)):
 
 
 @router.post("/logout")
-def logout():
-    """Logout endpoint (stateless, no DB change)."""
+def logout(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Log out everywhere by revoking every token issued to the user so far."""
+    # Bumped in SQL so concurrent logouts and password changes never collide
+    current_user.token_version = User.token_version + 1
+    db.add(current_user)
+    db.commit()
     return {"message": "Successfully logged out"}
 
 
@@ -110,7 +183,7 @@ def refresh_token(
     """Get a new access token using an existing token."""
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = JWTHandler.create_token(
-        data={"sub": str(current_user.id)},
+        data=JWTHandler.user_claims(current_user),
         expires_delta=access_token_expires,
         token_type="access"
     )
@@ -122,29 +195,43 @@ def refresh_token(
     )
 
 
+def _stored_hash(user: User) -> str:
+    # Cached principals do not carry the hash, so this may load it
+    return user.hashed_password
+
+
 @router.post("/change-password")
-def change_password(
+async def change_password(
     password_change: PasswordChange,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Change the current user's password."""
+    """Change the current user's password.
+
+    Existing tokens are revoked, so the response carries a fresh pair.
+    """
+    admit_password_change(current_user.email)
+
     # Verify current password
-    if not PasswordHandler.verify_password(password_change.current_password, current_user.hashed_password):
+    stored_hash = await run_db(_stored_hash, current_user)
+    valid, _ = await _verify_password(password_change.current_password, stored_hash)
+    if not valid:
+        record_password_failure(current_user.email)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid current password"
         )
     
     # Update password
-    current_user.hashed_password = PasswordHandler.hash_password(password_change.new_password)
-    db.add(current_user)
-    db.commit()
-    
-    return {"message": "Password changed successfully"}
+    current_user.hashed_password = await _hash_password(password_change.new_password)
+    current_user.token_version = User.token_version + 1
+    await run_db(_save_user, db, current_user)
+
+    tokens = _issue_tokens(current_user)
+    return {"message": "Password changed successfully", **tokens.model_dump()}
 
 
 @router.get("/me", response_model=UserResponse)
-def get_me(current_user: User = Depends(get_current_user)):
+def get_me(current_user: User = Depends(get_read_user)):
     """Get current user profile."""
     return current_user
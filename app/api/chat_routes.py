@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from pathlib import Path
 import logging
 
-from app.database import get_db
+from app.database import get_db, run_db
 from app.models.user import User
+from app.models.resume import Resume
 from app.auth.dependencies import get_current_user
 from app.core.config import get_settings
 from openai import OpenAI
@@ -24,6 +26,15 @@ def _get_client() -> OpenAI | None:
     return OpenAI(api_key=api_key)
 
 
+def _latest_resume(db: Session, user_id: int) -> Resume | None:
+    return (
+        db.query(Resume)
+        .filter(Resume.user_id == user_id)
+        .order_by(Resume.created_at.desc())
+        .first()
+    )
+
+
 @router.post("/resume")
 async def chat_about_resume(
     payload: dict,
@@ -47,14 +58,7 @@ async def chat_about_resume(
         )
 
     # Get latest resume summary/analysis for context
-    from app.models.resume import Resume
-
-    latest_resume = (
-        db.query(Resume)
-        .filter(Resume.user_id == current_user.id)
-        .order_by(Resume.created_at.desc())
-        .first()
-    )
+    latest_resume = await run_db(_latest_resume, db, current_user.id)
 
     resume_context = ""
     if latest_resume:
@@ -69,7 +73,8 @@ async def chat_about_resume(
     try:
         logger.info("CareerLens chat request from user %s: %s", current_user.id, message)
 
-        resp = client.chat.completions.create(
+        resp = await run_in_threadpool(
+            client.chat.completions.create,
             model="gpt-4o",
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -1,12 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 import json
 
-from app.database import get_db
+from app.database import get_db, run_db
 from app.models.user import User
 from app.models.interview import InterviewPrep
 from app.models.resume import Resume
-from app.auth.dependencies import get_current_user
+from app.auth.dependencies import get_current_user, get_read_db, get_read_user
 from app.core.config import get_settings
 from openai import OpenAI
 
@@ -111,13 +112,13 @@ def generate_interview_prep(
 
 @router.get("/list")
 def list_interview_preps(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_read_user),
+    db: Session = Depends(get_read_db)
 ):
     """Get all interview prep questions for current user."""
     preps = db.query(InterviewPrep).filter(
         InterviewPrep.user_id == current_user.id
-    ).all()
+    ).order_by(InterviewPrep.created_at, InterviewPrep.id).all()
     
     return [
         {
@@ -260,6 +261,12 @@ def analyze_interview_answer(
     return feedback
 
 
+def _get_user_prep(db: Session, prep_id: int, user_id: int) -> InterviewPrep | None:
+    return db.query(InterviewPrep).filter(
+        (InterviewPrep.id == prep_id) & (InterviewPrep.user_id == user_id)
+    ).first()
+
+
 @router.post("/{prep_id}/whisper-transcribe")
 async def whisper_transcribe_answer(
     prep_id: int,
@@ -273,9 +280,7 @@ async def whisper_transcribe_answer(
     We transcribe it, optionally save it as the answer, and return the transcript.
     """
 
-    prep = db.query(InterviewPrep).filter(
-        (InterviewPrep.id == prep_id) & (InterviewPrep.user_id == current_user.id)
-    ).first()
+    prep = await run_db(_get_user_prep, db, prep_id, current_user.id)
 
     if not prep:
         raise HTTPException(
@@ -299,7 +304,8 @@ async def whisper_transcribe_answer(
         audio_file.name = audio.filename or "answer.webm"
 
         # Use Whisper for transcription
-        transcript_resp = client.audio.transcriptions.create(
+        transcript_resp = await run_in_threadpool(
+            client.audio.transcriptions.create,
             model="gpt-4o-mini-transcribe",
             file=audio_file,
         )
@@ -319,7 +325,7 @@ async def whisper_transcribe_answer(
 
     # Save transcript as the answer for this prep
     prep.answer = transcript_text
-    db.commit()
+    await run_db(db.commit)
 
     return {"transcript": transcript_text}
 
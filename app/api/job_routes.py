@@ -1,175 +1,364 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app.models.user import User
+from datetime import datetime, timedelta
+import base64
+import json
+
+from app.database import get_db, run_db
 from app.models.job_match import JobMatch
 from app.models.resume import Resume
-from app.auth.dependencies import get_current_user
-from app.services.job_search import search_jobs_with_jsearch
+from app.auth.dependencies import Principal, get_current_principal, get_read_db, get_read_principal
+from app.services.geo import get_gazetteer, within_radius
+from app.services.job_providers import get_providers
+from app.services.job_search import iter_job_batches, search_jobs_for_titles
+from app.services.job_corpus import load_corpus_stats
+from app.services.job_scoring import attach_scores, build_resume_profile
+from app.services.job_store import upsert_job_matches
+from app.services.job_text_search import search_job_matches
+from app.services.saved_searches import infer_best_fit_titles, list_saved_searches
+from app.services.skill_gap import forget_match_skills, skill_gap_report
 
 router = APIRouter(prefix="/api/jobs", tags=["jobs"])
 
+def _ndjson(event: dict) -> str:
+    return json.dumps(jsonable_encoder(event)) + "\n"
+
+
+def _latest_resume(db: Session, user_id: int) -> Resume | None:
+    return (
+        db.query(Resume)
+        .filter(Resume.user_id == user_id)
+        .order_by(Resume.created_at.desc())
+        .first()
+    )
+
+
+def _score_and_store(db: Session, user_id: int, profile_text: str, jobs: list) -> list:
+    attach_scores(profile_text, jobs, load_corpus_stats(db, [profile_text]))
+    matches = upsert_job_matches(db, user_id, jobs)
+    db.commit()
+    return matches
+
 
 @router.get("/search")
 async def search_jobs(
     num_pages: int = Query(10, ge=1, le=20, description="How many JSearch pages to fetch"),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db),
 ):
     """Search for jobs using RapidAPI JSearch and store matches.
 
     This version automatically builds the query from the user's latest
     resume summary/advice instead of manual filters, and prefers the
-    explicit "Best-Fit Roles" section when available.
+    explicit "Best-Fit Roles" section when available. All titles and
+    their pages are fetched concurrently, and every job is scored against
+    the resume before it is stored.
     """
 
     # Look at latest resume to infer a suitable title/keywords
-    latest_resume = (
-        db.query(Resume)
-        .filter(Resume.user_id == current_user.id)
-        .order_by(Resume.created_at.desc())
-        .first()
-    )
+    latest_resume = await run_db(_latest_resume, db, current_user.id)
 
-    best_fit_titles: list[str] = []
+    best_fit_titles = infer_best_fit_titles(latest_resume)
     inferred_industry = None
 
-    # Prefer using the AI-generated "Best-Fit Roles" section when present.
-    if latest_resume and latest_resume.content:
-        text = latest_resume.content
-        lower = text.lower()
-
-        marker = "### Best-Fit Roles"
-        idx = text.find(marker)
-        if idx != -1:
-            roles_block = text[idx + len(marker) :]
-            # Stop at the next markdown heading if present
-            for stop in ["### ", "\n## "]:
-                stop_idx = roles_block.find(stop)
-                if stop_idx != -1:
-                    roles_block = roles_block[:stop_idx]
-                    break
-
-            lines = roles_block.splitlines()
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-                # Strip leading list markers like "1.", "-", "*"
-                if line[0].isdigit():
-                    dot_idx = line.find(".")
-                    if dot_idx != -1 and dot_idx + 1 < len(line):
-                        line = line[dot_idx + 1 :].strip()
-                elif line[0] in {"-", "*"}:
-                    line = line[1:].strip()
-
-                # Keep only the role title before any dash/description
-                dash_idx = line.find(" - ")
-                if dash_idx != -1:
-                    line = line[:dash_idx].strip()
-
-                if line and line not in best_fit_titles:
-                    best_fit_titles.append(line)
-
-        # Fallback heuristic if we couldn't parse any explicit roles
-        if not best_fit_titles:
-            if "data scientist" in lower:
-                best_fit_titles.append("Data Scientist")
-            elif "machine learning" in lower or "ml engineer" in lower:
-                best_fit_titles.append("Machine Learning Engineer")
-            elif "backend" in lower or "back-end" in lower:
-                best_fit_titles.append("Backend Engineer")
-            elif "frontend" in lower or "front-end" in lower or "ui engineer" in lower:
-                best_fit_titles.append("Frontend Engineer")
-            elif "full stack" in lower:
-                best_fit_titles.append("Full Stack Engineer")
-            elif "product manager" in lower or "product management" in lower:
-                best_fit_titles.append("Product Manager")
-
-    # Always have at least one generic title so the search still works
-    if not best_fit_titles:
-        best_fit_titles.append("Software Engineer")
-
-    all_jobs: list[dict] = []
-    seen_ids: set[str] = set()
-
-    for title in best_fit_titles:
-        jobs = await search_jobs_with_jsearch(
-            title=title,
-            company=None,
-            industry=inferred_industry,
-            location=None,
-            num_pages=max(1, num_pages // len(best_fit_titles)) if num_pages > 1 else 1,
-        )
-        for job in jobs or []:
-            job_id = str(job.get("id") or "")
-            if job_id and job_id in seen_ids:
-                continue
-            if job_id:
-                seen_ids.add(job_id)
-            all_jobs.append(job)
+    all_jobs = await search_jobs_for_titles(
+        best_fit_titles,
+        num_pages=num_pages,
+        industry=inferred_industry,
+    )
 
     if not all_jobs:
         return {"total_matches": 0, "matches": []}
 
-    created_matches: list[dict] = []
-    for job in all_jobs:
-        match = JobMatch(
-            user_id=current_user.id,
-            title=job.get("title") or "Untitled role",
-            company=job.get("company") or "Unknown company",
-            location=job.get("location") or "",
-            url=job.get("url"),
-            score=None,
-        )
-        db.add(match)
-        db.flush()
-        created_matches.append(
-            {
-                "id": match.id,
-                "title": match.title,
-                "company": match.company,
-                "location": match.location,
-                "url": match.url,
-            }
+    created_matches = await run_db(
+        _score_and_store, db, current_user.id, build_resume_profile(latest_resume), all_jobs
+    )
+
+    return {"total_matches": len(created_matches), "matches": created_matches}
+
+
+@router.get("/search/stream")
+async def search_jobs_stream(
+    request: Request,
+    num_pages: int = Query(10, ge=1, le=20, description="How many JSearch pages to fetch"),
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db),
+):
+    """Streaming variant of /search that sends matches as they are stored.
+
+    The response is newline-delimited JSON: one ``{"type": "batch"}`` event
+    per fetched page of new jobs, followed by a ``{"type": "summary"}``
+    event. If the client goes away, the remaining page fetches are cancelled.
+    """
+
+    latest_resume = await run_db(_latest_resume, db, current_user.id)
+    best_fit_titles = infer_best_fit_titles(latest_resume)
+    profile_text = build_resume_profile(latest_resume)
+    user_id = current_user.id
+
+    async def event_stream():
+        total = 0
+        batches = iter_job_batches(best_fit_titles, num_pages=num_pages)
+        try:
+            async for jobs in batches:
+                if await request.is_disconnected():
+                    break
+                matches = await run_db(_score_and_store, db, user_id, profile_text, jobs)
+                total += len(matches)
+                yield _ndjson({"type": "batch", "matches": matches})
+            else:
+                yield _ndjson({"type": "summary", "total_matches": total})
+        finally:
+            await batches.aclose()
+
+    return StreamingResponse(event_stream(), media_type="application/x-ndjson")
+
+
+def _encode_cursor(score: float, match_id: int) -> str:
+    raw = json.dumps([score, match_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[float, int]:
+    try:
+        score, match_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(score), int(match_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
         )
 
-    db.commit()
 
-    return {"total_matches": len(created_matches), "matches": created_matches}
+def _match_filters(
+    employment_type: str | None = Query(None, description="e.g. full-time, part-time, contract, internship"),
+    remote: bool | None = Query(None, description="Only remote (true) or on-site (false) roles"),
+    state: str | None = Query(None),
+    country: str | None = Query(None),
+    min_salary: float | None = Query(None, ge=0, description="Lowest acceptable salary_max"),
+    posted_within_days: int | None = Query(None, ge=1, le=365),
+    near: str | None = Query(None, description='A US city and/or state, e.g. "Austin, TX"'),
+    radius_miles: float = Query(25, gt=0, le=500, description="Radius around `near`"),
+) -> dict:
+    """Collect the structured job filters shared by the listing and facet routes."""
+    center = None
+    if near:
+        center = get_gazetteer().resolve_place(near)
+        if center is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Unknown location"
+            )
+    return {
+        "employment_type": employment_type,
+        "remote": remote,
+        "state": state,
+        "country": country,
+        "min_salary": min_salary,
+        "posted_within_days": posted_within_days,
+        "near": center,
+        "radius_miles": radius_miles,
+    }
+
+
+def _apply_match_filters(query, filters: dict, skip: str | None = None):
+    """Add a WHERE clause for every filter that is set (except ``skip``)."""
+    if filters["employment_type"] and skip != "employment_type":
+        query = query.filter(JobMatch.employment_type == filters["employment_type"])
+    if filters["remote"] is not None and skip != "remote":
+        query = query.filter(JobMatch.is_remote == filters["remote"])
+    if filters["state"] and skip != "state":
+        query = query.filter(JobMatch.state == filters["state"])
+    if filters["country"] and skip != "country":
+        query = query.filter(JobMatch.country == filters["country"])
+    if filters["min_salary"] is not None:
+        query = query.filter(JobMatch.salary_max >= filters["min_salary"])
+    if filters["posted_within_days"]:
+        since = datetime.utcnow() - timedelta(days=filters["posted_within_days"])
+        query = query.filter(JobMatch.posted_at >= since)
+    if filters["near"] is not None:
+        query = query.filter(within_radius(filters["near"], filters["radius_miles"]))
+    return query
 
 
 @router.get("/matches")
 def get_job_matches(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    limit: int = Query(50, ge=1, le=500, description="Maximum matches to return"),
+    cursor: str | None = Query(None, description="X-Next-Cursor value from the previous page"),
+    filters: dict = Depends(_match_filters),
+    current_user: Principal = Depends(get_read_principal),
+    db: Session = Depends(get_read_db)
+):
+    """Get one page of job matches for current user, best score first.
+
+    Uses keyset pagination on (score, id) so every page is an index range
+    scan on ``ix_job_matches_user_score``. When more matches exist, the
+    ``X-Next-Cursor`` response header holds the cursor for the next page.
+    """
+    query = db.query(
+        JobMatch.id,
+        JobMatch.title,
+        JobMatch.company,
+        JobMatch.location,
+        JobMatch.url,
+        JobMatch.score,
+        JobMatch.employment_type,
+        JobMatch.is_remote,
+        JobMatch.salary_min,
+        JobMatch.salary_max,
+        JobMatch.salary_period,
+        JobMatch.posted_at,
+        JobMatch.state,
+        JobMatch.country,
+        JobMatch.created_at,
+    ).filter(JobMatch.user_id == current_user.id)
+    query = _apply_match_filters(query, filters)
+
+    if cursor:
+        after_score, after_id = _decode_cursor(cursor)
+        query = query.filter(
+            (JobMatch.score < after_score)
+            | ((JobMatch.score == after_score) & (JobMatch.id < after_id))
+        )
+
+    rows = query.order_by(JobMatch.score.desc(), JobMatch.id.desc()).limit(limit + 1).all()
+
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = _encode_cursor(rows[-1].score, rows[-1].id)
+
+    def body():
+        yield "["
+        for i, row in enumerate(rows):
+            yield ("," if i else "") + json.dumps(jsonable_encoder(row._asdict()))
+        yield "]"
+
+    return StreamingResponse(body(), media_type="application/json", headers=headers)
+
+
+@router.get("/matches/count")
+def count_job_matches(
+    current_user: Principal = Depends(get_read_principal),
+    db: Session = Depends(get_read_db)
 ):
-    """Get all job matches for current user."""
-    matches = db.query(JobMatch).filter(
+    """Return how many job matches the current user has."""
+    count = db.query(func.count(JobMatch.id)).filter(
         JobMatch.user_id == current_user.id
-    ).order_by(JobMatch.score.desc()).all()
-    
-    return [
-        {
-            "id": m.id,
-            "title": m.title,
-            "company": m.company,
-            "location": m.location,
-            "url": m.url,
-            "score": m.score,
-            "created_at": m.created_at,
-        }
-        for m in matches
-    ]
+    ).scalar()
+
+    return {"count": count}
+
+
+# Facet name -> column it is grouped on.
+_FACET_COLUMNS = {
+    "employment_type": JobMatch.employment_type,
+    "remote": JobMatch.is_remote,
+    "state": JobMatch.state,
+    "country": JobMatch.country,
+}
+
+
+@router.get("/matches/facets")
+def get_job_match_facets(
+    filters: dict = Depends(_match_filters),
+    current_user: Principal = Depends(get_read_principal),
+    db: Session = Depends(get_read_db)
+):
+    """Count the user's matches per value of each structured attribute.
+
+    Each facet is counted with every *other* active filter applied, so the
+    UI can show how many results picking a different value would give.
+    """
+    facets = {}
+    for name, facet_column in _FACET_COLUMNS.items():
+        query = db.query(facet_column, func.count(JobMatch.id)).filter(
+            JobMatch.user_id == current_user.id
+        )
+        query = _apply_match_filters(query, filters, skip=name)
+        rows = query.group_by(facet_column).order_by(func.count(JobMatch.id).desc()).all()
+        facets[name] = [
+            {"value": value, "count": count}
+            for value, count in rows
+            if value is not None
+        ]
+
+    return facets
+
+
+@router.get("/matches/search")
+def search_saved_job_matches(
+    q: str = Query(..., min_length=1, max_length=200, description="Words to look for"),
+    limit: int = Query(50, ge=1, le=200),
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+):
+    """Full-text search over the current user's saved job matches, best first."""
+    return search_job_matches(db, current_user.id, q, limit=limit)
+
+
+@router.get("/providers")
+def get_job_providers(current_user: Principal = Depends(get_current_principal)):
+    """Health, circuit state and latency of each configured job provider."""
+    return [provider.status() for provider in get_providers()]
+
+
+@router.get("/matches/new")
+def get_new_job_matches(
+    since: datetime = Query(..., description="Only matches stored after this time"),
+    limit: int = Query(100, ge=1, le=500),
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+):
+    """Matches stored since ``since`` (e.g. by the off-peak refresh), newest first."""
+    rows = (
+        db.query(
+            JobMatch.id,
+            JobMatch.title,
+            JobMatch.company,
+            JobMatch.location,
+            JobMatch.url,
+            JobMatch.score,
+            JobMatch.created_at,
+        )
+        .filter(JobMatch.user_id == current_user.id, JobMatch.created_at > since)
+        .order_by(JobMatch.created_at.desc(), JobMatch.id.desc())
+        .limit(limit)
+        .all()
+    )
+    return [dict(row._mapping) for row in rows]
+
+
+@router.get("/saved-searches")
+def get_saved_searches(
+    current_user: Principal = Depends(get_read_principal),
+    db: Session = Depends(get_read_db)
+):
+    """The searches refreshed off-peak for the current user, derived from their resume."""
+    return list_saved_searches(db, current_user.id)
+
+
+@router.get("/skills/gap")
+async def get_skill_gap(
+    limit: int = Query(25, ge=1, le=200),
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+):
+    """Skills most often asked for by the user's saved matches, and which the resume lacks."""
+    latest_resume = await run_db(_latest_resume, db, current_user.id)
+    return await run_db(skill_gap_report, db, current_user.id, latest_resume, limit=limit)
 
 
 @router.get("/match/{match_id}")
 def get_job_match(
     match_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
-    """Get specific job match details."""
+    """Get specific job match details, including the (shared) job description."""
     match = db.query(JobMatch).filter(
         (JobMatch.id == match_id) & (JobMatch.user_id == current_user.id)
     ).first()
@@ -187,6 +376,7 @@ def get_job_match(
         "location": match.location,
         "url": match.url,
         "score": match.score,
+        "description": match.description.text if match.description else None,
         "created_at": match.created_at,
     }
 
@@ -194,7 +384,7 @@ def get_job_match(
 @router.delete("/match/{match_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_job_match(
     match_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Delete a job match."""
@@ -208,6 +398,7 @@ def delete_job_match(
             detail="Job match not found"
         )
     
+    forget_match_skills(db, current_user.id, [match.id])
     db.delete(match)
     db.commit()
 
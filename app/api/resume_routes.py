@@ -1,12 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 from pathlib import Path
-from app.database import get_db
+from app.database import get_db, run_db
 from app.models.user import User
 from app.models.resume import Resume
-from app.auth.dependencies import get_current_user
+from app.auth.dependencies import get_current_user, get_read_db, get_read_user
 from app.services.resume_analysis import summarize_resume
+from app.services.saved_searches import sync_saved_searches
 
 router = APIRouter(prefix="/api/resume", tags=["resume"])
 
@@ -15,13 +17,57 @@ UPLOADS_DIR = Path(__file__).resolve().parent.parent.parent / "uploads" / "resum
 UPLOADS_DIR.mkdir(parents=True, exist_ok=True)
 
 
+def _remove_existing_resumes(db: Session, user_id: int) -> None:
+    # If the user already has a resume, remove it so there is only
+    # ever one active resume driving analysis and job matches.
+    existing_resumes = db.query(Resume).filter(Resume.user_id == user_id).all()
+    for existing in existing_resumes:
+        old_path = UPLOADS_DIR / f"{user_id}_{existing.filename}"
+        if old_path.exists():
+            try:
+                old_path.unlink()
+            except Exception:
+                # If we can't delete the old file, continue but still
+                # replace the DB row so the app stays consistent.
+                pass
+        db.delete(existing)
+    db.commit()
+
+
+def _save_resume(db: Session, resume: Resume) -> Resume:
+    db.add(resume)
+    db.flush()
+    # The new resume decides which searches are refreshed off-peak
+    sync_saved_searches(db, resume.user_id, resume)
+    db.commit()
+    db.refresh(resume)
+    return resume
+
+
+def _delete_resume(db: Session, resume: Resume) -> None:
+    db.delete(resume)
+    db.flush()
+    latest = (
+        db.query(Resume)
+        .filter(Resume.user_id == resume.user_id)
+        .order_by(Resume.created_at.desc())
+        .first()
+    )
+    sync_saved_searches(db, resume.user_id, latest)
+    db.commit()
+
+
 @router.post("/upload")
 async def upload_resume(
     file: UploadFile = File(...),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Upload a resume file."""
+    """Upload a resume file.
+
+    Database work, file writes and the (slow) OpenAI summary all run off
+    the event loop.
+    """
     # Validate file type
     allowed_types = {"application/pdf", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"}
     if file.content_type not in allowed_types:
@@ -30,41 +76,25 @@ async def upload_resume(
             detail="File must be PDF or DOCX"
         )
     
-    # If the user already has a resume, remove it so there is only
-    # ever one active resume driving analysis and job matches.
-    existing_resumes = db.query(Resume).filter(Resume.user_id == current_user.id).all()
-    for existing in existing_resumes:
-        old_path = UPLOADS_DIR / f"{current_user.id}_{existing.filename}"
-        if old_path.exists():
-            try:
-                old_path.unlink()
-            except Exception:
-                # If we can't delete the old file, continue but still
-                # replace the DB row so the app stays consistent.
-                pass
-        db.delete(existing)
-    db.commit()
+    user_id = current_user.id
+    await run_db(_remove_existing_resumes, db, user_id)
 
     # Save new file on disk, namespaced by user
-    file_location = UPLOADS_DIR / f"{current_user.id}_{file.filename}"
-    with open(file_location, "wb") as f:
-        contents = await file.read()
-        f.write(contents)
+    file_location = UPLOADS_DIR / f"{user_id}_{file.filename}"
+    contents = await file.read()
+    await run_in_threadpool(file_location.write_bytes, contents)
     
     # Call OpenAI to generate a summary and job-fit advice (best effort)
-    summary_text, advice_text = summarize_resume(file_location)
+    summary_text, advice_text = await run_in_threadpool(summarize_resume, file_location)
 
     # Create resume record
     resume = Resume(
-        user_id=current_user.id,
+        user_id=user_id,
         filename=file.filename,
         content=summary_text,
         analysis=advice_text,
     )
-    
-    db.add(resume)
-    db.commit()
-    db.refresh(resume)
+    resume = await run_db(_save_resume, db, resume)
     
     return {
         "id": resume.id,
@@ -77,8 +107,8 @@ async def upload_resume(
 
 @router.get("/list")
 def list_resumes(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_read_user),
+    db: Session = Depends(get_read_db)
 ):
     """Get all resumes for the current user."""
     resumes = db.query(Resume).filter(Resume.user_id == current_user.id).all()
@@ -180,14 +210,12 @@ def delete_resume(
             file_location.unlink()
         except Exception:
             # If file delete fails, still remove DB row but return warning
-            db.delete(resume)
-            db.commit()
+            _delete_resume(db, resume)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Resume record deleted but file could not be removed",
             )
 
-    db.delete(resume)
-    db.commit()
+    _delete_resume(db, resume)
 
     return {"message": "Resume deleted"}
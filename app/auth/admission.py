@@ -0,0 +1,140 @@
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List
+
+from fastapi import HTTPException, Request, status
+
+from app.core.config import get_settings
+from app.core.metrics import Metric, registry
+
+settings = get_settings()
+
+
+class SlidingWindowLimiter:
+    """Counts events per key over the last ``window_seconds``.
+
+    Used to turn away login and signup attempts before any password hashing
+    is done for them. Keys whose events have all expired are swept once
+    the table grows past ``max_keys``.
+    """
+
+    def __init__(self, limit: int, window_seconds: int, max_keys: int = 100_000):
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self.max_keys = max_keys
+        self._events: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def _recent(self, key: str, now: float) -> Deque[float] | None:
+        events = self._events.get(key)
+        if events is not None:
+            while events and events[0] <= now - self.window_seconds:
+                events.popleft()
+        return events
+
+    def blocked(self, key: str) -> bool:
+        """Whether ``key`` has used up its allowance, without counting an event."""
+        if self.limit <= 0:
+            return False
+        with self._lock:
+            events = self._recent(key, time.monotonic())
+            return events is not None and len(events) >= self.limit
+
+    def add(self, key: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            events = self._recent(key, now)
+            if events is None:
+                if len(self._events) >= self.max_keys:
+                    self._sweep(now)
+                events = self._events[key] = deque()
+            events.append(now)
+
+    def hit(self, key: str) -> bool:
+        """Count an event for ``key`` if it is within its allowance."""
+        if self.blocked(key):
+            return False
+        self.add(key)
+        return True
+
+    def reset(self, key: str | None = None) -> None:
+        with self._lock:
+            if key is None:
+                self._events.clear()
+            else:
+                self._events.pop(key, None)
+
+    def _sweep(self, now: float) -> None:
+        for key in list(self._events):
+            if not self._recent(key, now):
+                del self._events[key]
+
+
+login_ip_limiter = SlidingWindowLimiter(settings.LOGIN_MAX_ATTEMPTS_PER_IP, settings.AUTH_RATE_WINDOW_SECONDS)
+account_failure_limiter = SlidingWindowLimiter(settings.LOGIN_MAX_FAILURES_PER_ACCOUNT, settings.AUTH_RATE_WINDOW_SECONDS)
+register_ip_limiter = SlidingWindowLimiter(settings.REGISTER_MAX_PER_IP, settings.AUTH_RATE_WINDOW_SECONDS)
+
+_rejections = {"login_ip": 0, "account": 0, "register_ip": 0}
+
+
+def client_ip(request: Request) -> str:
+    # The socket peer; X-Forwarded-For is not trusted since any client can set it
+    return request.client.host if request.client else "unknown"
+
+
+def _too_many(reason: str) -> HTTPException:
+    _rejections[reason] += 1
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many attempts, please try again later",
+        headers={"Retry-After": str(settings.AUTH_RATE_WINDOW_SECONDS)},
+    )
+
+
+def admit_login(ip: str, email: str) -> None:
+    """Refuse a login from a busy IP, or for an account with repeated failures."""
+    if not login_ip_limiter.hit(ip):
+        raise _too_many("login_ip")
+    if account_failure_limiter.blocked(email.lower()):
+        raise _too_many("account")
+
+
+def admit_password_change(email: str) -> None:
+    if account_failure_limiter.blocked(email.lower()):
+        raise _too_many("account")
+
+
+def admit_register(ip: str) -> None:
+    if not register_ip_limiter.hit(ip):
+        raise _too_many("register_ip")
+
+
+def record_password_failure(email: str) -> None:
+    account_failure_limiter.add(email.lower())
+
+
+def record_password_success(email: str) -> None:
+    account_failure_limiter.reset(email.lower())
+
+
+def reset_admission() -> None:
+    """Forget every recorded attempt."""
+    for limiter in (login_ip_limiter, account_failure_limiter, register_ip_limiter):
+        limiter.reset()
+
+
+def admission_metrics() -> List[Metric]:
+    return [
+        Metric(
+            "auth_admission_rejected_total",
+            "counter",
+            "Auth requests refused before password hashing",
+            count,
+            {"reason": reason},
+        )
+        for reason, count in _rejections.items()
+    ]
+
+
+registry.register("auth_admission", admission_metrics)
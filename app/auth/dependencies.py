@@ -1,40 +1,166 @@
+import time
+from dataclasses import dataclass
+from typing import Any, Dict
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import SessionLocal, get_db, is_replica_session, read_session
 from app.models.user import User
 from app.auth.jwt import JWTHandler
+from app.auth.principal_cache import principal_cache, snapshot_user, user_from_snapshot
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get the current authenticated user from JWT token."""
-    credentials_exception = HTTPException(
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated caller as described by a validated access token."""
+
+    id: int
+    username: str | None
+
+
+def _credentials_exception(detail: str = "Could not validate credentials") -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
+        detail=detail,
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
-    payload = JWTHandler.decode_token(token)
-    if payload is None:
-        raise credentials_exception
-    
-    user_id: int = payload.get("sub")
-    if user_id is None:
-        raise credentials_exception
-    
+
+
+def _inactive_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="User is inactive"
+    )
+
+
+def _load_principal(db: Session, user_id: int) -> tuple[Dict[str, Any], User]:
+    """Load a user, cache its snapshot and return both."""
+    started = time.perf_counter()
     user = db.query(User).filter(User.id == user_id).first()
     if user is None:
-        raise credentials_exception
-    
-    if not user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="User is inactive"
-        )
-    
-    return user
+        raise _credentials_exception()
+    snapshot = snapshot_user(user)
+    principal_cache.put(user_id, snapshot, time.perf_counter() - started)
+    return snapshot, user
+
+
+def _validate_token(token: str, db: Session) -> tuple[Dict[str, Any], Dict[str, Any], User | None]:
+    """Check a token's signature and claims against the user's current state.
+
+    Returns the claims, the user's (cached) snapshot and, when the cache
+    missed, the freshly loaded ``User``. The database is only queried on a
+    principal-cache miss. Tokens older than the user's current
+    ``token_version`` are rejected, so logout and password changes revoke
+    them; a token newer than the cached (or replicated) row means that row
+    is stale, so the user is reloaded from the primary instead.
+    """
+
+    payload = JWTHandler.decode_token(token)
+    if payload is None:
+        raise _credentials_exception()
+
+    try:
+        user_id = int(payload.get("sub"))
+    except (TypeError, ValueError):
+        raise _credentials_exception()
+
+    # Lets the session attribute its writes to this user (read-your-writes)
+    db.info["user_id"] = user_id
+
+    # Signed claim: no need to look anything up for a known-inactive account
+    if payload.get("act") is False:
+        raise _inactive_exception()
+
+    # Tokens issued before versioning carry no "ver" and count as version 0
+    version = payload.get("ver", 0)
+
+    user = None
+    snapshot = principal_cache.get(user_id)
+    if snapshot is None:
+        snapshot, user = _load_principal(db, user_id)
+
+    replica = is_replica_session(db)
+    if version > snapshot["token_version"] and (user is None or replica):
+        # Issued after our copy of the row was read: the cache or the
+        # replica is behind, so only the primary can settle it.
+        principal_cache.invalidate(user_id)
+        if replica:
+            with SessionLocal() as primary:
+                snapshot, _ = _load_principal(primary, user_id)
+            user = None
+        else:
+            snapshot, user = _load_principal(db, user_id)
+
+    if version < snapshot["token_version"]:
+        raise _credentials_exception("Token has been revoked")
+    if not snapshot["is_active"]:
+        raise _inactive_exception()
+
+    return payload, snapshot, user
+
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> User:
+    """Get the current authenticated user from JWT token.
+
+    Users are served from the principal cache when possible, so most
+    requests skip the user lookup query.
+    """
+    _, snapshot, user = _validate_token(token, db)
+    return user if user is not None else user_from_snapshot(db, snapshot)
+
+
+def get_current_principal(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> Principal:
+    """Authenticate from the token's signed claims without loading a ``User``.
+
+    For routes that only need the caller's id; on a principal-cache hit no
+    SQL is issued at all.
+    """
+    payload, snapshot, _ = _validate_token(token, db)
+    return Principal(id=snapshot["id"], username=payload.get("usr") or snapshot["username"])
+
+
+def get_read_db(token: str = Depends(oauth2_scheme)):
+    """Session for read-only routes.
+
+    Uses the read replica when one is configured, except for a caller who
+    wrote recently, whose reads stay on the primary. The token is only
+    decoded here to find the caller; it is validated by the user dependency.
+    """
+    payload = JWTHandler.decode_token(token) or {}
+    try:
+        user_id = int(payload.get("sub"))
+    except (TypeError, ValueError):
+        user_id = None
+
+    db = read_session(user_id)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_read_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_read_db)
+) -> User:
+    """``get_current_user`` for read-only routes, loading the user via :func:`get_read_db`."""
+    _, snapshot, user = _validate_token(token, db)
+    return user if user is not None else user_from_snapshot(db, snapshot)
+
+
+def get_read_principal(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_read_db)
+) -> Principal:
+    """``get_current_principal`` for read-only routes."""
+    payload, snapshot, _ = _validate_token(token, db)
+    return Principal(id=snapshot["id"], username=payload.get("usr") or snapshot["username"])
@@ -1,7 +1,6 @@
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from sqlalchemy.orm import Session
 from app.core.config import get_settings
+from app.services.mail_queue import enqueue_email
 import logging
 
 settings = get_settings()
@@ -9,11 +8,15 @@ logger = logging.getLogger(__name__)
 
 
 class EmailService:
-    """Email sending service using SMTP."""
+    """Email sending service.
+
+    Messages are queued in the database and delivered over SMTP by the
+    background mail queue (``app.services.mail_queue``).
+    """
 
     @staticmethod
-    def send_password_reset_email(to_email: str, token: str) -> bool:
-        """Send password reset email."""
+    def send_password_reset_email(db: Session, to_email: str, token: str) -> bool:
+        """Queue a password reset email. The caller commits."""
         try:
             subject = "CareerLens - Reset Your Password"
 
@@ -40,26 +43,10 @@ class EmailService:
             </html>
             """
 
-            EmailService._send_smtp_email(to_email, subject, body)
-            logger.info(f"Password reset email sent to {to_email}")
+            enqueue_email(db, to_email, subject, body)
+            logger.info(f"Password reset email queued for {to_email}")
             return True
 
         except Exception as e:
-            logger.error(f"Failed to send password reset email: {str(e)}")
+            logger.error(f"Failed to queue password reset email: {str(e)}")
             return False
-
-    @staticmethod
-    def _send_smtp_email(to_email: str, subject: str, body: str) -> None:
-        """Send email via SMTP."""
-        msg = MIMEMultipart("alternative")
-        msg["Subject"] = subject
-        msg["From"] = settings.FROM_EMAIL
-        msg["To"] = to_email
-
-        part = MIMEText(body, "html")
-        msg.attach(part)
-
-        with smtplib.SMTP(settings.SMTP_SERVER, settings.SMTP_PORT) as server:
-            server.starttls()
-            server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
-            server.sendmail(settings.FROM_EMAIL, [to_email], msg.as_string())
@@ -1,4 +1,5 @@
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
@@ -6,8 +7,25 @@ from app.core.config import get_settings
 
 settings = get_settings()
 
+
+@lru_cache()
+def crypt_context(rounds: int) -> CryptContext:
+    """bcrypt context for a cost of ``rounds``.
+
+    Pinning the minimum and maximum to the same cost makes any stored hash
+    made with a different cost "need update", so it is rehashed on login.
+    """
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+    )
+
+
 # Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = crypt_context(settings.BCRYPT_ROUNDS)
 
 
 class PasswordHandler:
@@ -23,10 +41,25 @@ class PasswordHandler:
         """Verify a plain password against hashed password."""
         return pwd_context.verify(plain_password, hashed_password)
 
+    @staticmethod
+    def needs_rehash(hashed_password: str) -> bool:
+        """Whether a stored hash was made with a different cost than configured."""
+        return pwd_context.needs_update(hashed_password)
+
 
 class JWTHandler:
     """Handle JWT token creation and verification."""
 
+    @staticmethod
+    def user_claims(user) -> dict:
+        """Claims every token for ``user`` carries, checked by the auth dependencies."""
+        return {
+            "sub": str(user.id),
+            "usr": user.username,
+            "act": bool(user.is_active),
+            "ver": user.token_version or 0,
+        }
+
     @staticmethod
     def create_token(
         data: dict,
@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Tuple
+
+from app.auth.jwt import crypt_context
+from app.core.config import get_settings
+from app.core.metrics import Metric, registry
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+# Run inside the worker processes; module-level so they can be pickled.
+def _hash(password: str, rounds: int) -> str:
+    return crypt_context(rounds).hash(password)
+
+
+def _verify_and_update(password: str, hashed_password: str, rounds: int) -> Tuple[bool, str | None]:
+    return crypt_context(rounds).verify_and_update(password, hashed_password)
+
+
+class HashingBusy(Exception):
+    """The hashing queue is full; the request should be retried later."""
+
+
+class PoolClosed(HashingBusy):
+    """The pool has been shut down (the app is stopping); no more hashes are taken."""
+
+
+class PasswordHashPool:
+    """bcrypt on a dedicated, bounded process pool.
+
+    Hashing is CPU-bound and deliberately slow, so it is kept off both the
+    event loop and the request threadpool. At most ``max_pending`` hashes
+    may be queued or running; past that :class:`HashingBusy` is raised
+    straight away instead of letting a login storm build an unbounded queue.
+    After :meth:`shutdown` calls fail with :class:`PoolClosed` until
+    :meth:`start` is called again.
+    """
+
+    def __init__(self, workers: int, max_pending: int, rounds: int):
+        self.workers = max(workers, 1)
+        self.max_pending = max_pending
+        self.rounds = rounds
+        self._executor: ProcessPoolExecutor | None = None
+        self._closed = False
+        self._lock = threading.Lock()
+
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.rehashed = 0
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # forkserver: workers are forked from a clean helper process rather
+        # than from this (multi-threaded) one, and it stays up if the pool
+        # is recreated.
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload([__name__])
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+
+    def start(self) -> None:
+        """Create the pool; worker processes are forked on first use."""
+        with self._lock:
+            self._closed = False
+            if self._executor is None:
+                self._executor = self._new_executor()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._closed = True
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _discard(self, executor: ProcessPoolExecutor) -> None:
+        """Drop a broken pool so the next call starts a fresh one."""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self._closed:
+                raise PoolClosed("Password hashing pool is shut down")
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise HashingBusy()
+            if self._executor is None:
+                self._executor = self._new_executor()
+            # Submitted under the lock so shutdown() cannot close the pool in between
+            executor = self._executor
+            future = executor.submit(fn, *args)
+            self.pending += 1
+
+        succeeded = False
+        try:
+            result = await asyncio.wrap_future(future)
+            succeeded = True
+            return result
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed); start a fresh pool next time
+            logger.error("Password hashing pool broke; recreating it")
+            self._discard(executor)
+            raise
+        finally:
+            with self._lock:
+                self.pending -= 1
+                if succeeded:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash, password, self.rounds)
+
+    async def verify(self, password: str, hashed_password: str) -> Tuple[bool, str | None]:
+        """Check a password, returning ``(valid, new_hash)``.
+
+        ``new_hash`` is set when the stored hash used another cost and
+        should be replaced.
+        """
+        valid, new_hash = await self._run(_verify_and_update, password, hashed_password, self.rounds)
+        if new_hash:
+            self.rehashed += 1
+        return valid, new_hash
+
+    def metrics(self) -> List[Metric]:
+        return [
+            Metric("auth_password_hash_pending", "gauge", "Password hashes queued or running", self.pending),
+            Metric("auth_password_hash_completed_total", "counter", "Password hashes computed", self.completed),
+            Metric("auth_password_hash_failed_total", "counter", "Hashes that raised or were cancelled", self.failed),
+            Metric("auth_password_hash_rejected_total", "counter", "Hashes refused because the queue was full", self.rejected),
+            Metric("auth_password_rehashed_total", "counter", "Stored hashes upgraded to the configured cost", self.rehashed),
+        ]
+
+
+password_pool = PasswordHashPool(
+    settings.PASSWORD_HASH_WORKERS,
+    settings.PASSWORD_HASH_MAX_PENDING,
+    settings.BCRYPT_ROUNDS,
+)
+registry.register("password_pool", password_pool.metrics)
@@ -0,0 +1,255 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, make_transient_to_detached, object_session
+
+from app.core.config import get_settings
+from app.core.metrics import Metric, registry
+from app.models.user import User
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Columns kept per user. The password hash is deliberately left out; the few
+# routes that need it load it from the database on access.
+CACHED_COLUMNS = (
+    "id", "email", "username", "full_name", "is_active", "token_version", "created_at", "updated_at",
+)
+_DATETIME_COLUMNS = ("created_at", "updated_at")
+
+_REDIS_KEY = "careerlens:principal:{}"
+# Invalidations are published here so every worker drops its local copy;
+# the payload is a user id, or "*" for all users.
+_INVALIDATION_CHANNEL = "careerlens:principal:invalidate"
+
+
+def snapshot_user(user: User) -> Dict[str, Any]:
+    return {name: getattr(user, name) for name in CACHED_COLUMNS}
+
+
+def user_from_snapshot(db: Session, snapshot: Dict[str, Any]) -> User:
+    """Attach a cached user to ``db`` as if it had just been loaded, without a query."""
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    return db.merge(user, load=False)
+
+
+class PrincipalCache:
+    """TTL/LRU cache of authenticated users keyed by user id.
+
+    A small in-process tier answers most lookups; an optional Redis tier
+    shares entries between workers. Entries are dropped whenever a change to
+    a user row is committed through the ORM (see the listeners below), so a
+    password change, logout or deactivation takes effect on the next request
+    in this process. With Redis the invalidation is also published to every
+    other worker; without it they may keep serving the old row (and accept
+    revoked tokens) for up to ``ttl_seconds``.
+    """
+
+    def __init__(self, ttl_seconds: int, max_entries: int, redis_url: str | None = None):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis = None
+        if redis_url:
+            import redis
+
+            self._redis = redis.Redis.from_url(redis_url, socket_timeout=0.05)
+            threading.Thread(
+                target=self._listen_for_invalidations, args=(redis_url,), name="principal-cache", daemon=True
+            ).start()
+
+        self.hits = 0
+        self.misses = 0
+        self.redis_hits = 0
+        self.time_saved_seconds = 0.0
+        # Moving average of what a database lookup costs, credited on every hit
+        self._lookup_seconds = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def get(self, user_id: int) -> Dict[str, Any] | None:
+        if not self.enabled:
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                self.time_saved_seconds += self._lookup_seconds
+                return dict(entry[1])
+            if entry is not None:
+                del self._entries[user_id]
+
+        snapshot = self._redis_get(user_id)
+        with self._lock:
+            if snapshot is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.redis_hits += 1
+            self.time_saved_seconds += self._lookup_seconds
+            self._store_local(user_id, snapshot, now)
+        return dict(snapshot)
+
+    def put(self, user_id: int, snapshot: Dict[str, Any], lookup_seconds: float) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._lookup_seconds = (
+                lookup_seconds if not self._lookup_seconds else 0.9 * self._lookup_seconds + 0.1 * lookup_seconds
+            )
+            self._store_local(user_id, snapshot, time.monotonic())
+        self._redis_put(user_id, snapshot)
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+        if self._redis is not None:
+            try:
+                pipe = self._redis.pipeline()
+                pipe.delete(_REDIS_KEY.format(user_id))
+                pipe.publish(_INVALIDATION_CHANNEL, str(user_id))
+                pipe.execute()
+            except Exception as exc:
+                logger.warning("Could not invalidate cached principal %s in Redis: %s", user_id, exc)
+
+    def clear(self) -> None:
+        """Drop every local entry, here and in the other workers (Redis entries expire on their own)."""
+        self._clear_local()
+        if self._redis is not None:
+            try:
+                self._redis.publish(_INVALIDATION_CHANNEL, "*")
+            except Exception as exc:
+                logger.warning("Could not publish principal cache clear: %s", exc)
+
+    def _clear_local(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _on_invalidation(self, payload: bytes | str) -> None:
+        """Apply an invalidation published by any worker (this one included)."""
+        payload = payload.decode() if isinstance(payload, bytes) else payload
+        if payload == "*":
+            self._clear_local()
+            return
+        with self._lock:
+            self._entries.pop(int(payload), None)
+
+    def _listen_for_invalidations(self, redis_url: str) -> None:
+        import redis
+
+        while True:
+            try:
+                pubsub = redis.Redis.from_url(redis_url).pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(_INVALIDATION_CHANNEL)
+                for message in pubsub.listen():
+                    self._on_invalidation(message["data"])
+            except Exception as exc:
+                logger.warning("Principal cache invalidation feed failed: %s", exc)
+            # Anything published while disconnected was missed
+            self._clear_local()
+            time.sleep(1)
+
+    def _store_local(self, user_id: int, snapshot: Dict[str, Any], now: float) -> None:
+        self._entries[user_id] = (now + self.ttl_seconds, dict(snapshot))
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _redis_get(self, user_id: int) -> Dict[str, Any] | None:
+        if self._redis is None:
+            return None
+        try:
+            raw = self._redis.get(_REDIS_KEY.format(user_id))
+        except Exception as exc:
+            logger.warning("Principal cache Redis lookup failed: %s", exc)
+            return None
+        if raw is None:
+            return None
+        snapshot = json.loads(raw)
+        for name in _DATETIME_COLUMNS:
+            if snapshot.get(name):
+                snapshot[name] = datetime.fromisoformat(snapshot[name])
+        return snapshot
+
+    def _redis_put(self, user_id: int, snapshot: Dict[str, Any]) -> None:
+        if self._redis is None:
+            return
+        payload = {
+            name: value.isoformat() if isinstance(value, datetime) else value
+            for name, value in snapshot.items()
+        }
+        try:
+            self._redis.setex(_REDIS_KEY.format(user_id), self.ttl_seconds, json.dumps(payload))
+        except Exception as exc:
+            logger.warning("Principal cache Redis write failed: %s", exc)
+
+    def metrics(self) -> List[Metric]:
+        lookups = self.hits + self.misses
+        return [
+            Metric("auth_principal_cache_hits_total", "counter", "Authenticated-user lookups served from cache", self.hits),
+            Metric("auth_principal_cache_redis_hits_total", "counter", "Cache hits served by the Redis tier", self.redis_hits),
+            Metric("auth_principal_cache_misses_total", "counter", "Authenticated-user lookups that queried the database", self.misses),
+            Metric("auth_principal_cache_hit_ratio", "gauge", "Share of lookups served from cache", round(self.hits / lookups, 4) if lookups else 0.0),
+            Metric("auth_principal_cache_entries", "gauge", "Users held in the in-process tier", len(self._entries)),
+            Metric(
+                "auth_principal_cache_time_saved_seconds_total",
+                "counter",
+                "Estimated database time avoided (hits x average lookup time)",
+                round(self.time_saved_seconds, 6),
+            ),
+        ]
+
+
+principal_cache = PrincipalCache(
+    settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+    settings.REDIS_URL if settings.PRINCIPAL_CACHE_REDIS else None,
+)
+registry.register("principal_cache", principal_cache.metrics)
+
+
+# Evictions wait for the commit: dropping an entry at flush time would let a
+# concurrent request re-cache the row as it was before the commit landed.
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _note_changed_user(mapper, connection, target: User) -> None:
+    # Password changes, deactivation and deletion all go through here.
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("changed_principals", set()).add(target.id)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _note_bulk_change(orm_execute_state) -> None:
+    # query(User).update()/delete() bypass the per-row events above.
+    if (orm_execute_state.is_update or orm_execute_state.is_delete) and (
+        orm_execute_state.bind_mapper is not None and orm_execute_state.bind_mapper.class_ is User
+    ):
+        orm_execute_state.session.info["changed_all_principals"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session) -> None:
+    if session.info.pop("changed_all_principals", False):
+        principal_cache.clear()
+    for user_id in session.info.pop("changed_principals", ()):
+        principal_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back(session) -> None:
+    session.info.pop("changed_all_principals", None)
+    session.info.pop("changed_principals", None)
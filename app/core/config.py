@@ -19,6 +19,36 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = "sqlite:///./careerlens.db"
     DATABASE_URL_TEST: str = "sqlite:///./test.db"
+    # Optional read replica for read-only routes; a user's reads stay on the
+    # primary for READ_YOUR_WRITES_SECONDS after they write
+    DATABASE_REPLICA_URL: str = ""
+    READ_YOUR_WRITES_SECONDS: int = 10
+    # Connection pool for server databases (PostgreSQL); see /metrics
+    # (db_pool_*) for how it is actually used
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # SQLite profile, applied to each new connection to a file database:
+    # WAL lets readers run alongside the single writer, and writers wait up
+    # to the busy timeout for the lock instead of failing at once.
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CACHE_SIZE_KB: int = 16384  # page cache per connection
+    SQLITE_MMAP_SIZE_MB: int = 256
+    SQLITE_POOL_SIZE: int = 10
+    SQLITE_MAX_OVERFLOW: int = 10
+    # Threads running database work for async routes (see database.run_db)
+    DB_OFFLOAD_THREADS: int = 15
+    # Per-request SQL counting (X-DB-Query-Count / X-DB-Time-Ms headers and
+    # logs). A request over QUERY_BUDGET statements, or repeating one
+    # statement QUERY_REPEAT_THRESHOLD times (a likely N+1), is logged
+    # ("warn") or fails ("raise", for development and tests); "off" only counts.
+    QUERY_BUDGET: int = 50
+    QUERY_REPEAT_THRESHOLD: int = 10
+    QUERY_BUDGET_MODE: str = "warn"
 
     # JWT
     SECRET_KEY: str = "dev-secret-key-change-in-production"
@@ -27,12 +57,42 @@ class Settings(BaseSettings):
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
     JWT_SECRET_KEY: str = "dev-jwt-secret-key-change-in-production"
 
+    # Authenticated-user cache (0 disables); Redis adds a tier shared by workers.
+    # Without Redis a worker that did not handle a logout or password change
+    # keeps accepting the revoked tokens for up to the TTL; with it,
+    # invalidations are broadcast to every worker at once.
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 30
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+    PRINCIPAL_CACHE_REDIS: bool = False
+
+    # Password hashing: bcrypt cost (stored hashes are upgraded on login when
+    # it changes) and the dedicated process pool that runs it
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
+
+    # Auth admission control, applied before any hashing (per window)
+    AUTH_RATE_WINDOW_SECONDS: int = 60
+    LOGIN_MAX_ATTEMPTS_PER_IP: int = 30
+    LOGIN_MAX_FAILURES_PER_ACCOUNT: int = 5
+    REGISTER_MAX_PER_IP: int = 10
+
     # Email
     SMTP_SERVER: str = "smtp.gmail.com"
     SMTP_PORT: int = 587
     SMTP_USER: str = ""
     SMTP_PASSWORD: str = ""
     FROM_EMAIL: str = ""
+    SMTP_STARTTLS: bool = True
+
+    # Outbound mail queue: polling, batching and retry backoff
+    MAIL_QUEUE_POLL_SECONDS: float = 5.0
+    MAIL_QUEUE_BATCH_SIZE: int = 50
+    MAIL_MAX_ATTEMPTS: int = 6
+    MAIL_RETRY_BASE_SECONDS: int = 30
+    MAIL_RETRY_MAX_SECONDS: int = 3600
+    MAIL_SMTP_IDLE_SECONDS: int = 60
+    MAIL_SENT_RETENTION_DAYS: int = 7
 
     # OpenAI
     OPENAI_API_KEY: str | None = None
@@ -40,6 +100,37 @@ class Settings(BaseSettings):
     # JSearch API
     JSEARCH_API_KEY: str = ""
     JSEARCH_API_HOST: str = "jsearch.p.rapidapi.com"
+    JSEARCH_TIMEOUT_SECONDS: float = 10.0
+    JSEARCH_MAX_CONCURRENCY: int = 8
+    JSEARCH_CACHE_TTL_SECONDS: int = 900
+    JSEARCH_CACHE_MAX_ENTRIES: int = 512
+
+    # Job providers queried side by side ("jsearch", "fixture")
+    JOB_PROVIDERS: List[str] = ["jsearch"]
+    # Consecutive failures before a provider's circuit opens, and how long it stays open
+    JOB_PROVIDER_FAILURE_THRESHOLD: int = 5
+    JOB_PROVIDER_RESET_SECONDS: float = 30.0
+    # JSON file of JSearch-shaped postings for the fixture provider (empty: bundled sample)
+    JOB_FIXTURE_PATH: str = ""
+    # Estimated Jaccard similarity at which two postings count as the same job (0 disables)
+    JOB_NEAR_DUPLICATE_THRESHOLD: float = 0.8
+
+    # Job match retention (0 disables the respective limit)
+    JOB_MATCH_MAX_PER_USER: int = 2000
+    JOB_MATCH_MAX_AGE_DAYS: int = 90
+    JOB_MATCH_COMPACTION_BATCH_SIZE: int = 500
+    JOB_MATCH_COMPACTION_INTERVAL_SECONDS: int = 3600
+    # Directory for gzipped NDJSON archives of removed matches (empty disables archiving)
+    JOB_MATCH_ARCHIVE_DIR: str = ""
+
+    # Off-peak refresh of resume-derived saved searches (UTC hours, window end exclusive)
+    JOB_REFRESH_WINDOW_START_HOUR: int = 2
+    JOB_REFRESH_WINDOW_END_HOUR: int = 6
+    # JSearch requests one refresh run may spend across all users (0 disables)
+    JOB_REFRESH_REQUEST_BUDGET: int = 200
+    JOB_REFRESH_PAGES_PER_SEARCH: int = 1
+    JOB_REFRESH_MIN_INTERVAL_HOURS: int = 20
+    JOB_REFRESH_CHECK_INTERVAL_SECONDS: int = 900
 
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
@@ -0,0 +1,94 @@
+import bisect
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Sequence
+
+
+@dataclass
+class Metric:
+    """One sample in Prometheus terms: a name, its type, help text and value."""
+
+    name: str
+    kind: str  # "counter", "gauge" or "histogram"
+    help: str
+    value: float
+    labels: Dict[str, str] = field(default_factory=dict)
+    # Name the HELP/TYPE lines are written under, when it differs from the
+    # sample's (histogram samples are <family>_bucket, _sum and _count)
+    family: str = ""
+
+
+class Histogram:
+    """Observations counted into cumulative buckets, Prometheus style."""
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float]):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)  # last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self._counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.sum += value
+            self.count += 1
+
+    def collect(self, labels: Dict[str, str] | None = None) -> List[Metric]:
+        labels = labels or {}
+        with self._lock:
+            counts, total, count = list(self._counts), self.sum, self.count
+        metrics = []
+        cumulative = 0
+        for bound, bucket_count in zip([*map(str, self.buckets), "+Inf"], counts):
+            cumulative += bucket_count
+            metrics.append(Metric(
+                f"{self.name}_bucket", "histogram", self.help, cumulative, {**labels, "le": bound}, self.name
+            ))
+        metrics.append(Metric(f"{self.name}_sum", "histogram", self.help, round(total, 6), labels, self.name))
+        metrics.append(Metric(f"{self.name}_count", "histogram", self.help, count, labels, self.name))
+        return metrics
+
+
+Collector = Callable[[], Iterable[Metric]]
+
+
+class MetricsRegistry:
+    """Collects metrics from registered callbacks when ``/metrics`` is scraped.
+
+    Components keep their own counters and register a collector that reports
+    them, so nothing is computed unless metrics are actually requested.
+    """
+
+    def __init__(self):
+        self._collectors: Dict[str, Collector] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, collector: Collector) -> None:
+        """Register (or replace) the collector known as ``name``."""
+        with self._lock:
+            self._collectors[name] = collector
+
+    def collect(self) -> List[Metric]:
+        with self._lock:
+            collectors = list(self._collectors.values())
+        return [metric for collector in collectors for metric in collector()]
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines: List[str] = []
+        described: set[str] = set()
+        for metric in self.collect():
+            family = metric.family or metric.name
+            if family not in described:
+                described.add(family)
+                lines.append(f"# HELP {family} {metric.help}")
+                lines.append(f"# TYPE {family} {metric.kind}")
+            labels = ",".join(f'{key}="{value}"' for key, value in sorted(metric.labels.items()))
+            lines.append(f"{metric.name}{{{labels}}} {metric.value}" if labels else f"{metric.name} {metric.value}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,161 @@
+import threading
+import time
+from typing import Dict, List
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+from app.core.metrics import Histogram, Metric, registry
+
+WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+AGE_BUCKETS = (1, 10, 60, 300, 900, 1800, 3600, 4 * 3600, 24 * 3600)
+
+
+class PoolTelemetry:
+    """Connection pool statistics for one engine, gathered from pool events.
+
+    ``connect``/``close`` track the live connections and their age,
+    ``checkout``/``checkin`` the connections in use. Checkout waits are
+    timed by :class:`TimedQueuePool`.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.engine: Engine | None = None
+        self.checkouts = 0
+        self.timeouts = 0
+        self.checked_out = 0
+        self.wait_seconds = Histogram(
+            "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection", WAIT_BUCKETS
+        )
+        self.age_at_close = Histogram(
+            "db_pool_connection_age_seconds", "Age of database connections when they are closed", AGE_BUCKETS
+        )
+        # id(connection record) -> time the DBAPI connection was opened
+        self._opened: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def attach(self, engine: Engine) -> None:
+        self.engine = engine
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+        event.listen(engine, "close", self._on_close)
+        event.listen(engine, "close_detached", self._on_close_detached)
+        event.listen(engine, "detach", self._on_detach)
+
+    def _on_connect(self, dbapi_connection, record) -> None:
+        with self._lock:
+            self._opened[id(record)] = time.monotonic()
+
+    def _on_checkout(self, dbapi_connection, record, proxy) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+
+    def _on_checkin(self, dbapi_connection, record) -> None:
+        with self._lock:
+            self.checked_out = max(self.checked_out - 1, 0)
+
+    def _forget(self, key: int) -> None:
+        with self._lock:
+            opened = self._opened.pop(key, None)
+        if opened is not None:
+            self.age_at_close.observe(time.monotonic() - opened)
+
+    def _on_close(self, dbapi_connection, record) -> None:
+        self._forget(id(record))
+
+    def _on_detach(self, dbapi_connection, record) -> None:
+        # Detached connections are tracked by their DBAPI object from now on
+        with self._lock:
+            opened = self._opened.pop(id(record), None)
+            if opened is not None:
+                self._opened[id(dbapi_connection)] = opened
+
+    def _on_close_detached(self, dbapi_connection) -> None:
+        self._forget(id(dbapi_connection))
+
+    def metrics(self) -> Dict[str, List[Metric]]:
+        """Samples keyed by metric family."""
+        labels = {"pool": self.name}
+        pool = self.engine.pool if self.engine is not None else None
+        now = time.monotonic()
+        with self._lock:
+            ages = [now - opened for opened in self._opened.values()]
+            checked_out = self.checked_out
+
+        families: Dict[str, List[Metric]] = {}
+
+        def add(name: str, kind: str, help: str, value: float) -> None:
+            families[name] = [Metric(name, kind, help, value, labels)]
+
+        if isinstance(pool, QueuePool):
+            add("db_pool_size", "gauge", "Connections the pool keeps open", pool.size())
+            add("db_pool_max_overflow", "gauge", "Extra connections allowed beyond the pool size", pool._max_overflow)
+            add("db_pool_overflow_in_use", "gauge", "Overflow connections currently open", max(pool.overflow(), 0))
+        add("db_pool_checked_out", "gauge", "Connections currently checked out", checked_out)
+        add("db_pool_connections_open", "gauge", "Open database connections", len(ages))
+        add("db_pool_connection_max_age_seconds", "gauge", "Age of the oldest open connection", round(max(ages, default=0.0), 3))
+        add("db_pool_checkouts_total", "counter", "Connection checkouts", self.checkouts)
+        add("db_pool_checkout_timeouts_total", "counter", "Checkouts that gave up waiting for a connection", self.timeouts)
+        families["db_pool_checkout_wait_seconds"] = self.wait_seconds.collect(labels)
+        families["db_pool_connection_age_seconds"] = self.age_at_close.collect(labels)
+        return families
+
+
+class TimedQueuePool(QueuePool):
+    """``QueuePool`` that records how long each checkout waits for a connection.
+
+    The wait includes opening a new connection when the pool has none idle.
+    """
+
+    telemetry: PoolTelemetry | None = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            if self.telemetry is not None:
+                self.telemetry.timeouts += 1
+            raise
+        finally:
+            if self.telemetry is not None:
+                self.telemetry.wait_seconds.observe(time.perf_counter() - started)
+
+    def recreate(self):
+        # Keep reporting to the same telemetry after engine.dispose()
+        pool = super().recreate()
+        pool.telemetry = self.telemetry
+        return pool
+
+
+_telemetry: Dict[str, PoolTelemetry] = {}
+_telemetry_lock = threading.Lock()
+
+
+def instrument_engine(engine: Engine, name: str) -> PoolTelemetry:
+    """Start collecting pool metrics for ``engine``, reported as ``pool=name``."""
+    telemetry = PoolTelemetry(name)
+    telemetry.attach(engine)
+    if isinstance(engine.pool, TimedQueuePool):
+        engine.pool.telemetry = telemetry
+    with _telemetry_lock:
+        _telemetry[name] = telemetry
+    return telemetry
+
+
+def pool_metrics() -> List[Metric]:
+    with _telemetry_lock:
+        telemetries = list(_telemetry.values())
+    # Group samples by family so each family is written in one block
+    by_family: Dict[str, List[Metric]] = {}
+    for telemetry in telemetries:
+        for family, samples in telemetry.metrics().items():
+            by_family.setdefault(family, []).extend(samples)
+    return [metric for samples in by_family.values() for metric in samples]
+
+
+registry.register("db_pool", pool_metrics)
@@ -0,0 +1,140 @@
+import logging
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import List
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+QUERY_COUNT_HEADER = "X-DB-Query-Count"
+QUERY_TIME_HEADER = "X-DB-Time-Ms"
+
+
+class QueryBudgetExceeded(Exception):
+    """A request issued more SQL than allowed (``QUERY_BUDGET_MODE=raise``)."""
+
+
+@dataclass
+class QueryStats:
+    """SQL statements executed while serving one request."""
+
+    count: int = 0
+    seconds: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, statement: str, seconds: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.seconds += seconds
+            self.statements[statement] += 1
+
+    def problems(self, budget: int, repeat_threshold: int) -> List[str]:
+        """Why this request looks too chatty, if it does."""
+        found = []
+        if budget > 0 and self.count > budget:
+            found.append(f"{self.count} queries (budget {budget})")
+        if repeat_threshold > 0 and self.statements:
+            statement, times = self.statements.most_common(1)[0]
+            if times >= repeat_threshold:
+                # Same SQL, different parameters: usually a query in a loop (N+1)
+                found.append(f"statement repeated {times} times: {' '.join(statement.split())[:200]}")
+        return found
+
+
+# Set by the middleware for the duration of a request. Work offloaded to
+# threads (run_in_threadpool, database.run_db) inherits it.
+_current: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> QueryStats | None:
+    return _current.get()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_timer(conn, cursor, statement, parameters, context, executemany) -> None:
+    if context is not None and _current.get() is not None:
+        context._query_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_query(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = _current.get()
+    started = getattr(context, "_query_started", None)
+    if stats is not None and started is not None:
+        stats.record(statement, time.perf_counter() - started)
+
+
+class QueryCounterMiddleware:
+    """Count the SQL each request issues and how long it spends in the database.
+
+    Totals are sent as response headers and logged. A request over
+    ``QUERY_BUDGET`` statements, or repeating one statement
+    ``QUERY_REPEAT_THRESHOLD`` times, is logged as a warning or, with
+    ``QUERY_BUDGET_MODE=raise`` (for development and tests), fails.
+    Streaming responses send their headers early, so their headers only
+    cover the queries made before the first byte; the log has the total.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        budget: int | None = None,
+        repeat_threshold: int | None = None,
+        mode: str | None = None,
+    ):
+        self.app = app
+        self.budget = settings.QUERY_BUDGET if budget is None else budget
+        self.repeat_threshold = settings.QUERY_REPEAT_THRESHOLD if repeat_threshold is None else repeat_threshold
+        self.mode = (mode or settings.QUERY_BUDGET_MODE).lower()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current.set(stats)
+        request_line = f"{scope['method']} {scope['path']}"
+        checked_count = -1
+
+        async def send_with_stats(message: Message) -> None:
+            nonlocal checked_count
+            if message["type"] == "http.response.start":
+                checked_count = stats.count
+                self._check(stats, request_line, may_raise=True)
+                headers = MutableHeaders(scope=message)
+                headers.append(QUERY_COUNT_HEADER, str(stats.count))
+                headers.append(QUERY_TIME_HEADER, f"{stats.seconds * 1000:.1f}")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _current.reset(token)
+            if stats.count != checked_count:
+                # Queries made while streaming (or no response was started)
+                self._check(stats, request_line, may_raise=False)
+            if stats.count:
+                logger.info("%s: %d queries, %.1f ms in the database", request_line, stats.count, stats.seconds * 1000)
+
+    def _check(self, stats: QueryStats, request_line: str, may_raise: bool) -> None:
+        if self.mode == "off":
+            return
+        problems = stats.problems(self.budget, self.repeat_threshold)
+        if not problems:
+            return
+        message = f"{request_line}: " + "; ".join(problems)
+        if self.mode == "raise" and may_raise:
+            raise QueryBudgetExceeded(message)
+        logger.warning("Query budget: %s", message)
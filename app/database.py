@@ -1,28 +1,171 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 from app.core.config import get_settings
+from app.core.pool_metrics import TimedQueuePool, instrument_engine
 
 settings = get_settings()
 
-is_sqlite = settings.DATABASE_URL.startswith("sqlite")
+def _is_memory_sqlite(url: str) -> bool:
+    return url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in url
+
+
+def sqlite_pragmas() -> dict:
+    """The pragmas run on every new connection to a SQLite file database."""
+    return {
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+        # Negative cache_size is in KiB rather than pages
+        "cache_size": -settings.SQLITE_CACHE_SIZE_KB,
+        "mmap_size": settings.SQLITE_MMAP_SIZE_MB * 1024 * 1024,
+        "temp_store": "MEMORY",
+    }
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in sqlite_pragmas().items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def build_engine(url: str, name: str = "primary"):
+    """Create an engine for ``url`` with this app's pool and SQLite settings.
+
+    Pool metrics are reported under ``pool=name``. SQLite file databases
+    keep a pool of long-lived connections, since each holds its own page
+    cache, and get the pragmas of :func:`sqlite_pragmas`.
+    """
+    if not url.startswith("sqlite"):
+        new_engine = create_engine(
+            url,
+            poolclass=TimedQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+            pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+        )
+    elif _is_memory_sqlite(url):
+        # One shared in-memory database per thread; nothing to tune
+        new_engine = create_engine(url, connect_args={"check_same_thread": False})
+    else:
+        new_engine = create_engine(
+            url,
+            connect_args={"check_same_thread": False},
+            poolclass=TimedQueuePool,
+            pool_size=settings.SQLITE_POOL_SIZE,
+            max_overflow=settings.SQLITE_MAX_OVERFLOW,
+        )
+        event.listen(new_engine, "connect", _apply_sqlite_pragmas)
 
-engine_kwargs = {
-    "connect_args": {"check_same_thread": False} if is_sqlite else {},
-}
+    instrument_engine(new_engine, name)
+    return new_engine
 
-if not is_sqlite:
-    engine_kwargs.update({
-        "pool_pre_ping": True,
-        "pool_size": 5,
-        "max_overflow": 10,
-    })
 
-engine = create_engine(settings.DATABASE_URL, **engine_kwargs)
+engine = build_engine(settings.DATABASE_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+replica_engine = build_engine(settings.DATABASE_REPLICA_URL, "replica") if settings.DATABASE_REPLICA_URL else None
+ReplicaSessionLocal = (
+    sessionmaker(autocommit=False, autoflush=False, bind=replica_engine) if replica_engine is not None else None
+)
+
 Base = declarative_base()
 
+T = TypeVar("T")
+
+# Threads that run database work on behalf of async code. Kept apart from
+# the AnyIO threadpool (which serves sync routes) and no larger than the
+# connection pool can serve, so offloaded queries queue here rather than
+# waiting on a pool checkout while holding a thread.
+_db_executor = ThreadPoolExecutor(
+    max_workers=settings.DB_OFFLOAD_THREADS, thread_name_prefix="db"
+)
+
+
+class RecentWriters:
+    """Users who committed a write in the last ``window_seconds``.
+
+    Their reads stay on the primary for that long, so they see their own
+    changes before the replica has caught up. Tracked per process.
+    """
+
+    def __init__(self, window_seconds: float, max_entries: int = 100_000):
+        self.window_seconds = window_seconds
+        self.max_entries = max_entries
+        self._last_write: dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def mark(self, user_id: int) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if len(self._last_write) >= self.max_entries:
+                cutoff = now - self.window_seconds
+                self._last_write = {uid: at for uid, at in self._last_write.items() if at > cutoff}
+            self._last_write[user_id] = now
+
+    def is_recent(self, user_id: int) -> bool:
+        with self._lock:
+            at = self._last_write.get(user_id)
+        return at is not None and time.monotonic() - at < self.window_seconds
+
+    def clear(self) -> None:
+        with self._lock:
+            self._last_write.clear()
+
+
+recent_writers = RecentWriters(settings.READ_YOUR_WRITES_SECONDS)
+
+
+# A session that writes on behalf of a user (``session.info["user_id"]``, set
+# by the auth dependencies) marks that user as a recent writer on commit.
+@event.listens_for(Session, "after_flush")
+def _flag_flush(session, flush_context) -> None:
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _flag_bulk_write(orm_execute_state) -> None:
+    # insert()/update()/delete() statements (e.g. upserts) do not flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _record_writer(session) -> None:
+    if session.info.pop("wrote", False) and session.info.get("user_id") is not None:
+        recent_writers.mark(session.info["user_id"])
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_write_flag(session) -> None:
+    session.info.pop("wrote", None)
+
+
+def read_session(user_id: int | None = None) -> Session:
+    """A session for read-only work: the replica, unless ``user_id`` wrote recently."""
+    if ReplicaSessionLocal is None or (user_id is not None and recent_writers.is_recent(user_id)):
+        return SessionLocal()
+    return ReplicaSessionLocal()
+
+
+def is_replica_session(db: Session) -> bool:
+    """Whether ``db`` reads from the replica rather than the primary."""
+    return replica_engine is not None and db.get_bind() is replica_engine
+
 
 def get_db():
     """Dependency to get database session."""
@@ -31,3 +174,23 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def run_db(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run blocking database work ``fn(*args, **kwargs)`` off the event loop.
+
+    Async routes must not query or commit on the loop itself; they pass a
+    function that does the session work, and may touch the session again
+    once it has returned.
+    """
+    loop = asyncio.get_running_loop()
+    # Carry context variables (e.g. the request's query counter) into the thread
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(_db_executor, functools.partial(context.run, fn, *args, **kwargs))
+
+
+def dialect_insert(db):
+    """Return the dialect-specific ``insert`` for ``db`` that supports ON CONFLICT."""
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert
+    return sqlite.insert
@@ -2,17 +2,25 @@ from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, PlainTextResponse
+import asyncio
 import logging
 from pathlib import Path
 
 from app.core.config import get_settings
-from app.database import engine, Base
+from app.core.metrics import registry as metrics_registry
+from app.core.query_stats import QueryCounterMiddleware
 from app.models.user import User
 from app.models.resume import Resume
 from app.models.job_match import JobMatch
 from app.models.interview import InterviewPrep
 from app.api import auth_router, resume_router, job_router, interview_router
+from app.auth.password_pool import password_pool
+from app.services.job_providers import close_http_client
+from app.services.job_retention import run_compaction_loop
+from app.services.mail_queue import run_mail_loop
+from app.services.saved_searches import run_refresh_loop
+from app.services.taxonomy import get_taxonomy_matcher
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -20,9 +28,6 @@ logger = logging.getLogger(__name__)
 
 settings = get_settings()
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
-
 # Initialize FastAPI app
 app = FastAPI(
     title=settings.APP_NAME,
@@ -38,8 +43,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-DB-Query-Count", "X-DB-Time-Ms"],
 )
 
+# Outermost, so it sees every query a request makes
+app.add_middleware(QueryCounterMiddleware)
+
 # Get absolute path to app directory
 BASE_DIR = Path(__file__).resolve().parent
 STATIC_DIR = BASE_DIR / "static"
@@ -116,16 +125,41 @@ async def health_check():
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus-style metrics (principal cache, ...)."""
+    return metrics_registry.render()
+
+
 @app.on_event("startup")
 async def startup_event():
     """Run on application startup."""
     logger.info(f"{settings.APP_NAME} v{settings.APP_VERSION} starting up...")
+    # Build the title/skill matcher now rather than on the first search
+    get_taxonomy_matcher()
+    password_pool.start()
+    if settings.JOB_MATCH_COMPACTION_INTERVAL_SECONDS > 0:
+        app.state.compaction_task = asyncio.create_task(
+            run_compaction_loop(settings.JOB_MATCH_COMPACTION_INTERVAL_SECONDS)
+        )
+    if settings.JOB_REFRESH_REQUEST_BUDGET > 0 and settings.JOB_REFRESH_CHECK_INTERVAL_SECONDS > 0:
+        app.state.refresh_task = asyncio.create_task(
+            run_refresh_loop(settings.JOB_REFRESH_CHECK_INTERVAL_SECONDS)
+        )
+    if settings.MAIL_QUEUE_POLL_SECONDS > 0:
+        app.state.mail_task = asyncio.create_task(run_mail_loop(settings.MAIL_QUEUE_POLL_SECONDS))
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Run on application shutdown."""
     logger.info(f"{settings.APP_NAME} shutting down...")
+    for name in ("compaction_task", "refresh_task", "mail_task"):
+        task = getattr(app.state, name, None)
+        if task is not None:
+            task.cancel()
+    await close_http_client()
+    password_pool.shutdown()
 
 
 if __name__ == "__main__":
@@ -3,5 +3,10 @@ from app.models.user import User
 from app.models.resume import Resume
 from app.models.job_match import JobMatch
 from app.models.interview import InterviewPrep
+from app.models.job_skill import JobMatchSkill, UserSkillCount
+from app.models.saved_search import SavedSearch
+from app.models.job_description import JobDescription
+from app.models.outbound_email import OutboundEmail
+from app.models.job_corpus import JobCorpus, JobTermStat
 
-__all__ = ["User", "Resume", "JobMatch", "InterviewPrep"]
+__all__ = ["User", "Resume", "JobMatch", "InterviewPrep", "JobMatchSkill", "UserSkillCount", "SavedSearch", "JobDescription", "OutboundEmail", "JobCorpus", "JobTermStat"]
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String
+from app.database import Base
+
+
+class JobTermStat(Base):
+    """Number of distinct postings seen whose text contains a scoring term."""
+
+    __tablename__ = "job_term_stats"
+
+    term = Column(String, primary_key=True)
+    document_count = Column(Integer, default=0, nullable=False)
+
+
+class JobCorpus(Base):
+    """Totals over every distinct posting seen, for BM25 length normalisation (a single row)."""
+
+    __tablename__ = "job_corpus"
+
+    id = Column(Integer, primary_key=True)
+    documents = Column(Integer, default=0, nullable=False)
+    total_length = Column(Integer, default=0, nullable=False)
@@ -0,0 +1,58 @@
+import zlib
+
+from sqlalchemy import Column, Integer, String, LargeBinary, DateTime, DDL, event
+from datetime import datetime
+from app.database import Base
+
+
+class JobDescription(Base):
+    """A zlib-compressed job description, stored once per distinct text.
+
+    Matches of many users that point at the same posting share one row via
+    ``JobMatch.description_id``; rows are keyed by the SHA-256 of the text.
+    """
+
+    __tablename__ = "job_descriptions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String(64), unique=True, nullable=False)
+    compressed = Column(LargeBinary, nullable=False)
+    size = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    @property
+    def text(self) -> str:
+        return zlib.decompress(self.compressed).decode("utf-8")
+
+
+# Full-text index over descriptions, one entry per row (see
+# app/services/job_text_search.py). The SQLite FTS5 table is contentless, so it
+# holds no second copy of the text; entries are dropped explicitly when rows
+# are pruned. Postgres entries cascade with their rows.
+event.listen(
+    JobDescription.__table__,
+    "after_create",
+    DDL(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS job_descriptions_fts USING fts5("
+        "description, content = '', tokenize = 'porter unicode61', prefix = '2 3')"
+    ).execute_if(dialect="sqlite"),
+)
+event.listen(
+    JobDescription.__table__,
+    "after_create",
+    DDL(
+        "CREATE TABLE IF NOT EXISTS job_descriptions_search ("
+        "description_id INTEGER PRIMARY KEY REFERENCES job_descriptions (id) ON DELETE CASCADE, "
+        "document TSVECTOR NOT NULL)"
+    ).execute_if(dialect="postgresql"),
+)
+event.listen(
+    JobDescription.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS job_descriptions_fts").execute_if(dialect="sqlite"),
+)
+event.listen(
+    JobDescription.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS job_descriptions_search").execute_if(dialect="postgresql"),
+)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, DateTime, Index, DDL, event
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -6,15 +6,114 @@ from app.database import Base
 
 class JobMatch(Base):
     __tablename__ = "job_matches"
+    __table_args__ = (
+        # One row per posting per user; NULL external ids never conflict.
+        Index("ux_job_matches_user_external", "user_id", "external_id", unique=True),
+        # Facet filters and GROUP BY counts are always scoped to one user.
+        Index("ix_job_matches_user_employment_type", "user_id", "employment_type"),
+        Index("ix_job_matches_user_remote", "user_id", "is_remote"),
+        Index("ix_job_matches_user_state", "user_id", "state"),
+        Index("ix_job_matches_user_country", "user_id", "country"),
+        Index("ix_job_matches_user_posted_at", "user_id", "posted_at"),
+        # Retention walks each user's matches oldest first.
+        Index("ix_job_matches_user_created_at", "user_id", "created_at"),
+        # Lets orphaned descriptions be found without scanning every match.
+        Index("ix_job_matches_description_id", "description_id"),
+        # Radius searches scan a few grid-cell ranges of one user's matches.
+        Index("ix_job_matches_user_geo_cell", "user_id", "geo_cell"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    external_id = Column(String, nullable=True)
     title = Column(String, nullable=False)
     company = Column(String, nullable=False)
     location = Column(String, nullable=True)
     url = Column(String, nullable=True)
-    score = Column(Float, nullable=True)
+    score = Column(Float, default=0.0, nullable=False)
+
+    # Structured attributes from JSearch, used for server-side filtering
+    employment_type = Column(String, nullable=True)
+    is_remote = Column(Boolean, nullable=True)
+    salary_min = Column(Float, nullable=True)
+    salary_max = Column(Float, nullable=True)
+    salary_period = Column(String, nullable=True)
+    posted_at = Column(DateTime, nullable=True)
+    state = Column(String, nullable=True)
+    country = Column(String, nullable=True)
+
+    # Resolved from city/state with the bundled gazetteer when stored
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    geo_cell = Column(Integer, nullable=True)
+
+    # Shared, compressed description; only loaded by the match-detail endpoint
+    description_id = Column(Integer, ForeignKey("job_descriptions.id"), nullable=True)
+
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     # Relationships
     user = relationship("User", back_populates="job_matches")
+    description = relationship("JobDescription")
+
+
+# Serves the per-user "best matches first" listing and its keyset pagination.
+Index(
+    "ix_job_matches_user_score",
+    JobMatch.user_id,
+    JobMatch.score.desc(),
+    JobMatch.id.desc(),
+)
+
+
+# Full-text index over saved matches' own fields (see
+# app/services/job_text_search.py); descriptions are indexed once per
+# JobDescription instead. SQLite keeps an FTS5 table whose rows share JobMatch
+# ids; a trigger removes them when matches are deleted. Postgres keeps a
+# weighted tsvector per match behind a GIN index and relies on ON DELETE
+# CASCADE instead.
+event.listen(
+    JobMatch.__table__,
+    "after_create",
+    DDL(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS job_matches_fts USING fts5("
+        "owner, title, company, location, "
+        "tokenize = 'porter unicode61', prefix = '2 3')"
+    ).execute_if(dialect="sqlite"),
+)
+event.listen(
+    JobMatch.__table__,
+    "after_create",
+    DDL(
+        "CREATE TRIGGER IF NOT EXISTS job_matches_fts_delete AFTER DELETE ON job_matches "
+        "BEGIN DELETE FROM job_matches_fts WHERE rowid = old.id; END"
+    ).execute_if(dialect="sqlite"),
+)
+event.listen(
+    JobMatch.__table__,
+    "after_create",
+    DDL(
+        "CREATE TABLE IF NOT EXISTS job_matches_search ("
+        "match_id INTEGER PRIMARY KEY REFERENCES job_matches (id) ON DELETE CASCADE, "
+        "user_id INTEGER NOT NULL, "
+        "document TSVECTOR NOT NULL)"
+    ).execute_if(dialect="postgresql"),
+)
+event.listen(
+    JobMatch.__table__,
+    "after_create",
+    DDL(
+        "CREATE INDEX IF NOT EXISTS ix_job_matches_search_document "
+        "ON job_matches_search USING GIN (document)"
+    ).execute_if(dialect="postgresql"),
+)
+event.listen(
+    JobMatch.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS job_matches_fts").execute_if(dialect="sqlite"),
+)
+event.listen(
+    JobMatch.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS job_matches_search").execute_if(dialect="postgresql"),
+)
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
+from app.database import Base
+
+
+class JobMatchSkill(Base):
+    """Inverted index entry: one canonical skill mentioned by one saved match."""
+
+    __tablename__ = "job_match_skills"
+    __table_args__ = (
+        # skill -> matches lookups are always scoped to one user
+        Index("ix_job_match_skills_user_skill", "user_id", "skill"),
+    )
+
+    match_id = Column(Integer, ForeignKey("job_matches.id", ondelete="CASCADE"), primary_key=True)
+    skill = Column(String, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+
+
+class UserSkillCount(Base):
+    """Precomputed number of a user's saved matches that mention a skill."""
+
+    __tablename__ = "user_skill_counts"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    skill = Column(String, primary_key=True)
+    match_count = Column(Integer, default=0, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -8,7 +8,7 @@ class Resume(Base):
     __tablename__ = "resumes"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     filename = Column(String, nullable=False)
     content = Column(Text, nullable=True)
     analysis = Column(Text, nullable=True)
@@ -16,3 +16,7 @@ class Resume(Base):
 
     # Relationships
     user = relationship("User", back_populates="resumes")
+
+
+# "Latest resume" lookups, and listing a user's resumes.
+Index("ix_resumes_user_created_at", Resume.user_id, Resume.created_at.desc())
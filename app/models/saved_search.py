@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from app.database import Base
+
+
+class SavedSearch(Base):
+    """A JSearch query derived from the user's resume and refreshed off-peak."""
+
+    __tablename__ = "saved_searches"
+    __table_args__ = (
+        Index("ux_saved_searches_user_query", "user_id", "query", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    # Normalized query text, shared verbatim by every user with the same search
+    query = Column(String, nullable=False)
+    last_run_at = Column(DateTime, nullable=True, index=True)
+    last_new_count = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    # Relationships
+    user = relationship("User", back_populates="saved_searches")
@@ -0,0 +1,132 @@
+import json
+import math
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from sqlalchemy import and_, or_
+
+from app.models.job_match import JobMatch
+from app.services.taxonomy import normalize_text
+
+
+GAZETTEER_PATH = Path(__file__).resolve().parent.parent / "data" / "gazetteer.json"
+
+# Grid cell size in degrees (~35 miles north-south). Cells are numbered row by
+# row, so one latitude row of a search area is a single BETWEEN range.
+GEO_CELL_DEGREES = 0.5
+_CELLS_PER_ROW = 1000
+
+MILES_PER_DEGREE_LAT = 69.0
+
+Coordinates = Tuple[float, float]
+
+
+def geo_cell(lat: float, lon: float) -> int:
+    """Grid cell id of a coordinate."""
+    row = math.floor((lat + 90.0) / GEO_CELL_DEGREES)
+    col = math.floor((lon + 180.0) / GEO_CELL_DEGREES)
+    return row * _CELLS_PER_ROW + col
+
+
+class Gazetteer:
+    """Offline lookup of US cities and states to coordinates.
+
+    Cities are listed most populous first, so a city name without a state
+    resolves to its best-known namesake ("Portland" -> Portland, OR).
+    """
+
+    def __init__(self, data: Dict):
+        self._states: Dict[str, Coordinates] = {}
+        self._state_codes: Dict[str, str] = {}
+        for code, state in data["states"].items():
+            self._states[code] = (state["lat"], state["lon"])
+            self._state_codes[normalize_text(code)] = code
+            self._state_codes[normalize_text(state["name"])] = code
+
+        self._cities: Dict[Tuple[str, str], Coordinates] = {}
+        self._city_default: Dict[str, Coordinates] = {}
+        for name, state, lat, lon in data["cities"]:
+            key = normalize_text(name)
+            self._cities[(key, state)] = (lat, lon)
+            self._city_default.setdefault(key, (lat, lon))
+
+        self._aliases = {normalize_text(k): normalize_text(v) for k, v in data.get("aliases", {}).items()}
+
+    def state_code(self, state: str | None) -> str | None:
+        return self._state_codes.get(normalize_text(state))
+
+    def resolve_city(self, city: str | None, state: str | None = None) -> Coordinates | None:
+        """Coordinates of ``city`` (optionally in ``state``), or None if it is not listed."""
+        code = self.state_code(state)
+        key = normalize_text(city)
+        key = self._aliases.get(key, key)
+        if not key:
+            return None
+        if code:
+            return self._cities.get((key, code))
+        return self._city_default.get(key)
+
+    def resolve(self, city: str | None, state: str | None = None) -> Coordinates | None:
+        """Coordinates of ``city`` (optionally in ``state``), else of the state itself."""
+        code = self.state_code(state)
+        coords = self.resolve_city(city, state)
+        if coords is None and code:
+            return self._states[code]
+        return coords
+
+    def resolve_place(self, place: str) -> Coordinates | None:
+        """Resolve free text such as "Austin, TX", "Austin", "Texas" or "TX"."""
+        city, _, state = place.partition(",")
+        if state:
+            return self.resolve(city, state)
+        return self.resolve(city) or self.resolve(None, city)
+
+
+@lru_cache()
+def get_gazetteer() -> Gazetteer:
+    """Load (once) the bundled gazetteer."""
+    with open(GAZETTEER_PATH, encoding="utf-8") as fh:
+        return Gazetteer(json.load(fh))
+
+
+def locate_job(job: Dict) -> Dict[str, float | int | None]:
+    """Latitude, longitude and grid cell columns for a normalized job.
+
+    Only a known city gives coordinates. A state centroid can be hundreds of
+    miles from the job, so a job located by state alone gets none and stays
+    out of radius searches.
+    """
+    city = job.get("location")
+    if city and city == job.get("country"):
+        # JSearch falls back to the country when there is no city
+        city = None
+    coords = get_gazetteer().resolve_city(city, job.get("state"))
+    if coords is None:
+        return {"latitude": None, "longitude": None, "geo_cell": None}
+    return {"latitude": coords[0], "longitude": coords[1], "geo_cell": geo_cell(*coords)}
+
+
+def within_radius(center: Coordinates, miles: float):
+    """SQL condition for matches within ``miles`` of ``center``.
+
+    The grid cells covering the search box narrow rows through the
+    (user_id, geo_cell) index; an equirectangular distance check, which
+    needs no trig functions in SQL, then trims the box to a circle.
+    """
+
+    lat0, lon0 = center
+    dlat = miles / MILES_PER_DEGREE_LAT
+    cos_lat = max(math.cos(math.radians(lat0)), 0.01)
+    dlon = dlat / cos_lat
+
+    lo_row, lo_col = divmod(geo_cell(lat0 - dlat, lon0 - dlon), _CELLS_PER_ROW)
+    hi_row, hi_col = divmod(geo_cell(lat0 + dlat, lon0 + dlon), _CELLS_PER_ROW)
+    cell_ranges: List = [
+        JobMatch.geo_cell.between(row * _CELLS_PER_ROW + lo_col, row * _CELLS_PER_ROW + hi_col)
+        for row in range(lo_row, hi_row + 1)
+    ]
+
+    dy = JobMatch.latitude - lat0
+    dx = (JobMatch.longitude - lon0) * cos_lat
+    return and_(or_(*cell_ranges), dx * dx + dy * dy <= dlat * dlat)
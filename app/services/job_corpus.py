@@ -0,0 +1,73 @@
+from collections import Counter
+from typing import Any, Dict, Iterable, List
+
+from sqlalchemy.orm import Session
+
+from app.database import dialect_insert
+from app.models.job_corpus import JobCorpus, JobTermStat
+from app.services.job_scoring import CorpusStats, document_counts, tokenize
+
+
+# Keep IN (...) lists and multi-row statements below SQLite's parameter limit.
+TERM_CHUNK_SIZE = 500
+
+_CORPUS_ID = 1
+
+
+def record_postings(db: Session, jobs: Iterable[Dict[str, Any]]) -> None:
+    """Add newly seen distinct postings to the scoring statistics.
+
+    Call once per posting, the first time it is stored by anyone (its
+    description is new), so postings many users hold count once. Counts only
+    grow: they describe postings seen, not those still stored. The caller
+    commits.
+    """
+
+    frequencies: Counter = Counter()
+    documents = total_length = 0
+    for job in jobs:
+        counts, length = document_counts(job)
+        frequencies.update(counts.keys())
+        documents += 1
+        total_length += length
+    if not documents:
+        return
+
+    insert = dialect_insert(db)
+    rows: List[dict] = [{"term": term, "document_count": n} for term, n in frequencies.items()]
+    for start in range(0, len(rows), TERM_CHUNK_SIZE):
+        stmt = insert(JobTermStat).values(rows[start : start + TERM_CHUNK_SIZE])
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["term"],
+                set_={"document_count": JobTermStat.document_count + stmt.excluded.document_count},
+            )
+        )
+    stmt = insert(JobCorpus).values(id=_CORPUS_ID, documents=documents, total_length=total_length)
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["id"],
+            set_={
+                "documents": JobCorpus.documents + stmt.excluded.documents,
+                "total_length": JobCorpus.total_length + stmt.excluded.total_length,
+            },
+        )
+    )
+
+
+def load_corpus_stats(db: Session, profile_texts: Iterable[str]) -> CorpusStats:
+    """Load the statistics needed to score jobs against ``profile_texts``."""
+
+    terms = sorted({term for text in profile_texts for term in tokenize(text)})
+    totals = db.query(JobCorpus.documents, JobCorpus.total_length).filter(JobCorpus.id == _CORPUS_ID).first()
+    if totals is None or not terms:
+        return CorpusStats()
+
+    frequency: Dict[str, int] = {}
+    for start in range(0, len(terms), TERM_CHUNK_SIZE):
+        frequency.update(
+            db.query(JobTermStat.term, JobTermStat.document_count)
+            .filter(JobTermStat.term.in_(terms[start : start + TERM_CHUNK_SIZE]))
+            .all()
+        )
+    return CorpusStats(totals.documents, totals.total_length, frequency)
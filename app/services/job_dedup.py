@@ -0,0 +1,93 @@
+import re
+from typing import List, Dict, Any
+
+import numpy as np
+
+
+# Odd multiplier used to fold consecutive word hashes into one shingle hash.
+# All hash arithmetic is uint64 and deliberately wraps around.
+_SHINGLE_BASE = np.uint64(0x9E3779B97F4A7C15)
+
+_WORD_RE = re.compile(r"\w+")
+
+SHINGLE_SIZE = 3
+
+
+def _shingle_hashes(job: Dict[str, Any]) -> np.ndarray:
+    """Hash the word 3-grams of a job's title, company and description.
+
+    Words are hashed once and combined into shingle hashes with NumPy, so the
+    Python-level work is a single pass over the words. Python's ``hash`` is
+    only stable within a process, which is all a per-search filter needs.
+    """
+    text = " ".join(
+        part for part in (job.get("title"), job.get("company"), job.get("description")) if part
+    )
+    words = _WORD_RE.findall(text.lower()) or [""]
+    word_hashes = np.fromiter(map(hash, words), dtype=np.int64, count=len(words)).view(np.uint64)
+    if len(words) < SHINGLE_SIZE:
+        return word_hashes
+
+    shingles = np.zeros(len(words) - SHINGLE_SIZE + 1, dtype=np.uint64)
+    for offset in range(SHINGLE_SIZE):
+        window = word_hashes[offset : offset + len(shingles)]
+        shingles = shingles * _SHINGLE_BASE + window
+    return shingles
+
+
+class NearDuplicateFilter:
+    """Drop job postings that are near-copies of ones already seen.
+
+    Each posting gets a MinHash signature over its shingles. Signatures are
+    split into bands and bucketed (LSH), so a new posting is only compared
+    with the few earlier postings that share a bucket, keeping the whole pass
+    linear in the number of jobs. A posting whose estimated Jaccard similarity
+    with an earlier one reaches ``threshold`` is treated as a duplicate.
+
+    One instance is meant to live for one search, so duplicates are caught
+    across all of its batches.
+    """
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 64, bands: int = 16, seed: int = 218):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        rng = np.random.default_rng(seed)
+        self.threshold = threshold
+        self._rows = num_perm // bands
+        self._bands = bands
+        # Multiply-shift hashing: h(x) = (a * x + b) >> 32 with odd a.
+        self._a = rng.integers(0, 2**64 - 1, size=num_perm, dtype=np.uint64, endpoint=True) | np.uint64(1)
+        self._b = rng.integers(0, 2**64 - 1, size=num_perm, dtype=np.uint64, endpoint=True)
+        self._signatures: list[np.ndarray] = []
+        self._buckets: dict[tuple[int, bytes], list[int]] = {}
+
+    def signature(self, job: Dict[str, Any]) -> np.ndarray:
+        hashes = _shingle_hashes(job)
+        # (shingles x permutations) table of permuted hashes, minimum per permutation
+        return ((hashes[:, None] * self._a + self._b) >> np.uint64(32)).min(axis=0)
+
+    def _band_keys(self, signature: np.ndarray) -> list[tuple[int, bytes]]:
+        return [
+            (band, signature[band * self._rows : (band + 1) * self._rows].tobytes())
+            for band in range(self._bands)
+        ]
+
+    def is_duplicate(self, job: Dict[str, Any]) -> bool:
+        """Return True if ``job`` is a near-duplicate; otherwise remember it."""
+        signature = self.signature(job)
+        keys = self._band_keys(signature)
+
+        candidates = {idx for key in keys for idx in self._buckets.get(key, ())}
+        for idx in candidates:
+            if float(np.mean(self._signatures[idx] == signature)) >= self.threshold:
+                return True
+
+        idx = len(self._signatures)
+        self._signatures.append(signature)
+        for key in keys:
+            self._buckets.setdefault(key, []).append(idx)
+        return False
+
+    def filter(self, jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Return ``jobs`` without the near-duplicates, keeping the first copy."""
+        return [job for job in jobs if not self.is_duplicate(job)]
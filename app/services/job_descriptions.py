@@ -0,0 +1,113 @@
+import hashlib
+import zlib
+from datetime import datetime
+from typing import Dict, Iterable, Set, Tuple
+
+from sqlalchemy import delete, exists, select
+from sqlalchemy.orm import Session, aliased
+
+from app.database import dialect_insert
+from app.models.job_description import JobDescription
+from app.models.job_match import JobMatch
+from app.services.job_text_search import index_descriptions, unindex_descriptions
+
+
+# zlib level 6 is the usual speed/ratio balance; job descriptions shrink ~3x.
+COMPRESSION_LEVEL = 6
+
+# Keep each statement well below SQLite's bound-parameter limit.
+DESCRIPTION_CHUNK_SIZE = 500
+
+
+def content_hash(text: str) -> str:
+    """Return the key a description is deduplicated on."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def store_descriptions(db: Session, texts: Iterable[str | None]) -> Tuple[Dict[str, int], Set[str]]:
+    """Store each distinct non-empty text once.
+
+    Returns ``{content_hash: id}`` and the hashes this call stored. Texts
+    that are already stored (by any user) are only looked up, so they are
+    never compressed, written or indexed for search again. The caller
+    commits.
+    """
+
+    by_hash = {content_hash(text): text for text in texts if text}
+    hashes = list(by_hash)
+    ids: Dict[str, int] = {}
+    stored: Set[str] = set()
+    insert = dialect_insert(db)
+    now = datetime.utcnow()
+
+    for start in range(0, len(hashes), DESCRIPTION_CHUNK_SIZE):
+        chunk = hashes[start : start + DESCRIPTION_CHUNK_SIZE]
+        found = dict(
+            db.query(JobDescription.content_hash, JobDescription.id)
+            .filter(JobDescription.content_hash.in_(chunk))
+            .all()
+        )
+        missing = [h for h in chunk if h not in found]
+        if missing:
+            rows = []
+            for h in missing:
+                raw = by_hash[h].encode("utf-8")
+                rows.append({
+                    "content_hash": h,
+                    "compressed": zlib.compress(raw, COMPRESSION_LEVEL),
+                    "size": len(raw),
+                    "created_at": now,
+                })
+            stmt = (
+                insert(JobDescription)
+                .values(rows)
+                .on_conflict_do_nothing(index_elements=["content_hash"])
+                .returning(JobDescription.content_hash, JobDescription.id)
+            )
+            inserted = dict(db.execute(stmt).all())
+            index_descriptions(db, {i: by_hash[h] for h, i in inserted.items()})
+            found.update(inserted)
+            stored.update(inserted)
+            # Rows a concurrent writer inserted first are not returned; look them up.
+            raced = [h for h in missing if h not in found]
+            if raced:
+                found.update(
+                    db.query(JobDescription.content_hash, JobDescription.id)
+                    .filter(JobDescription.content_hash.in_(raced))
+                    .all()
+                )
+        ids.update(found)
+
+    return ids, stored
+
+
+def _orphaned(description):
+    return ~exists().where(JobMatch.description_id == description.id)
+
+
+def prune_orphan_descriptions(db: Session, batch_size: int = DESCRIPTION_CHUNK_SIZE) -> int:
+    """Delete descriptions no match points at any more, in committed batches.
+
+    The orphan check is part of the DELETE itself, so a description a
+    concurrent upsert has just attached a match to is kept.
+    """
+
+    candidate = aliased(JobDescription)
+    removed = 0
+    while True:
+        batch = select(candidate.id).where(_orphaned(candidate)).limit(batch_size)
+        deleted = dict(
+            db.execute(
+                delete(JobDescription)
+                .where(JobDescription.id.in_(batch), _orphaned(JobDescription))
+                .returning(JobDescription.id, JobDescription.compressed)
+                .execution_options(synchronize_session=False)
+            ).all()
+        )
+        if not deleted:
+            return removed
+        unindex_descriptions(
+            db, {i: zlib.decompress(compressed).decode("utf-8") for i, compressed in deleted.items()}
+        )
+        db.commit()
+        removed += len(deleted)
@@ -0,0 +1,354 @@
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Dict, Any
+
+import httpx
+
+from app.core.config import get_settings
+from app.services.taxonomy import normalize_text
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+JSEARCH_BASE_URL = "https://jsearch.p.rapidapi.com/search"
+
+FIXTURE_PATH = Path(__file__).resolve().parent.parent / "data" / "job_fixtures.json"
+
+# One keep-alive client shared by every JSearch call so concurrent page
+# requests reuse TCP/TLS connections instead of opening a new one each time.
+_client: httpx.AsyncClient | None = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared JSearch HTTP client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=settings.JSEARCH_TIMEOUT_SECONDS,
+            limits=httpx.Limits(
+                max_connections=settings.JSEARCH_MAX_CONCURRENCY,
+                max_keepalive_connections=settings.JSEARCH_MAX_CONCURRENCY,
+            ),
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the shared JSearch client (called on application shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _flatten_highlights(highlights: Dict[str, Any] | None) -> str:
+    """Join JSearch's ``job_highlights`` sections into one block of text."""
+    if not highlights:
+        return ""
+    lines: list[str] = []
+    for items in highlights.values():
+        lines.extend(str(item) for item in items or [])
+    return "\n".join(lines)
+
+
+# JSearch employment types mapped onto the values the UI filters by.
+_EMPLOYMENT_TYPES = {
+    "FULLTIME": "full-time",
+    "PARTTIME": "part-time",
+    "CONTRACTOR": "contract",
+    "INTERN": "internship",
+}
+
+
+def _normalize_employment_type(value: str | None) -> str | None:
+    if not value:
+        return None
+    return _EMPLOYMENT_TYPES.get(value.upper(), value.lower())
+
+
+def _parse_posted_at(item: Dict[str, Any]) -> datetime | None:
+    timestamp = item.get("job_posted_at_timestamp")
+    if timestamp:
+        try:
+            return datetime.utcfromtimestamp(int(timestamp))
+        except (TypeError, ValueError, OverflowError):
+            return None
+    return None
+
+
+def _normalize_job(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep only the core fields the UI and scoring need from a raw JSearch result."""
+    return {
+        "id": item.get("job_id"),
+        "title": item.get("job_title"),
+        "company": item.get("employer_name"),
+        "location": item.get("job_city") or item.get("job_country") or "",
+        "industry": item.get("job_industry"),
+        "url": item.get("job_apply_link") or item.get("job_google_link"),
+        "description": item.get("job_description") or "",
+        "highlights": _flatten_highlights(item.get("job_highlights")),
+        "employment_type": _normalize_employment_type(item.get("job_employment_type")),
+        "is_remote": item.get("job_is_remote"),
+        "salary_min": item.get("job_min_salary"),
+        "salary_max": item.get("job_max_salary"),
+        "salary_period": item.get("job_salary_period"),
+        "posted_at": _parse_posted_at(item),
+        "state": item.get("job_state"),
+        "country": item.get("job_country"),
+    }
+
+
+class ProviderError(Exception):
+    """A provider answered, but not with usable results."""
+
+
+class CircuitBreaker:
+    """Fail fast once a provider keeps failing.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    calls are rejected without waiting on the provider. Once
+    ``reset_seconds`` have passed a single trial call is let through: success
+    closes the breaker again, failure re-opens it. A trial that never reports
+    back (cancelled) re-opens it too, and a trial still unanswered after
+    another ``reset_seconds`` is superseded by a new one.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self._opened_at = 0.0
+        self._trial_started = 0.0
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        now = time.monotonic()
+        if self.state == "open" and now - self._opened_at >= self.reset_seconds:
+            self.state = "half_open"
+            self._trial_started = now
+            return True
+        if self.state == "half_open" and now - self._trial_started >= self.reset_seconds:
+            self._trial_started = now
+            return True
+        # Open, or half-open with the trial call still in flight
+        return False
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self.consecutive_failures = 0
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+            self._open()
+
+    def record_abandoned(self) -> None:
+        """The call ended without a result, e.g. it was cancelled."""
+        if self.state == "half_open":
+            self._open()
+
+    def _open(self) -> None:
+        self.state = "open"
+        self._opened_at = time.monotonic()
+
+
+@dataclass
+class ProviderHealth:
+    """Running call statistics for one provider."""
+
+    requests: int = 0
+    failures: int = 0
+    timeouts: int = 0
+    rejected: int = 0
+    total_latency_ms: float = 0.0
+    last_latency_ms: float | None = None
+    last_error: str | None = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["avg_latency_ms"] = round(self.total_latency_ms / self.requests, 2) if self.requests else None
+        if self.last_latency_ms is not None:
+            data["last_latency_ms"] = round(self.last_latency_ms, 2)
+        del data["total_latency_ms"]
+        return data
+
+
+class JobProvider:
+    """A source of job postings.
+
+    Subclasses implement :meth:`fetch_page`, returning jobs in the normalized
+    shape of :func:`_normalize_job` and raising on failure. Callers use
+    :meth:`search_page`, which adds the timeout, the circuit breaker and the
+    health bookkeeping and never raises.
+    """
+
+    name = "provider"
+    timeout_seconds = 10.0
+    max_concurrency = 8
+
+    def __init__(self):
+        self.breaker = CircuitBreaker(
+            settings.JOB_PROVIDER_FAILURE_THRESHOLD, settings.JOB_PROVIDER_RESET_SECONDS
+        )
+        self.health = ProviderHealth()
+
+    def is_configured(self) -> bool:
+        return True
+
+    async def fetch_page(self, query: str, page: int) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    async def search_page(self, query: str, page: int) -> List[Dict[str, Any]]:
+        """Fetch one page, returning [] on timeout, error or an open breaker."""
+
+        if not self.breaker.allow():
+            self.health.rejected += 1
+            return []
+
+        started = time.perf_counter()
+        self.health.requests += 1
+        try:
+            jobs = await asyncio.wait_for(self.fetch_page(query, page), self.timeout_seconds)
+        except asyncio.TimeoutError:
+            self.health.timeouts += 1
+            self._record_failure(started, "timeout")
+            return []
+        except (ProviderError, httpx.HTTPError, ValueError) as exc:
+            self._record_failure(started, str(exc) or type(exc).__name__)
+            return []
+        except Exception as exc:
+            logger.exception("Job provider %s failed unexpectedly", self.name)
+            self._record_failure(started, str(exc) or type(exc).__name__)
+            return []
+        except BaseException:
+            # Cancelled: no verdict on the provider, but a trial call must not
+            # leave the breaker half-open for good
+            self.breaker.record_abandoned()
+            raise
+
+        self.health.last_latency_ms = (time.perf_counter() - started) * 1000
+        self.health.total_latency_ms += self.health.last_latency_ms
+        self.breaker.record_success()
+        return jobs
+
+    def _record_failure(self, started: float, error: str) -> None:
+        self.health.last_latency_ms = (time.perf_counter() - started) * 1000
+        self.health.total_latency_ms += self.health.last_latency_ms
+        self.health.failures += 1
+        self.health.last_error = error
+        self.breaker.record_failure()
+        if self.breaker.state == "open":
+            logger.warning("Job provider %s circuit open after: %s", self.name, error)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "configured": self.is_configured(),
+            "circuit": self.breaker.state,
+            **self.health.as_dict(),
+        }
+
+
+class JSearchProvider(JobProvider):
+    """RapidAPI JSearch over the shared keep-alive client."""
+
+    name = "jsearch"
+
+    def __init__(self):
+        super().__init__()
+        self.timeout_seconds = settings.JSEARCH_TIMEOUT_SECONDS
+        self.max_concurrency = settings.JSEARCH_MAX_CONCURRENCY
+
+    def is_configured(self) -> bool:
+        return bool(settings.JSEARCH_API_KEY)
+
+    async def fetch_page(self, query: str, page: int) -> List[Dict[str, Any]]:
+        params = {
+            "query": query,
+            "page": page,
+            "num_pages": 1,
+            "country": "us",
+        }
+
+        headers = {
+            "x-rapidapi-key": settings.JSEARCH_API_KEY,
+            "x-rapidapi-host": settings.JSEARCH_API_HOST,
+        }
+
+        resp = await get_http_client().get(JSEARCH_BASE_URL, headers=headers, params=params)
+        if resp.status_code != 200:
+            raise ProviderError(f"HTTP {resp.status_code}")
+        return [_normalize_job(item) for item in resp.json().get("data", [])]
+
+
+class FixtureProvider(JobProvider):
+    """Serves JSearch-shaped postings from a local JSON file.
+
+    Useful offline and in development: a posting matches when every query
+    word appears in its title or description.
+    """
+
+    name = "fixture"
+    timeout_seconds = 1.0
+    page_size = 10
+
+    def __init__(self, path: str | Path | None = None):
+        super().__init__()
+        self.path = Path(path or settings.JOB_FIXTURE_PATH or FIXTURE_PATH)
+        self._jobs: List[tuple[str, Dict[str, Any]]] | None = None
+
+    def is_configured(self) -> bool:
+        return self.path.exists()
+
+    def _load(self) -> List[tuple[str, Dict[str, Any]]]:
+        if self._jobs is None:
+            with open(self.path, encoding="utf-8") as fh:
+                items = json.load(fh)
+            self._jobs = [
+                (f" {normalize_text(item.get('job_title'))} {normalize_text(item.get('job_description'))} ",
+                 _normalize_job(item))
+                for item in items
+            ]
+        return self._jobs
+
+    async def fetch_page(self, query: str, page: int) -> List[Dict[str, Any]]:
+        words = normalize_text(query).split()
+        matches = [
+            dict(job) for text, job in self._load()
+            if all(f" {word} " in text for word in words)
+        ]
+        start = (page - 1) * self.page_size
+        return matches[start : start + self.page_size]
+
+
+# Provider name (as used in JOB_PROVIDERS) -> implementation
+PROVIDER_CLASSES = {
+    JSearchProvider.name: JSearchProvider,
+    FixtureProvider.name: FixtureProvider,
+}
+
+
+@lru_cache()
+def get_providers() -> List[JobProvider]:
+    """Instantiate (once) the providers listed in ``JOB_PROVIDERS``."""
+    providers = []
+    for name in settings.JOB_PROVIDERS:
+        provider_class = PROVIDER_CLASSES.get(name)
+        if provider_class is None:
+            logger.warning("Unknown job provider %r in JOB_PROVIDERS", name)
+            continue
+        providers.append(provider_class())
+    return providers
+
+
+def active_providers() -> List[JobProvider]:
+    """The configured providers that can currently be queried."""
+    return [provider for provider in get_providers() if provider.is_configured()]
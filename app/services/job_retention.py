@@ -0,0 +1,152 @@
+import asyncio
+import gzip
+import json
+import logging
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import List, Dict
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.database import SessionLocal
+from app.models.job_match import JobMatch
+from app.services.job_descriptions import prune_orphan_descriptions
+from app.services.skill_gap import forget_match_skills
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialise {type(value).__name__}")
+
+
+def _archive_matches(db: Session, user_id: int, match_ids: List[int], archive_dir: str) -> None:
+    """Append the given matches to today's gzipped NDJSON archive for the user.
+
+    Each call adds a new gzip member to the file, which ``gzip``/``zcat``
+    read back as one continuous stream.
+    """
+
+    directory = Path(archive_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"job_matches_user{user_id}_{datetime.utcnow():%Y%m%d}.ndjson.gz"
+
+    columns = JobMatch.__table__.columns
+    matches = db.query(JobMatch).filter(JobMatch.id.in_(match_ids)).order_by(JobMatch.id)
+    with gzip.open(path, "at", encoding="utf-8") as fh:
+        for match in matches:
+            record = {column.name: getattr(match, column.key) for column in columns}
+            fh.write(json.dumps(record, default=_json_default) + "\n")
+
+
+def _delete_batch(db: Session, user_id: int, match_ids: List[int], archive_dir: str) -> None:
+    if archive_dir:
+        _archive_matches(db, user_id, match_ids, archive_dir)
+    forget_match_skills(db, user_id, match_ids)
+    # Full-text entries go with the rows (SQLite trigger / Postgres cascade).
+    db.query(JobMatch).filter(JobMatch.id.in_(match_ids)).delete(synchronize_session=False)
+    db.commit()
+
+
+def _oldest_match_ids(db: Session, user_id: int, limit: int, before: datetime | None = None) -> List[int]:
+    query = db.query(JobMatch.id).filter(JobMatch.user_id == user_id)
+    if before is not None:
+        query = query.filter(JobMatch.created_at < before)
+    return [match_id for (match_id,) in query.order_by(JobMatch.created_at, JobMatch.id).limit(limit)]
+
+
+def compact_user_matches(
+    db: Session,
+    user_id: int,
+    max_per_user: int,
+    max_age_days: int,
+    batch_size: int,
+    archive_dir: str = "",
+) -> int:
+    """Apply the retention policy to one user's matches and return how many were removed.
+
+    Matches older than ``max_age_days`` go first, then the oldest matches
+    beyond ``max_per_user``. Work is done (and committed) ``batch_size`` rows
+    at a time so no single transaction holds the write lock for long.
+    """
+
+    removed = 0
+
+    if max_age_days > 0:
+        cutoff = datetime.utcnow() - timedelta(days=max_age_days)
+        while match_ids := _oldest_match_ids(db, user_id, batch_size, before=cutoff):
+            _delete_batch(db, user_id, match_ids, archive_dir)
+            removed += len(match_ids)
+
+    if max_per_user > 0:
+        count = db.query(func.count(JobMatch.id)).filter(JobMatch.user_id == user_id).scalar() or 0
+        excess = count - max_per_user
+        while excess > 0:
+            match_ids = _oldest_match_ids(db, user_id, min(excess, batch_size))
+            if not match_ids:
+                break
+            _delete_batch(db, user_id, match_ids, archive_dir)
+            removed += len(match_ids)
+            excess -= len(match_ids)
+
+    return removed
+
+
+def compact_job_matches(
+    db: Session,
+    max_per_user: int | None = None,
+    max_age_days: int | None = None,
+    batch_size: int | None = None,
+    archive_dir: str | None = None,
+) -> Dict[int, int]:
+    """Run :func:`compact_user_matches` for every user with matches.
+
+    Limits default to the ``JOB_MATCH_*`` settings. Descriptions no longer
+    used by any match are dropped afterwards. Returns the number of removed
+    matches per user, omitting users that were already within policy.
+    """
+
+    options = {
+        "max_per_user": settings.JOB_MATCH_MAX_PER_USER if max_per_user is None else max_per_user,
+        "max_age_days": settings.JOB_MATCH_MAX_AGE_DAYS if max_age_days is None else max_age_days,
+        "batch_size": max(1, settings.JOB_MATCH_COMPACTION_BATCH_SIZE if batch_size is None else batch_size),
+        "archive_dir": settings.JOB_MATCH_ARCHIVE_DIR if archive_dir is None else archive_dir,
+    }
+
+    user_ids = [user_id for (user_id,) in db.query(JobMatch.user_id).distinct()]
+    removed: Dict[int, int] = {}
+    for user_id in user_ids:
+        count = compact_user_matches(db, user_id, **options)
+        if count:
+            removed[user_id] = count
+
+    # Also catches descriptions left behind by matches users deleted themselves.
+    prune_orphan_descriptions(db, options["batch_size"])
+    return removed
+
+
+def _compact_once() -> Dict[int, int]:
+    db = SessionLocal()
+    try:
+        return compact_job_matches(db)
+    finally:
+        db.close()
+
+
+async def run_compaction_loop(interval_seconds: int) -> None:
+    """Periodically compact job matches in a worker thread until cancelled."""
+
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            removed = await asyncio.to_thread(_compact_once)
+        except Exception:
+            logger.exception("Job match compaction failed")
+            continue
+        if removed:
+            logger.info("Compacted %d job matches for %d users", sum(removed.values()), len(removed))
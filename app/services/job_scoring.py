@@ -0,0 +1,150 @@
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Tuple
+
+import numpy as np
+
+
+# BM25 term-frequency saturation and length normalisation parameters.
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Title words are repeated so a title hit outweighs a passing mention.
+TITLE_WEIGHT = 3
+
+# Average posting length (scoring terms) assumed until postings have been seen.
+DEFAULT_AVERAGE_LENGTH = 250.0
+
+# Two or more characters, keeping terms like "c++", "c#" and "node.js" intact.
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]+(?:\.[a-z0-9]+)*")
+
+_STOPWORDS = frozenset(
+    """
+    a about above after all also an and any are as at be been being but by can
+    could did do does for from had has have having he her him his how i if in
+    into is it its just may me more most my no not of on or our out over own she
+    should so some such than that the their them then there these they this
+    those through to too under up us very was we were what when where which while
+    who will with within would you your
+    """.split()
+)
+
+
+def tokenize(text: str | None) -> List[str]:
+    """Lowercase ``text`` and split it into scoring terms, dropping stopwords."""
+    if not text:
+        return []
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+def build_resume_profile(resume) -> str:
+    """Return the text that represents the user when ranking jobs."""
+    if resume is None:
+        return ""
+    return f"{resume.content or ''}\n{resume.analysis or ''}"
+
+
+def job_document(job: Dict[str, Any]) -> str:
+    """Concatenate the searchable text of a job (title, description, highlights)."""
+    title = job.get("title") or ""
+    parts = [title] * TITLE_WEIGHT
+    parts.append(job.get("description") or "")
+    parts.append(job.get("highlights") or "")
+    return "\n".join(parts)
+
+
+@dataclass
+class CorpusStats:
+    """Term statistics over all distinct postings seen so far (see job_corpus).
+
+    Scores use these instead of the batch being scored, so a job scores the
+    same whichever page or search it arrives with. With no postings seen
+    every term weighs the same.
+    """
+
+    documents: int = 0
+    total_length: int = 0
+    document_frequency: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def average_length(self) -> float:
+        if not self.documents:
+            return DEFAULT_AVERAGE_LENGTH
+        return max(self.total_length / self.documents, 1.0)
+
+
+def document_counts(job: Dict[str, Any]) -> Tuple[Counter, int]:
+    """Return a job's scoring-term counts (no stopwords) and its length in terms."""
+    # Count tokens in C, then drop the few distinct stopwords.
+    counts = Counter(_TOKEN_RE.findall(job_document(job).lower()))
+    for stopword in _STOPWORDS & counts.keys():
+        del counts[stopword]
+    return counts, sum(counts.values())
+
+
+def score_jobs(
+    profile_text: str, jobs: List[Dict[str, Any]], corpus: CorpusStats | None = None
+) -> np.ndarray:
+    """Score every job against the resume profile in one vectorised pass.
+
+    The profile is treated as a weighted BM25 query: each job becomes a row of
+    BM25 term weights over the profile vocabulary, and the scores are the
+    matrix-vector product with the profile's IDF-weighted term vector. IDF and
+    the average length come from ``corpus``, never from ``jobs``, so scores
+    stored from different searches stay comparable. Scores are normalised to
+    ``[0, 1]`` by the best achievable score for the profile.
+    """
+
+    if not jobs:
+        return np.zeros(0, dtype=np.float32)
+
+    query_counts = Counter(tokenize(profile_text))
+    if not query_counts:
+        return np.zeros(len(jobs), dtype=np.float32)
+
+    corpus = corpus or CorpusStats()
+    vocab = {term: i for i, term in enumerate(query_counts)}
+    doc_tf = np.zeros((len(jobs), len(vocab)), dtype=np.float32)
+    doc_len = np.empty(len(jobs), dtype=np.float32)
+
+    rows: list[int] = []
+    cols: list[int] = []
+    values: list[int] = []
+    for row, job in enumerate(jobs):
+        # Only touch the terms shared with the profile.
+        counts, doc_len[row] = document_counts(job)
+        for term in vocab.keys() & counts.keys():
+            rows.append(row)
+            cols.append(vocab[term])
+            values.append(counts[term])
+    doc_tf[rows, cols] = values
+
+    n_docs = corpus.documents
+    df = np.fromiter(
+        (min(corpus.document_frequency.get(t, 0), n_docs) for t in vocab), dtype=np.float32, count=len(vocab)
+    )
+    idf = np.log((n_docs - df + 0.5) / (df + 0.5) + 1.0)
+
+    length_norm = BM25_K1 * (1.0 - BM25_B + BM25_B * doc_len / corpus.average_length)
+    bm25 = doc_tf * (BM25_K1 + 1.0) / (doc_tf + length_norm[:, None])
+
+    query_tf = np.fromiter((query_counts[t] for t in vocab), dtype=np.float32, count=len(vocab))
+    query_weights = idf * (1.0 + np.log(query_tf))
+
+    ideal = float((BM25_K1 + 1.0) * query_weights.sum())
+    if ideal <= 0.0 or not math.isfinite(ideal):
+        return np.zeros(len(jobs), dtype=np.float32)
+
+    return (bm25 @ query_weights) / ideal
+
+
+def attach_scores(
+    profile_text: str, jobs: List[Dict[str, Any]], corpus: CorpusStats | None = None
+) -> List[Dict[str, Any]]:
+    """Set ``job["score"]`` on each job from :func:`score_jobs` and return the list."""
+    scores = score_jobs(profile_text, jobs, corpus)
+    for job, score in zip(jobs, scores.tolist()):
+        job["score"] = round(score, 4)
+    return jobs
@@ -1,28 +1,20 @@
-import httpx
-from typing import List, Dict, Any
+import asyncio
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, AsyncIterator
 from app.core.config import get_settings
+from app.services.job_dedup import NearDuplicateFilter
+from app.services.job_providers import JobProvider, active_providers
+from app.services.taxonomy import normalize_text
 
 
 settings = get_settings()
 
+# (provider, normalized query, page) -> (expiry on the monotonic clock, jobs), in LRU order
+_page_cache: "OrderedDict[tuple[str, str, int], tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
 
-async def search_jobs_with_jsearch(
-    title: str,
-    company: str | None = None,
-    industry: str | None = None,
-    location: str | None = None,
-    num_pages: int = 1,
-) -> List[Dict[str, Any]]:
-    """Call RapidAPI JSearch to search for jobs.
-
-    This focuses on the core fields you need for the UI.
-    """
-
-    if not settings.JSEARCH_API_KEY:
-        return []
-
-    base_url = "https://jsearch.p.rapidapi.com/search"
 
+def _build_query(title: str, company: str | None, industry: str | None) -> str:
     query_parts: list[str] = []
     if title:
         query_parts.append(title)
@@ -31,49 +23,174 @@ async def search_jobs_with_jsearch(
     if industry:
         query_parts.append(industry)
 
-    query = " ".join(query_parts).strip()
+    # Normalized (lowercase, single-spaced) so equivalent searches share cache entries
+    return normalize_text(" ".join(query_parts)) or "software engineer"
+
+
+def _cached_page(key: tuple[str, str, int]) -> List[Dict[str, Any]] | None:
+    entry = _page_cache.get(key)
+    if entry is None:
+        return None
+    expires_at, jobs = entry
+    if expires_at < time.monotonic():
+        del _page_cache[key]
+        return None
+    _page_cache.move_to_end(key)
+    # Callers annotate jobs (e.g. with scores), so hand out copies.
+    return [dict(job) for job in jobs]
+
+
+def _store_page(key: tuple[str, str, int], jobs: List[Dict[str, Any]]) -> None:
+    if settings.JSEARCH_CACHE_TTL_SECONDS <= 0:
+        return
+    _page_cache[key] = (
+        time.monotonic() + settings.JSEARCH_CACHE_TTL_SECONDS,
+        [dict(job) for job in jobs],
+    )
+    _page_cache.move_to_end(key)
+    while len(_page_cache) > settings.JSEARCH_CACHE_MAX_ENTRIES:
+        _page_cache.popitem(last=False)
+
+
+async def _fetch_provider_page(
+    provider: JobProvider,
+    query: str,
+    page: int,
+    semaphore: asyncio.Semaphore,
+) -> List[Dict[str, Any]]:
+    """Fetch one provider's results page, returning [] on any failure.
+
+    Successful pages are kept in a small in-process TTL cache keyed by the
+    normalized query, so repeated searches skip the network entirely.
+    """
+
+    key = (provider.name, query, page)
+    cached = _cached_page(key)
+    if cached is not None:
+        return cached
+
+    async with semaphore:
+        jobs = await provider.search_page(query, page)
+
+    if jobs:
+        _store_page(key, jobs)
+    return jobs
+
+
+async def _fetch_page(
+    providers: List[JobProvider],
+    query: str,
+    page: int,
+    semaphores: Dict[str, asyncio.Semaphore],
+) -> List[Dict[str, Any]]:
+    """Ask every provider for the same page at once and merge their answers.
+
+    Each provider has its own timeout and circuit breaker, so a slow or
+    failing provider costs at most its timeout and never hides the others.
+    """
+
+    pages = await asyncio.gather(
+        *(_fetch_provider_page(p, query, page, semaphores[p.name]) for p in providers)
+    )
+    return [job for jobs in pages for job in jobs]
 
-    # Ask JSearch for many pages to approach 500+ results when available.
-    params = {
-        "query": query or "software engineer",
-        "page": 1,
-        "num_pages": num_pages,
-        "country": "us",
-    }
 
-    headers = {
-        "x-rapidapi-key": settings.JSEARCH_API_KEY,
-        "x-rapidapi-host": settings.JSEARCH_API_HOST,
-    }
+def _semaphores(providers: List[JobProvider]) -> Dict[str, asyncio.Semaphore]:
+    return {p.name: asyncio.Semaphore(max(1, p.max_concurrency)) for p in providers}
 
+
+async def iter_job_batches(
+    titles: List[str],
+    num_pages: int = 1,
+    industry: str | None = None,
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Fetch every (title, page) pair concurrently and yield deduplicated batches.
+
+    Pages are requested in parallel from every active provider (each bounded
+    by its own concurrency limit) and each batch is yielded as soon as its
+    page arrives from all providers, with jobs already
+    seen in an earlier batch removed. Reposts of the same role under a
+    different job id are collapsed by a MinHash near-duplicate filter.
+    """
+
+    providers = active_providers()
+    if not providers or not titles:
+        return
+
+    pages_per_title = max(1, num_pages // len(titles)) if num_pages > 1 else 1
+    semaphores = _semaphores(providers)
+
+    tasks = [
+        asyncio.create_task(_fetch_page(providers, _build_query(title, None, industry), page, semaphores))
+        for title in titles
+        for page in range(1, pages_per_title + 1)
+    ]
+
+    seen_ids: set[str] = set()
+    near_duplicates = (
+        NearDuplicateFilter(threshold=settings.JOB_NEAR_DUPLICATE_THRESHOLD)
+        if settings.JOB_NEAR_DUPLICATE_THRESHOLD
+        else None
+    )
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            resp = await client.get(base_url, headers=headers, params=params)
-    except httpx.TimeoutException:
-        # Network timeout when calling JSearch; surface as no jobs so the UI
-        # can show a friendly error instead of a 500 traceback.
-        return []
-    except httpx.HTTPError:
-        # Any other HTTP client error, also treated as "no jobs".
-        return []
+        for next_done in asyncio.as_completed(tasks):
+            jobs = await next_done
+            batch: List[Dict[str, Any]] = []
+            for job in jobs:
+                job_id = str(job.get("id") or "")
+                if job_id and job_id in seen_ids:
+                    continue
+                if job_id:
+                    seen_ids.add(job_id)
+                batch.append(job)
+            if near_duplicates is not None:
+                batch = near_duplicates.filter(batch)
+            if batch:
+                yield batch
+    finally:
+        # If the consumer stops early, don't leave page requests running.
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+async def search_jobs_for_titles(
+    titles: List[str],
+    num_pages: int = 1,
+    industry: str | None = None,
+) -> List[Dict[str, Any]]:
+    """Search all titles concurrently and return the merged, deduplicated jobs."""
+
+    jobs: List[Dict[str, Any]] = []
+    async for batch in iter_job_batches(titles, num_pages=num_pages, industry=industry):
+        jobs.extend(batch)
+    return jobs
 
-    if resp.status_code != 200:
+
+async def search_jobs_with_jsearch(
+    title: str,
+    company: str | None = None,
+    industry: str | None = None,
+    location: str | None = None,
+    num_pages: int = 1,
+) -> List[Dict[str, Any]]:
+    """Search the configured job providers (JSearch by default) for one query.
+
+    This focuses on the core fields you need for the UI. Pages are fetched
+    concurrently from every provider rather than in one slow request.
+    """
+
+    providers = active_providers()
+    if not providers:
         return []
 
-    data = resp.json()
-    results = data.get("data", [])
+    query = _build_query(title, company, industry)
+    semaphores = _semaphores(providers)
+    pages = await asyncio.gather(
+        *(_fetch_page(providers, query, page, semaphores) for page in range(1, max(1, num_pages) + 1))
+    )
 
     jobs: List[Dict[str, Any]] = []
-    for item in results:
-        jobs.append(
-            {
-                "id": item.get("job_id"),
-                "title": item.get("job_title"),
-                "company": item.get("employer_name"),
-                "location": item.get("job_city") or item.get("job_country") or "",
-                "industry": item.get("job_industry"),
-                "url": item.get("job_apply_link") or item.get("job_google_link"),
-            }
-        )
-
+    for page_jobs in pages:
+        jobs.extend(page_jobs)
     return jobs
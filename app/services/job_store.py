@@ -0,0 +1,146 @@
+from datetime import datetime
+from typing import List, Dict, Any
+
+from sqlalchemy.orm import Session
+
+from app.database import dialect_insert
+from app.models.job_match import JobMatch
+from app.services.geo import locate_job
+from app.services.job_corpus import record_postings
+from app.services.job_descriptions import content_hash, store_descriptions
+from app.services.job_text_search import index_job_matches
+from app.services.skill_gap import extract_job_skills, index_match_skills
+
+
+# Keep each statement well below SQLite's bound-parameter limit.
+UPSERT_CHUNK_SIZE = 500
+
+
+# Columns overwritten when a search returns a posting the user already has.
+REFRESHED_COLUMNS = (
+    "title",
+    "company",
+    "location",
+    "url",
+    "score",
+    "employment_type",
+    "is_remote",
+    "salary_min",
+    "salary_max",
+    "salary_period",
+    "posted_at",
+    "state",
+    "country",
+    "description_id",
+    "latitude",
+    "longitude",
+    "geo_cell",
+)
+
+
+def match_key(job: Dict[str, Any]) -> str:
+    """The key a user's match is deduplicated on.
+
+    The provider's job id when it has one; otherwise a hash of the fields
+    that identify a posting, so id-less jobs are not stored again each time
+    a search returns them.
+    """
+    if job.get("id"):
+        return str(job["id"])
+    identity = "\x1f".join(str(job.get(name) or "") for name in ("title", "company", "location", "url"))
+    return f"derived:{content_hash(identity)}"
+
+
+def upsert_job_matches(
+    db: Session, user_id: int, jobs: List[Dict[str, Any]], only_new: bool = False
+) -> List[Dict[str, Any]]:
+    """Insert or refresh the user's matches for ``jobs`` in bulk.
+
+    Jobs are keyed on (user_id, external_id), so running the same search
+    twice updates the existing rows instead of duplicating them; jobs
+    without a provider id are keyed on :func:`match_key`. With
+    ``only_new`` postings the user already has are left untouched and
+    not returned. The full-text and skill indexes are refreshed for the
+    stored rows (new descriptions are indexed once, when first stored), and
+    postings nobody stored before are added to the scoring statistics. Returns the stored matches (including ids) in the API
+    shape. The caller commits.
+    """
+
+    description_ids, new_descriptions = store_descriptions(db, (job.get("description") for job in jobs))
+    # A posting whose description nobody stored before is new to the scoring corpus
+    first_seen: dict[str, dict] = {}
+    for job in jobs:
+        description = job.get("description")
+        key = content_hash(description) if description else None
+        if key in new_descriptions:
+            first_seen.setdefault(key, job)
+    record_postings(db, first_seen.values())
+
+    rows_by_key: dict[str, dict] = {}
+    now = datetime.utcnow()
+    for job in jobs:
+        external_id = match_key(job)
+        description = job.get("description")
+        row = {
+            "user_id": user_id,
+            "external_id": external_id,
+            "title": job.get("title") or "Untitled role",
+            "company": job.get("company") or "Unknown company",
+            "location": job.get("location") or "",
+            "url": job.get("url"),
+            "score": job.get("score") or 0.0,
+            "employment_type": job.get("employment_type"),
+            "is_remote": job.get("is_remote"),
+            "salary_min": job.get("salary_min"),
+            "salary_max": job.get("salary_max"),
+            "salary_period": job.get("salary_period"),
+            "posted_at": job.get("posted_at"),
+            "state": job.get("state"),
+            "country": job.get("country"),
+            "description_id": description_ids[content_hash(description)] if description else None,
+            **locate_job(job),
+            "created_at": now,
+        }
+        # ON CONFLICT can't touch the same row twice in one statement.
+        rows_by_key[external_id] = row
+
+    rows = list(rows_by_key.values())
+    if not rows:
+        return []
+
+    insert = dialect_insert(db)
+    stored: list[dict] = []
+    for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        stmt = insert(JobMatch).values(rows[start : start + UPSERT_CHUNK_SIZE])
+        if only_new:
+            stmt = stmt.on_conflict_do_nothing(index_elements=["user_id", "external_id"])
+        else:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["user_id", "external_id"],
+                set_={name: stmt.excluded[name] for name in REFRESHED_COLUMNS},
+            )
+        stmt = stmt.returning(
+            JobMatch.id,
+            JobMatch.external_id,
+            JobMatch.title,
+            JobMatch.company,
+            JobMatch.location,
+            JobMatch.url,
+            JobMatch.score,
+        )
+        stored.extend(dict(row._mapping) for row in db.execute(stmt))
+
+    jobs_by_key = {match_key(job): job for job in jobs}
+    index_job_matches(db, user_id, stored)
+    index_match_skills(
+        db,
+        user_id,
+        {
+            match["id"]: extract_job_skills(jobs_by_key[match["external_id"]])
+            for match in stored
+        },
+    )
+
+    for match in stored:
+        del match["external_id"]
+    return stored
@@ -0,0 +1,210 @@
+import re
+from typing import List, Dict, Any
+
+from sqlalchemy import Float, column, text
+from sqlalchemy.orm import Session
+
+from app.models.job_match import JobMatch
+
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+# Relative weight of each indexed field when ranking results. Descriptions
+# are indexed once per distinct text in their own table, at weight 1.0.
+_SQLITE_BM25_WEIGHTS = "0.0, 10.0, 5.0, 3.0"  # owner, title, company, location
+
+
+def _owner_token(user_id: int) -> str:
+    # Indexing the owner as a term lets the full-text index itself narrow
+    # results to one user instead of filtering every matching row afterwards.
+    return f"owner{user_id}"
+
+
+def _is_postgres(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def index_job_matches(db: Session, user_id: int, matches: List[Dict[str, Any]]) -> None:
+    """Add (or refresh) full-text entries for freshly stored matches.
+
+    ``matches`` must carry the stored ``id`` plus title, company and
+    location. Deleting a match removes its entry automatically. The match's
+    description is searched through its shared ``description_id`` entry (see
+    :func:`index_descriptions`).
+    """
+
+    if not matches:
+        return
+
+    rows = [
+        {
+            "id": m["id"],
+            "user_id": user_id,
+            "owner": _owner_token(user_id),
+            "title": m.get("title") or "",
+            "company": m.get("company") or "",
+            "location": m.get("location") or "",
+        }
+        for m in matches
+    ]
+
+    if _is_postgres(db):
+        db.execute(
+            text(
+                "INSERT INTO job_matches_search (match_id, user_id, document) VALUES ("
+                ":id, :user_id, "
+                "to_tsvector('simple', :owner) "
+                "|| setweight(to_tsvector('english', :title), 'A') "
+                "|| setweight(to_tsvector('english', :company), 'B') "
+                "|| setweight(to_tsvector('english', :location), 'C')) "
+                "ON CONFLICT (match_id) DO UPDATE SET document = excluded.document"
+            ),
+            rows,
+        )
+        return
+
+    # FTS5 has no upsert, so clear any entries for re-stored matches first.
+    db.execute(text("DELETE FROM job_matches_fts WHERE rowid = :id"), rows)
+    db.execute(
+        text(
+            "INSERT INTO job_matches_fts (rowid, owner, title, company, location) "
+            "VALUES (:id, :owner, :title, :company, :location)"
+        ),
+        rows,
+    )
+
+
+def index_descriptions(db: Session, descriptions: Dict[int, str]) -> None:
+    """Index newly stored descriptions, once per ``job_descriptions`` row.
+
+    The SQLite table is contentless: it keeps only the inverted index, not a
+    copy of the text, so entries must be removed with
+    :func:`unindex_descriptions` before their rows are deleted.
+    """
+
+    if not descriptions:
+        return
+    rows = [{"id": description_id, "description": body} for description_id, body in descriptions.items()]
+
+    if _is_postgres(db):
+        db.execute(
+            text(
+                "INSERT INTO job_descriptions_search (description_id, document) VALUES ("
+                ":id, setweight(to_tsvector('english', :description), 'D')) "
+                "ON CONFLICT (description_id) DO NOTHING"
+            ),
+            rows,
+        )
+        return
+
+    db.execute(text("INSERT INTO job_descriptions_fts (rowid, description) VALUES (:id, :description)"), rows)
+
+
+def unindex_descriptions(db: Session, descriptions: Dict[int, str]) -> None:
+    """Drop the entries of descriptions about to be deleted.
+
+    A contentless FTS5 table can only forget a row given its original text.
+    Postgres entries go with their rows (ON DELETE CASCADE).
+    """
+
+    if not descriptions or _is_postgres(db):
+        return
+    db.execute(
+        text(
+            "INSERT INTO job_descriptions_fts (job_descriptions_fts, rowid, description) "
+            "VALUES ('delete', :id, :description)"
+        ),
+        [{"id": description_id, "description": body} for description_id, body in descriptions.items()],
+    )
+
+
+def _quoted_terms(query: str) -> List[str]:
+    """Free text as safe FTS5 prefix-match terms."""
+    return [f'"{term}"*' for term in _TERM_RE.findall(query)]
+
+
+def _fields_query(user_id: int, terms: str) -> str:
+    return f"owner : {_owner_token(user_id)} AND {{title company location}} : ({terms})"
+
+
+def search_job_matches(db: Session, user_id: int, query: str, limit: int = 50) -> List[Dict[str, Any]]:
+    """Return the user's matches that match ``query``, most relevant first."""
+
+    columns = "m.id, m.title, m.company, m.location, m.url, m.score, m.created_at"
+    # Typed result columns so values (e.g. created_at) come back like ORM queries.
+    result_columns = (
+        JobMatch.id,
+        JobMatch.title,
+        JobMatch.company,
+        JobMatch.location,
+        JobMatch.url,
+        JobMatch.score,
+        JobMatch.created_at,
+        column("rank", Float),
+    )
+
+    if _is_postgres(db):
+        terms = _TERM_RE.findall(query)
+        if not terms:
+            return []
+        # A match's own entry and its shared description are searched as one
+        # document, so terms may be split between them.
+        result = db.execute(
+            text(
+                f"SELECT {columns}, ts_rank(m.document, m.query) AS rank FROM ("
+                f"SELECT {columns}, s.document || COALESCE(d.document, ''::tsvector) AS document, "
+                "websearch_to_tsquery('english', :query) AS query "
+                "FROM job_matches_search s "
+                "JOIN job_matches m ON m.id = s.match_id "
+                "LEFT JOIN job_descriptions_search d ON d.description_id = m.description_id "
+                "WHERE s.document @@ to_tsquery('simple', :owner) AND s.user_id = :user_id) m "
+                "WHERE m.document @@ m.query "
+                "ORDER BY rank DESC LIMIT :limit"
+            ).columns(*result_columns),
+            {"owner": _owner_token(user_id), "query": " ".join(terms), "user_id": user_id, "limit": limit},
+        )
+    else:
+        terms = _quoted_terms(query)
+        if not terms:
+            return []
+        # Every term must appear in the match's own fields or in its shared
+        # description; ranking adds both tables' BM25 scores over any term.
+        # Descriptions are shared between users, so they are only looked up
+        # by rowid from this user's matches (CROSS JOIN keeps that order).
+        params: Dict[str, Any] = {
+            "fields_any": _fields_query(user_id, " OR ".join(terms)),
+            "description_any": " OR ".join(terms),
+            "user_id": user_id,
+            "limit": limit,
+        }
+        conditions = []
+        for i, term in enumerate(terms):
+            params[f"fields_{i}"] = _fields_query(user_id, term)
+            params[f"description_{i}"] = term
+            conditions.append(
+                f"(m.id IN (SELECT rowid FROM job_matches_fts WHERE job_matches_fts MATCH :fields_{i}) "
+                "OR EXISTS (SELECT 1 FROM job_descriptions_fts "
+                f"WHERE rowid = m.description_id AND job_descriptions_fts MATCH :description_{i}))"
+            )
+        result = db.execute(
+            text(
+                f"SELECT {columns}, COALESCE(f.rank, 0.0) + COALESCE(d.rank, 0.0) AS rank "
+                "FROM job_matches m "
+                "LEFT JOIN (SELECT rowid AS id, "
+                f"bm25(job_matches_fts, {_SQLITE_BM25_WEIGHTS}) AS rank "
+                "FROM job_matches_fts WHERE job_matches_fts MATCH :fields_any) f ON f.id = m.id "
+                "LEFT JOIN (SELECT mine.id AS id, bm25(job_descriptions_fts) AS rank "
+                "FROM job_matches mine CROSS JOIN job_descriptions_fts "
+                "ON job_descriptions_fts.rowid = mine.description_id "
+                "WHERE mine.user_id = :user_id AND job_descriptions_fts MATCH :description_any) d "
+                "ON d.id = m.id "
+                f"WHERE m.user_id = :user_id AND {' AND '.join(conditions)} "
+                "ORDER BY rank, m.id LIMIT :limit"
+            ).columns(*result_columns),
+            params,
+        )
+
+    return [
+        {key: value for key, value in row._mapping.items() if key != "rank"}
+        for row in result
+    ]
@@ -0,0 +1,307 @@
+import asyncio
+import logging
+import smtplib
+import time
+from datetime import datetime, timedelta
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import Dict, List
+
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.database import SessionLocal
+from app.models.outbound_email import OutboundEmail
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# How long a worker may hold a claimed message before another may retry it
+CLAIM_LEASE = timedelta(minutes=5)
+
+# Set while the delivery loop runs, so enqueuing from a request thread can
+# wake it instead of waiting for the next poll.
+_loop: asyncio.AbstractEventLoop | None = None
+_wakeup: asyncio.Event | None = None
+
+
+class SMTPConnection:
+    """One SMTP session reused across messages.
+
+    Connecting, STARTTLS and login happen once; the session is reopened
+    when the server drops it (retrying the message straight away) or after
+    ``idle_seconds`` without use.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        user: str = "",
+        password: str = "",
+        starttls: bool = True,
+        idle_seconds: float = 60,
+        timeout: float = 30,
+    ):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.starttls = starttls
+        self.idle_seconds = idle_seconds
+        self.timeout = timeout
+        self._server: smtplib.SMTP | None = None
+        self._last_used = 0.0
+        self.connections_opened = 0
+
+    @classmethod
+    def from_settings(cls) -> "SMTPConnection":
+        return cls(
+            settings.SMTP_SERVER,
+            settings.SMTP_PORT,
+            settings.SMTP_USER,
+            settings.SMTP_PASSWORD,
+            settings.SMTP_STARTTLS,
+            settings.MAIL_SMTP_IDLE_SECONDS,
+        )
+
+    def _open(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                server.starttls()
+            if self.user:
+                server.login(self.user, self.password)
+        except Exception:
+            server.close()
+            raise
+        self.connections_opened += 1
+        return server
+
+    def send(self, from_addr: str, to_addr: str, message: str) -> None:
+        self.close_if_idle()
+        reused = self._server is not None
+        if not reused:
+            self._server = self._open()
+        try:
+            try:
+                self._server.sendmail(from_addr, [to_addr], message)
+            except smtplib.SMTPServerDisconnected:
+                if not reused:
+                    raise
+                # The server hung up on the kept-open session while it sat
+                # idle; that says nothing about this message, so retry now.
+                self.close()
+                self._server = self._open()
+                self._server.sendmail(from_addr, [to_addr], message)
+        finally:
+            self._last_used = time.monotonic()
+
+    def close_if_idle(self) -> None:
+        if self._server is not None and time.monotonic() - self._last_used > self.idle_seconds:
+            self.close()
+
+    def close(self) -> None:
+        server, self._server = self._server, None
+        if server is None:
+            return
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
+
+
+def enqueue_email(db: Session, to_email: str, subject: str, body: str) -> OutboundEmail:
+    """Add a message for background delivery; no SMTP work happens here.
+
+    The caller commits, so the message goes out only if the rest of its
+    transaction does; the delivery loop is woken once that commit lands.
+    """
+    message = OutboundEmail(to_email=to_email, subject=subject, body=body)
+    db.add(message)
+    db.flush()
+    db.info["queued_email"] = True
+    return message
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_after_commit(session) -> None:
+    if session.info.pop("queued_email", False) and _loop is not None and _wakeup is not None:
+        _loop.call_soon_threadsafe(_wakeup.set)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_queued(session) -> None:
+    session.info.pop("queued_email", None)
+
+
+def _render(message: OutboundEmail) -> str:
+    msg = MIMEMultipart("alternative")
+    msg["Subject"] = message.subject
+    msg["From"] = settings.FROM_EMAIL
+    msg["To"] = message.to_email
+    msg.attach(MIMEText(message.body, "html"))
+    return msg.as_string()
+
+
+def _is_permanent(exc: Exception) -> bool:
+    """Whether retrying cannot help: the server rejected this particular message."""
+    if isinstance(exc, (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused)):
+        return True
+    if isinstance(exc, smtplib.SMTPAuthenticationError):
+        # Our credentials, not the message; retry once they are fixed
+        return False
+    return isinstance(exc, smtplib.SMTPResponseException) and 500 <= exc.smtp_code < 600
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Exponential backoff after the ``attempts``-th failed try."""
+    seconds = settings.MAIL_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0)
+    return timedelta(seconds=min(seconds, settings.MAIL_RETRY_MAX_SECONDS))
+
+
+def _claim(db: Session, ids: List[int], now: datetime) -> List[int]:
+    """Lease due messages in one statement so concurrent workers never send one twice.
+
+    Returns the ids this worker got; a message another worker leased since
+    the batch was selected no longer has ``next_attempt_at <= now``.
+    """
+    if not ids:
+        return []
+    claimed = db.execute(
+        update(OutboundEmail)
+        .where(
+            OutboundEmail.id.in_(ids),
+            OutboundEmail.status == "pending",
+            OutboundEmail.next_attempt_at <= now,
+        )
+        .values(next_attempt_at=now + CLAIM_LEASE)
+        .returning(OutboundEmail.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    db.commit()
+    return list(claimed)
+
+
+def deliver_pending(
+    db: Session,
+    connection: SMTPConnection,
+    batch_size: int | None = None,
+    now: datetime | None = None,
+) -> Dict[str, int]:
+    """Send up to ``batch_size`` due messages over ``connection``.
+
+    The batch is leased up front; each message is then committed as sent,
+    rescheduled with backoff or marked failed on its own, so a crash
+    mid-batch re-sends at most one message.
+    """
+
+    batch_size = batch_size or settings.MAIL_QUEUE_BATCH_SIZE
+    now = now or datetime.utcnow()
+    stats = {"due": 0, "sent": 0, "retried": 0, "failed": 0}
+
+    due_ids = [
+        row.id
+        for row in db.query(OutboundEmail.id)
+        .filter(OutboundEmail.status == "pending", OutboundEmail.next_attempt_at <= now)
+        .order_by(OutboundEmail.next_attempt_at, OutboundEmail.id)
+        .limit(batch_size)
+    ]
+    stats["due"] = len(due_ids)
+
+    claimed = set(_claim(db, due_ids, now))
+    if not claimed:
+        return stats
+    messages = {m.id: m for m in db.query(OutboundEmail).filter(OutboundEmail.id.in_(claimed))}
+
+    for message in (messages[message_id] for message_id in due_ids if message_id in claimed):
+        message.attempts += 1
+        try:
+            connection.send(settings.FROM_EMAIL, message.to_email, _render(message))
+        except (smtplib.SMTPException, OSError) as exc:
+            message.last_error = str(exc)[:500] or type(exc).__name__
+            if _is_permanent(exc) or message.attempts >= settings.MAIL_MAX_ATTEMPTS:
+                message.status = "failed"
+                stats["failed"] += 1
+                logger.warning("Giving up on email %s to %s: %s", message.id, message.to_email, exc)
+            else:
+                message.next_attempt_at = now + retry_delay(message.attempts)
+                stats["retried"] += 1
+            if not isinstance(exc, smtplib.SMTPResponseException):
+                # The session itself may be broken; reconnect for the next one
+                connection.close()
+        else:
+            message.status = "sent"
+            message.sent_at = now
+            message.last_error = None
+            stats["sent"] += 1
+        db.commit()
+
+    return stats
+
+
+def prune_sent_emails(db: Session, older_than_days: int | None = None) -> int:
+    """Delete delivered messages older than the retention period."""
+    days = settings.MAIL_SENT_RETENTION_DAYS if older_than_days is None else older_than_days
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    removed = (
+        db.query(OutboundEmail)
+        .filter(OutboundEmail.status == "sent", OutboundEmail.sent_at < cutoff)
+        .delete(synchronize_session=False)
+    )
+    db.commit()
+    return removed
+
+
+def _deliver_once(connection: SMTPConnection) -> Dict[str, int]:
+    db = SessionLocal()
+    try:
+        return deliver_pending(db, connection)
+    finally:
+        db.close()
+        connection.close_if_idle()
+
+
+def _prune_once() -> int:
+    db = SessionLocal()
+    try:
+        return prune_sent_emails(db)
+    finally:
+        db.close()
+
+
+async def run_mail_loop(poll_seconds: float) -> None:
+    """Deliver queued email in a worker thread until cancelled.
+
+    Wakes every ``poll_seconds`` (for retries) or as soon as a message is
+    enqueued, and loops straight away while full batches keep coming.
+    """
+
+    global _loop, _wakeup
+    _loop, _wakeup = asyncio.get_running_loop(), asyncio.Event()
+    connection = SMTPConnection.from_settings()
+    last_pruned = 0.0
+    try:
+        while True:
+            try:
+                await asyncio.wait_for(_wakeup.wait(), poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            _wakeup.clear()
+
+            try:
+                stats = await asyncio.to_thread(_deliver_once, connection)
+                if time.monotonic() - last_pruned > 3600:
+                    await asyncio.to_thread(_prune_once)
+                    last_pruned = time.monotonic()
+            except Exception:
+                logger.exception("Outbound mail delivery failed")
+                continue
+            if stats["sent"] or stats["failed"]:
+                logger.info("Mail queue: %d sent, %d retried, %d failed", stats["sent"], stats["retried"], stats["failed"])
+            if stats["due"] >= settings.MAIL_QUEUE_BATCH_SIZE:
+                _wakeup.set()
+    finally:
+        _loop = _wakeup = None
+        connection.close()
@@ -0,0 +1,306 @@
+import asyncio
+import logging
+from datetime import date, datetime, timedelta
+from typing import Iterable, List, Dict, Any
+
+from sqlalchemy import case, exists, func
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.database import SessionLocal, run_db
+from app.models.resume import Resume
+from app.models.saved_search import SavedSearch
+from app.models.user import User
+from app.services.job_corpus import load_corpus_stats
+from app.services.job_providers import active_providers
+from app.services.job_scoring import attach_scores, build_resume_profile
+from app.services.job_search import search_jobs_for_titles
+from app.services.job_store import upsert_job_matches
+from app.services.taxonomy import get_taxonomy_matcher, normalize_text
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+# How many resume-derived titles to search when there is no Best-Fit section
+MAX_FALLBACK_TITLES = 3
+
+
+def infer_best_fit_titles(latest_resume: Resume | None) -> list[str]:
+    """Work out which job titles to search for from the latest resume.
+
+    Prefers the explicit "Best-Fit Roles" section of the AI summary and
+    falls back to the titles the taxonomy finds in the resume, then to a
+    generic title. Titles are canonicalised through the taxonomy.
+    """
+
+    best_fit_titles: list[str] = []
+    matcher = get_taxonomy_matcher()
+
+    # Prefer using the AI-generated "Best-Fit Roles" section when present.
+    if latest_resume and latest_resume.content:
+        text = latest_resume.content
+
+        marker = "### Best-Fit Roles"
+        idx = text.find(marker)
+        if idx != -1:
+            roles_block = text[idx + len(marker) :]
+            # Stop at the next markdown heading if present
+            for stop in ["### ", "\n## "]:
+                stop_idx = roles_block.find(stop)
+                if stop_idx != -1:
+                    roles_block = roles_block[:stop_idx]
+                    break
+
+            lines = roles_block.splitlines()
+            for line in lines:
+                line = line.strip()
+                if not line:
+                    continue
+                # Strip leading list markers like "1.", "-", "*"
+                if line[0].isdigit():
+                    dot_idx = line.find(".")
+                    if dot_idx != -1 and dot_idx + 1 < len(line):
+                        line = line[dot_idx + 1 :].strip()
+                elif line[0] in {"-", "*"}:
+                    line = line[1:].strip()
+
+                # Keep only the role title before any dash/description
+                dash_idx = line.find(" - ")
+                if dash_idx != -1:
+                    line = line[:dash_idx].strip()
+
+                # Map free-text roles onto canonical titles so equivalent
+                # roles share one normalized JSearch query (and cache entry).
+                line = matcher.canonical_title(line) or line
+                if line and line not in best_fit_titles:
+                    best_fit_titles.append(line)
+
+        # Fallback: the titles the resume mentions most often
+        if not best_fit_titles:
+            found = matcher.extract(f"{text}\n{latest_resume.analysis or ''}").titles
+            best_fit_titles.extend(title for title, _ in found.most_common(MAX_FALLBACK_TITLES))
+
+    # Always have at least one generic title so the search still works
+    if not best_fit_titles:
+        best_fit_titles.append("Software Engineer")
+
+    return best_fit_titles
+
+
+def _search_queries(resume: Resume | None) -> list[str]:
+    queries: list[str] = []
+    for title in infer_best_fit_titles(resume):
+        query = normalize_text(title)
+        if query and query not in queries:
+            queries.append(query)
+    return queries
+
+
+def sync_saved_searches(db: Session, user_id: int, resume: Resume | None) -> List[SavedSearch]:
+    """Make the user's saved searches match the titles derived from ``resume``.
+
+    Queries are stored normalized, so users with equivalent titles share one
+    query string. The caller commits.
+    """
+
+    queries = _search_queries(resume)
+    existing = {s.query: s for s in db.query(SavedSearch).filter(SavedSearch.user_id == user_id)}
+    for query, saved in existing.items():
+        if query not in queries:
+            db.delete(saved)
+
+    searches = []
+    for query in queries:
+        saved = existing.get(query)
+        if saved is None:
+            saved = SavedSearch(user_id=user_id, query=query)
+            db.add(saved)
+        searches.append(saved)
+    db.flush()
+    return searches
+
+
+def list_saved_searches(db: Session, user_id: int) -> List[Dict[str, Any]]:
+    """Return the user's saved searches.
+
+    Read-only: searches are kept in sync when resumes change (and backfilled
+    by the refresh job), not when they are listed.
+    """
+
+    searches = db.query(SavedSearch).filter(SavedSearch.user_id == user_id).order_by(SavedSearch.id)
+    return [
+        {
+            "id": s.id,
+            "query": s.query,
+            "last_run_at": s.last_run_at,
+            "last_new_count": s.last_new_count,
+        }
+        for s in searches
+    ]
+
+
+def in_off_peak_window(now: datetime) -> bool:
+    """Whether ``now`` (UTC) falls inside the configured refresh window."""
+    start, end = settings.JOB_REFRESH_WINDOW_START_HOUR, settings.JOB_REFRESH_WINDOW_END_HOUR
+    if start <= end:
+        return start <= now.hour < end
+    # Window wraps past midnight, e.g. 22 -> 4
+    return now.hour >= start or now.hour < end
+
+
+def _latest_resumes(db: Session, user_ids: Iterable[int]) -> Dict[int, Resume]:
+    user_ids = list(user_ids)
+    latest_ids = (
+        db.query(func.max(Resume.id)).filter(Resume.user_id.in_(user_ids)).group_by(Resume.user_id)
+    )
+    return {resume.user_id: resume for resume in db.query(Resume).filter(Resume.id.in_(latest_ids))}
+
+
+def _backfill_saved_searches(db: Session) -> None:
+    """Derive searches for active users who have a resume but none saved yet.
+
+    Covers resumes stored before searches were synced on upload. The caller
+    commits.
+    """
+
+    latest_ids = (
+        db.query(func.max(Resume.id))
+        .join(User, User.id == Resume.user_id)
+        .filter(User.is_active.is_(True))
+        .filter(~exists().where(SavedSearch.user_id == Resume.user_id))
+        .group_by(Resume.user_id)
+    )
+    for resume in db.query(Resume).filter(Resume.id.in_(latest_ids)):
+        for query in _search_queries(resume):
+            db.add(SavedSearch(user_id=resume.user_id, query=query))
+    db.flush()
+
+
+def _plan_refresh(
+    db: Session, request_budget: int, requests_per_query: int, due_before: datetime
+) -> tuple[Dict[int, Resume], Dict[str, List[SavedSearch]]]:
+    """Pick the due saved searches of active users and group them by query, within the budget."""
+
+    _backfill_saved_searches(db)
+    db.commit()
+
+    def due(*columns):
+        return (
+            db.query(*columns)
+            .join(User, User.id == SavedSearch.user_id)
+            .filter(User.is_active.is_(True))
+            .filter(exists().where(Resume.user_id == SavedSearch.user_id))
+            .filter((SavedSearch.last_run_at.is_(None)) | (SavedSearch.last_run_at < due_before))
+        )
+
+    # Stalest first (never run, then oldest run): as many whole queries as
+    # the budget pays for, then every due search sharing them.
+    never_run = case((SavedSearch.last_run_at.is_(None), 1), else_=0)
+    queries = [
+        row.query
+        for row in due(SavedSearch.query)
+        .group_by(SavedSearch.query)
+        .order_by(func.max(never_run).desc(), func.min(SavedSearch.last_run_at), func.min(SavedSearch.id))
+        .limit(request_budget // requests_per_query)
+    ]
+    if not queries:
+        return {}, {}
+
+    by_query: Dict[str, List[SavedSearch]] = {query: [] for query in queries}
+    for saved in due(SavedSearch).filter(SavedSearch.query.in_(queries)).order_by(SavedSearch.id):
+        by_query[saved.query].append(saved)
+
+    user_ids = {saved.user_id for searches in by_query.values() for saved in searches}
+    return _latest_resumes(db, user_ids), by_query
+
+
+def _store_refreshed(
+    db: Session,
+    resumes: Dict[int, Resume],
+    by_query: Dict[str, List[SavedSearch]],
+    results: List[List[Dict[str, Any]]],
+    now: datetime,
+) -> int:
+    new_matches = 0
+    profiles = {
+        saved.user_id: build_resume_profile(resumes[saved.user_id])
+        for searches in by_query.values()
+        for saved in searches
+    }
+    corpus = load_corpus_stats(db, profiles.values())
+    for searches, jobs in zip(by_query.values(), results):
+        for saved in searches:
+            # Scores are per user, so each user gets their own copies.
+            user_jobs = attach_scores(profiles[saved.user_id], [dict(j) for j in jobs], corpus)
+            stored = upsert_job_matches(db, saved.user_id, user_jobs, only_new=True)
+            saved.last_run_at = now
+            saved.last_new_count = len(stored)
+            new_matches += len(stored)
+    # One transaction for the whole refresh; a failure leaves every search due
+    db.commit()
+    return new_matches
+
+
+async def refresh_saved_searches(
+    db: Session,
+    request_budget: int | None = None,
+    pages_per_search: int | None = None,
+    min_interval_hours: int | None = None,
+    now: datetime | None = None,
+) -> Dict[str, int]:
+    """Refresh due saved searches of active users within a provider request budget.
+
+    The stalest due searches are picked until ``request_budget`` requests
+    (``pages_per_search`` per query and enabled provider) are spent. Each distinct query is fetched once and shared by
+    every user who saved it, and only postings a user does not have yet are
+    stored. Limits default to the ``JOB_REFRESH_*`` settings.
+    """
+
+    request_budget = settings.JOB_REFRESH_REQUEST_BUDGET if request_budget is None else request_budget
+    pages = max(1, settings.JOB_REFRESH_PAGES_PER_SEARCH if pages_per_search is None else pages_per_search)
+    min_interval = settings.JOB_REFRESH_MIN_INTERVAL_HOURS if min_interval_hours is None else min_interval_hours
+    now = now or datetime.utcnow()
+    # Each page of a query is one request to every provider
+    requests_per_query = pages * max(1, len(active_providers()))
+
+    resumes, by_query = await run_db(
+        _plan_refresh, db, request_budget, requests_per_query, now - timedelta(hours=min_interval)
+    )
+
+    semaphore = asyncio.Semaphore(max(1, settings.JSEARCH_MAX_CONCURRENCY))
+
+    async def fetch(query: str) -> List[Dict[str, Any]]:
+        async with semaphore:
+            return await search_jobs_for_titles([query], num_pages=pages)
+
+    results = await asyncio.gather(*(fetch(query) for query in by_query))
+    new_matches = await run_db(_store_refreshed, db, resumes, by_query, results, now)
+
+    return {
+        "queries": len(by_query),
+        "requests": len(by_query) * requests_per_query,
+        "new_matches": new_matches,
+    }
+
+
+async def run_refresh_loop(check_interval_seconds: int) -> None:
+    """Refresh saved searches once per day inside the off-peak window, until cancelled."""
+
+    last_run: date | None = None
+    while True:
+        await asyncio.sleep(check_interval_seconds)
+        now = datetime.utcnow()
+        if last_run == now.date() or not in_off_peak_window(now):
+            continue
+        db = SessionLocal()
+        try:
+            stats = await refresh_saved_searches(db, now=now)
+            logger.info(
+                "Refreshed %d saved search queries (%d new matches)", stats["queries"], stats["new_matches"]
+            )
+            last_run = now.date()
+        except Exception:
+            logger.exception("Saved search refresh failed")
+        finally:
+            db.close()
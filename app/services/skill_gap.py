@@ -0,0 +1,146 @@
+from collections import Counter, defaultdict
+from typing import List, Dict, Any, Iterable
+
+from sqlalchemy import bindparam, func
+from sqlalchemy.orm import Session
+
+from app.database import dialect_insert
+from app.models.job_match import JobMatch
+from app.models.job_skill import JobMatchSkill, UserSkillCount
+from app.services.job_scoring import build_resume_profile
+from app.services.taxonomy import get_taxonomy_matcher
+
+
+# Keep IN (...) lists and multi-row statements below SQLite's parameter limit.
+SKILL_CHUNK_SIZE = 500
+
+
+def extract_job_skills(job: Dict[str, Any]) -> set[str]:
+    """Return the canonical skills mentioned in a job's title, description and highlights."""
+    text = "\n".join(
+        job.get(key) or "" for key in ("title", "description", "highlights")
+    )
+    return set(get_taxonomy_matcher().extract(text).skills)
+
+
+def _existing_skills(db: Session, match_ids: List[int]) -> dict[int, set[str]]:
+    existing: dict[int, set[str]] = defaultdict(set)
+    for start in range(0, len(match_ids), SKILL_CHUNK_SIZE):
+        rows = db.query(JobMatchSkill.match_id, JobMatchSkill.skill).filter(
+            JobMatchSkill.match_id.in_(match_ids[start : start + SKILL_CHUNK_SIZE])
+        )
+        for match_id, skill in rows:
+            existing[match_id].add(skill)
+    return existing
+
+
+def _apply_count_delta(db: Session, user_id: int, delta: Counter) -> None:
+    """Add ``delta`` to the user's per-skill match counts, dropping counts that reach zero."""
+    changes = [
+        {"user_id": user_id, "skill": skill, "match_count": change}
+        for skill, change in delta.items()
+        if change
+    ]
+    if not changes:
+        return
+
+    insert = dialect_insert(db)
+    for start in range(0, len(changes), SKILL_CHUNK_SIZE):
+        stmt = insert(UserSkillCount).values(changes[start : start + SKILL_CHUNK_SIZE])
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["user_id", "skill"],
+                set_={"match_count": UserSkillCount.match_count + stmt.excluded.match_count},
+            )
+        )
+    db.query(UserSkillCount).filter(
+        UserSkillCount.user_id == user_id, UserSkillCount.match_count <= 0
+    ).delete(synchronize_session=False)
+
+
+def index_match_skills(db: Session, user_id: int, match_skills: Dict[int, Iterable[str]]) -> None:
+    """Record the skills of freshly stored matches and update the user's aggregates.
+
+    Re-storing a match only applies the difference from its previous skills,
+    so the per-user counts stay correct however often a search is repeated.
+    The caller commits.
+    """
+
+    if not match_skills:
+        return
+
+    existing = _existing_skills(db, list(match_skills))
+    delta: Counter = Counter()
+    added: list[dict] = []
+    removed: list[dict] = []
+    for match_id, skills in match_skills.items():
+        skills = set(skills)
+        previous = existing.get(match_id, set())
+        for skill in skills - previous:
+            added.append({"match_id": match_id, "skill": skill, "user_id": user_id})
+            delta[skill] += 1
+        for skill in previous - skills:
+            removed.append({"b_match_id": match_id, "b_skill": skill})
+            delta[skill] -= 1
+
+    table = JobMatchSkill.__table__
+    if removed:
+        db.execute(
+            table.delete().where(
+                (table.c.match_id == bindparam("b_match_id")) & (table.c.skill == bindparam("b_skill"))
+            ),
+            removed,
+        )
+    if added:
+        db.execute(table.insert(), added)
+    _apply_count_delta(db, user_id, delta)
+
+
+def forget_match_skills(db: Session, user_id: int, match_ids: List[int]) -> None:
+    """Remove matches from the skill index before they are deleted. The caller commits."""
+
+    if not match_ids:
+        return
+
+    existing = _existing_skills(db, list(match_ids))
+    delta = Counter(skill for skills in existing.values() for skill in skills)
+    for start in range(0, len(match_ids), SKILL_CHUNK_SIZE):
+        db.query(JobMatchSkill).filter(
+            JobMatchSkill.match_id.in_(match_ids[start : start + SKILL_CHUNK_SIZE])
+        ).delete(synchronize_session=False)
+    _apply_count_delta(db, user_id, Counter({skill: -count for skill, count in delta.items()}))
+
+
+def skill_gap_report(db: Session, user_id: int, resume, limit: int = 25) -> Dict[str, Any]:
+    """Compare the skills the user's saved matches ask for with those on the resume.
+
+    Skill frequencies come straight from the precomputed per-user counts; only
+    the (single) resume is scanned at request time.
+    """
+
+    total_matches = db.query(func.count(JobMatch.id)).filter(JobMatch.user_id == user_id).scalar() or 0
+    resume_skills = set(get_taxonomy_matcher().extract(build_resume_profile(resume)).skills)
+
+    top = (
+        db.query(UserSkillCount.skill, UserSkillCount.match_count)
+        .filter(UserSkillCount.user_id == user_id)
+        .order_by(UserSkillCount.match_count.desc(), UserSkillCount.skill)
+        .limit(limit)
+        .all()
+    )
+    skills = [
+        {
+            "skill": skill,
+            "match_count": count,
+            "share": round(count / total_matches, 4) if total_matches else 0.0,
+            "in_resume": skill in resume_skills,
+        }
+        for skill, count in top
+    ]
+
+    return {
+        "total_matches": total_matches,
+        "resume_skills": sorted(resume_skills),
+        "skills": skills,
+        "missing": [entry["skill"] for entry in skills if not entry["in_resume"]],
+    }
@@ -0,0 +1,192 @@
+"""A tiny SMTP server that keeps messages in memory.
+
+For tests and local debugging of the mail queue. Run it with::
+
+    python -m app.services.smtp_sink --port 1025
+
+and point ``SMTP_SERVER``/``SMTP_PORT`` at it with ``SMTP_STARTTLS=false``;
+every received message is printed.
+"""
+
+import argparse
+import socket
+import socketserver
+import threading
+from dataclasses import dataclass
+from typing import Callable, List, Set
+
+
+@dataclass
+class ReceivedMessage:
+    mail_from: str
+    rcpt_tos: List[str]
+    data: str
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    server: "_SinkServer"
+
+    def _reply(self, line: str) -> None:
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self) -> None:
+        sink = self.server.sink
+        sink._connection_opened(self.request)
+        try:
+            self._serve(sink)
+        except OSError:
+            pass
+        finally:
+            sink._connection_closed(self.request)
+
+    def _serve(self, sink: "SMTPSink") -> None:
+        self._reply("220 smtp-sink ESMTP")
+        mail_from, rcpt_tos = "", []
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            line = raw.decode(errors="replace").rstrip("\r\n")
+            verb = line.split(" ", 1)[0].upper()
+
+            if verb == "EHLO":
+                self._reply("250-smtp-sink")
+                self._reply("250 AUTH PLAIN LOGIN")
+            elif verb == "HELO":
+                self._reply("250 smtp-sink")
+            elif verb == "AUTH":
+                self._reply("235 Authentication successful")
+            elif verb == "MAIL":
+                mail_from, rcpt_tos = line.partition(":")[2].strip(" <>"), []
+                self._reply("250 OK")
+            elif verb == "RCPT":
+                rcpt_tos.append(line.partition(":")[2].strip(" <>"))
+                self._reply("250 OK")
+            elif verb == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                while True:
+                    data_line = self.rfile.readline().decode(errors="replace")
+                    if data_line in (".\r\n", ".\n", ""):
+                        break
+                    lines.append(data_line[1:] if data_line.startswith("..") else data_line)
+                failure = sink._take_failure()
+                if failure:
+                    self._reply(failure)
+                else:
+                    sink._received(ReceivedMessage(mail_from, rcpt_tos, "".join(lines)))
+                    self._reply("250 OK: queued")
+            elif verb in ("RSET", "NOOP"):
+                if verb == "RSET":
+                    mail_from, rcpt_tos = "", []
+                self._reply("250 OK")
+            elif verb == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+
+class _SinkServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, sink: "SMTPSink"):
+        self.sink = sink
+        super().__init__(address, _SMTPHandler)
+
+
+class SMTPSink:
+    """In-memory SMTP server on a background thread.
+
+    ``messages`` collects every accepted message and ``connections`` counts
+    SMTP sessions; :meth:`fail_next` makes the next messages be refused with
+    a given reply, to exercise retries, and :meth:`drop_connections` hangs
+    up on open sessions the way an idle timeout would.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, on_message: Callable[[ReceivedMessage], None] | None = None):
+        self.messages: List[ReceivedMessage] = []
+        self.connections = 0
+        self._on_message = on_message
+        self._failures: List[str] = []
+        self._open_sockets: Set[socket.socket] = set()
+        self._lock = threading.Lock()
+        self._server = _SinkServer((host, port), self)
+        self._thread: threading.Thread | None = None
+
+    @property
+    def host(self) -> str:
+        return self._server.server_address[0]
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def fail_next(self, count: int = 1, reply: str = "451 Temporary failure, try again later") -> None:
+        with self._lock:
+            self._failures.extend([reply] * count)
+
+    def drop_connections(self) -> None:
+        with self._lock:
+            sockets = list(self._open_sockets)
+        for sock in sockets:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def start(self) -> "SMTPSink":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "SMTPSink":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _connection_opened(self, sock: socket.socket) -> None:
+        with self._lock:
+            self.connections += 1
+            self._open_sockets.add(sock)
+
+    def _connection_closed(self, sock: socket.socket) -> None:
+        with self._lock:
+            self._open_sockets.discard(sock)
+
+    def _take_failure(self) -> str | None:
+        with self._lock:
+            return self._failures.pop(0) if self._failures else None
+
+    def _received(self, message: ReceivedMessage) -> None:
+        with self._lock:
+            self.messages.append(message)
+        if self._on_message is not None:
+            self._on_message(message)
+
+
+def _print_message(message: ReceivedMessage) -> None:
+    print(f"---------- from {message.mail_from} to {', '.join(message.rcpt_tos)}")
+    print(message.data)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Debugging SMTP sink")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1025)
+    args = parser.parse_args()
+
+    sink = SMTPSink(args.host, args.port, on_message=_print_message)
+    print(f"SMTP sink listening on {sink.host}:{sink.port}")
+    try:
+        sink._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sink._server.server_close()
@@ -0,0 +1,121 @@
+import json
+import re
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List
+
+
+TAXONOMY_PATH = Path(__file__).resolve().parent.parent / "data" / "taxonomy.json"
+
+# Tokens keep "+", "#" and inner dots so "c++", "c#", ".net" and "node.js"
+# survive; every other character (spaces, "-", "/", "&", ...) separates words.
+_TOKEN_RE = re.compile(r"\.?[a-z0-9+#]+(?:\.[a-z0-9+#]+)*")
+
+
+def normalize_text(text: str | None) -> str:
+    """Lowercase ``text`` and collapse it to single-space separated tokens."""
+    if not text:
+        return ""
+    return " ".join(_TOKEN_RE.findall(text.lower()))
+
+
+@dataclass
+class TaxonomyMatches:
+    """Canonical titles and skills found in a piece of text, with counts."""
+
+    titles: Counter = field(default_factory=Counter)
+    skills: Counter = field(default_factory=Counter)
+
+
+class TaxonomyMatcher:
+    """Aho-Corasick automaton over every title and skill synonym.
+
+    The automaton is built once over normalized word sequences; :meth:`extract`
+    then finds all synonyms in a text in a single pass over its words, however
+    many patterns the taxonomy holds. Working on whole words means "java" never
+    fires inside "javascript".
+    """
+
+    def __init__(self, taxonomy: Dict[str, Dict[str, List[str]]]):
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        # Per state: (category, canonical, pattern length) for every pattern ending here
+        self._out: list[list[tuple[str, str, int]]] = [[]]
+
+        for category, entries in taxonomy.items():
+            for canonical, synonyms in entries.items():
+                for synonym in synonyms:
+                    words = normalize_text(synonym).split()
+                    if words:
+                        self._add(words, (category, canonical, len(words)))
+
+        self._build_failure_links()
+
+    def _add(self, words: List[str], output: tuple[str, str, int]) -> None:
+        state = 0
+        for word in words:
+            nxt = self._goto[state].get(word)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][word] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        if output not in self._out[state]:
+            self._out[state].append(output)
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for word, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and word not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(word, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt].extend(o for o in self._out[self._fail[nxt]] if o not in self._out[nxt])
+
+    def iter_matches(self, text: str | None):
+        """Yield ``(category, canonical, end_word_index, word_count)`` for each synonym hit."""
+        if not text:
+            return
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for pos, word in enumerate(_TOKEN_RE.findall(text.lower())):
+            while state and word not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(word, 0)
+            for category, canonical, length in out[state]:
+                yield category, canonical, pos, length
+
+    def extract(self, text: str | None) -> TaxonomyMatches:
+        """Count the canonical titles and skills mentioned in ``text``."""
+        matches = TaxonomyMatches()
+        for category, canonical, _, _ in self.iter_matches(text):
+            getattr(matches, category)[canonical] += 1
+        return matches
+
+    def canonical_title(self, text: str | None) -> str | None:
+        """Return the canonical title for a free-text role name, if any.
+
+        The longest matching synonym wins, so "Senior Machine Learning
+        Engineer" maps to Machine Learning Engineer rather than anything
+        matched by a shorter phrase inside it.
+        """
+        best: tuple[int, str] | None = None
+        for category, canonical, _, length in self.iter_matches(text):
+            if category == "titles" and (best is None or length > best[0]):
+                best = (length, canonical)
+        return best[1] if best else None
+
+
+@lru_cache()
+def get_taxonomy_matcher() -> TaxonomyMatcher:
+    """Build (once) the matcher for the bundled title/skill taxonomy."""
+    with open(TAXONOMY_PATH, encoding="utf-8") as fh:
+        return TaxonomyMatcher(json.load(fh))
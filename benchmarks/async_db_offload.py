@@ -0,0 +1,93 @@
+"""Throughput of async routes with database work on vs. off the event loop.
+
+Two otherwise identical async endpoints run the same query: one calls the
+synchronous Session directly (blocking the loop), the other goes through
+``app.database.run_db``. The query sleeps ``--latency-ms`` inside SQLite to
+stand in for a networked database round trip.
+
+    python -m benchmarks.async_db_offload --requests 400 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+
+from app.database import run_db
+
+
+def build_app(db_path: str, latency_ms: float) -> FastAPI:
+    engine = create_engine(
+        f"sqlite:///{db_path}",
+        connect_args={"check_same_thread": False},
+        pool_size=20,
+        max_overflow=0,
+    )
+
+    @event.listens_for(engine, "connect")
+    def _register_sleep(dbapi_connection, _):
+        dbapi_connection.create_function("sleep_ms", 1, lambda ms: time.sleep(ms / 1000) or 1)
+
+    Session = sessionmaker(bind=engine)
+    query = text("SELECT sleep_ms(:ms)")
+
+    def run_query() -> int:
+        with Session() as db:
+            return db.execute(query, {"ms": latency_ms}).scalar()
+
+    app = FastAPI()
+
+    @app.get("/on-loop")
+    async def on_loop():
+        return {"value": run_query()}
+
+    @app.get("/offloaded")
+    async def offloaded():
+        return {"value": await run_db(run_query)}
+
+    return app
+
+
+async def measure(app: FastAPI, path: str, requests: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def one():
+            async with semaphore:
+                resp = await client.get(path)
+                resp.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        return requests / (time.perf_counter() - started)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=10.0)
+    args = parser.parse_args()
+
+    fd, db_path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    try:
+        app = build_app(db_path, args.latency_ms)
+        results = {}
+        for path in ("/on-loop", "/offloaded"):
+            results[path] = await measure(app, path, args.requests, args.concurrency)
+            print(f"{path:<12} {results[path]:8.1f} req/s")
+        print(f"speed-up     {results['/offloaded'] / results['/on-loop']:8.1f}x")
+    finally:
+        os.remove(db_path)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,110 @@
+"""Concurrent read/write throughput of SQLite, stock vs. the tuned profile.
+
+Writer threads insert rows in small transactions while reader threads run
+the kind of per-user list query the app serves. "stock" is a plain
+``create_engine`` (rollback journal, synchronous=FULL); "tuned" is
+``app.database.build_engine`` (WAL, synchronous=NORMAL, mmap, larger
+cache, busy timeout, pooled connections).
+
+    python -m benchmarks.sqlite_concurrency --writers 4 --readers 8 --seconds 5
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, exc, text
+
+from app.database import build_engine
+
+SCHEMA = """
+CREATE TABLE matches (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    score REAL NOT NULL
+)
+"""
+
+
+def run(engine, writers: int, readers: int, seconds: float) -> dict:
+    with engine.begin() as conn:
+        conn.execute(text(SCHEMA))
+        conn.execute(text("CREATE INDEX ix_matches_user_score ON matches (user_id, score)"))
+
+    counts = {"writes": 0, "reads": 0, "errors": 0}
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def count(name: str) -> None:
+        with lock:
+            counts[name] += 1
+
+    def writer(worker: int) -> None:
+        n = 0
+        while time.monotonic() < deadline:
+            try:
+                with engine.begin() as conn:
+                    conn.execute(
+                        text("INSERT INTO matches (user_id, title, score) VALUES (:u, :t, :s)"),
+                        {"u": (worker * 7 + n) % 50, "t": f"Job {n}", "s": (n % 100) / 100},
+                    )
+                count("writes")
+            except exc.OperationalError:
+                count("errors")
+            n += 1
+
+    def reader(worker: int) -> None:
+        n = 0
+        while time.monotonic() < deadline:
+            try:
+                with engine.connect() as conn:
+                    conn.execute(
+                        text("SELECT id, title, score FROM matches WHERE user_id = :u ORDER BY score DESC LIMIT 20"),
+                        {"u": (worker + n) % 50},
+                    ).all()
+                count("reads")
+            except exc.OperationalError:
+                count("errors")
+            n += 1
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    threads += [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+    return {name: value / seconds if name != "errors" else value for name, value in counts.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    profiles = {
+        "stock": lambda url: create_engine(url, connect_args={"check_same_thread": False}),
+        "tuned": build_engine,
+    }
+    for name, make_engine in profiles.items():
+        fd, path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        try:
+            result = run(make_engine(f"sqlite:///{path}"), args.writers, args.readers, args.seconds)
+        finally:
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+        print(
+            f"{name:<6} writes/s {result['writes']:8.1f}   reads/s {result['reads']:8.1f}   "
+            f"lock errors {result['errors']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Alembic environment: migrates the database named by DATABASE_URL.
+
+Run ``alembic upgrade head`` before starting the app; the app no longer
+creates tables itself.
+"""
+
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+
+from app.core.config import get_settings
+from app.database import Base
+import app.models  # noqa: F401  (registers every table on Base.metadata)
+
+config = context.config
+settings = get_settings()
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+# Full-text search tables are created by raw DDL in the migrations (and by
+# the models' DDL listeners), not declared as models; SQLite's FTS5 also adds
+# shadow tables (job_matches_fts_data, ...). Autogenerate must leave them be.
+SEARCH_TABLE_PREFIXES = ("job_matches_fts", "job_matches_search", "job_descriptions_fts", "job_descriptions_search")
+
+
+def include_object(obj, name, type_, reflected, compare_to) -> bool:
+    if type_ == "table" and name.startswith(SEARCH_TABLE_PREFIXES):
+        return False
+    if type_ == "index" and obj.table.name.startswith(SEARCH_TABLE_PREFIXES):
+        return False
+    return True
+
+
+def _database_url() -> str:
+    return config.get_main_option("sqlalchemy.url") or settings.DATABASE_URL
+
+
+def _configure(**kwargs) -> None:
+    url = _database_url()
+    context.configure(
+        target_metadata=target_metadata,
+        include_object=include_object,
+        compare_type=True,
+        # SQLite cannot ALTER most things in place; batch mode copies the table
+        render_as_batch=url.startswith("sqlite"),
+        **kwargs,
+    )
+
+
+def run_migrations_offline() -> None:
+    """Emit the migration SQL without connecting (``alembic upgrade --sql``)."""
+    _configure(url=_database_url(), literal_binds=True, dialect_opts={"paramstyle": "named"})
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    connectable = create_engine(_database_url(), poolclass=pool.NullPool)
+    with connectable.connect() as connection:
+        _configure(connection=connection)
+        with context.begin_transaction():
+            context.run_migrations()
+    connectable.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,57 @@
+"""Schema checks for migrations that must also run on pre-migration databases.
+
+Before Alembic, the app created tables with ``Base.metadata.create_all`` and
+operators added some columns by hand, so a database may already hold any part
+of what a migration creates. Migrations use these checks to add only what is
+missing.
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+
+def _inspector() -> sa.engine.Inspector:
+    # A fresh inspector each time: reflection results are cached per inspector
+    return sa.inspect(op.get_bind())
+
+
+def dialect_name() -> str:
+    return op.get_bind().dialect.name
+
+
+def has_table(table: str) -> bool:
+    return _inspector().has_table(table)
+
+
+def column_names(table: str) -> set:
+    return {column["name"] for column in _inspector().get_columns(table)}
+
+
+def index_names(table: str) -> set:
+    return {index["name"] for index in _inspector().get_indexes(table)}
+
+
+def foreign_key(table: str, columns: list, referred_table: str) -> dict | None:
+    """The reflected foreign key from ``columns`` to ``referred_table``, if any."""
+    return next(
+        (
+            fk
+            for fk in _inspector().get_foreign_keys(table)
+            if fk["constrained_columns"] == columns and fk["referred_table"] == referred_table
+        ),
+        None,
+    )
+
+
+def has_foreign_key(table: str, columns: list, referred_table: str) -> bool:
+    return foreign_key(table, columns, referred_table) is not None
+
+
+def create_index_if_missing(name: str, table: str, columns: list, **kwargs) -> None:
+    if name not in index_names(table):
+        op.create_index(name, table, columns, **kwargs)
+
+
+def drop_index_if_exists(name: str, table: str) -> None:
+    if name in index_names(table):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,328 @@
+"""Job search schema: structured match attributes, skills, saved searches,
+shared descriptions, full-text search, token versions and the mail queue.
+
+Databases the app created before migrations may already have any of this:
+tables from ``create_all``, and columns operators added by hand
+(``users.token_version``, ``job_matches.external_id``, ...). Only what is
+missing is created, and full-text tables from before descriptions were
+indexed separately are rebuilt.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import (
+    column_names,
+    create_index_if_missing,
+    dialect_name,
+    has_foreign_key,
+    has_table,
+)
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+# Descriptions decompressed and indexed per statement when backfilling
+BACKFILL_BATCH_SIZE = 500
+
+MATCH_COLUMNS = (
+    ("external_id", sa.String),
+    ("employment_type", sa.String),
+    ("is_remote", sa.Boolean),
+    ("salary_min", sa.Float),
+    ("salary_max", sa.Float),
+    ("salary_period", sa.String),
+    ("posted_at", sa.DateTime),
+    ("state", sa.String),
+    ("country", sa.String),
+    ("latitude", sa.Float),
+    ("longitude", sa.Float),
+    ("geo_cell", sa.Integer),
+    ("description_id", sa.Integer),
+)
+
+
+def _is_sqlite() -> bool:
+    return dialect_name() == "sqlite"
+
+
+def _is_postgres() -> bool:
+    return dialect_name() == "postgresql"
+
+
+def upgrade() -> None:
+    if "token_version" not in column_names("users"):
+        op.add_column("users", sa.Column("token_version", sa.Integer(), nullable=False, server_default="0"))
+
+    if not has_table("job_descriptions"):
+        op.create_table(
+            "job_descriptions",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("content_hash", sa.String(length=64), nullable=False),
+            sa.Column("compressed", sa.LargeBinary(), nullable=False),
+            sa.Column("size", sa.Integer(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("content_hash"),
+        )
+        op.create_index("ix_job_descriptions_id", "job_descriptions", ["id"])
+
+    _upgrade_job_matches()
+
+    for name, columns, kwargs in (
+        ("ux_job_matches_user_external", ["user_id", "external_id"], {"unique": True}),
+        ("ix_job_matches_user_employment_type", ["user_id", "employment_type"], {}),
+        ("ix_job_matches_user_remote", ["user_id", "is_remote"], {}),
+        ("ix_job_matches_user_state", ["user_id", "state"], {}),
+        ("ix_job_matches_user_country", ["user_id", "country"], {}),
+        ("ix_job_matches_user_posted_at", ["user_id", "posted_at"], {}),
+        ("ix_job_matches_user_created_at", ["user_id", "created_at"], {}),
+        ("ix_job_matches_description_id", ["description_id"], {}),
+        ("ix_job_matches_user_geo_cell", ["user_id", "geo_cell"], {}),
+        ("ix_job_matches_user_score", ["user_id", sa.text("score DESC"), sa.text("id DESC")], {}),
+    ):
+        create_index_if_missing(name, "job_matches", columns, **kwargs)
+
+    if not has_table("job_match_skills"):
+        op.create_table(
+            "job_match_skills",
+            sa.Column("match_id", sa.Integer(), nullable=False),
+            sa.Column("skill", sa.String(), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(["match_id"], ["job_matches.id"], ondelete="CASCADE"),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("match_id", "skill"),
+        )
+        op.create_index("ix_job_match_skills_user_skill", "job_match_skills", ["user_id", "skill"])
+
+    if not has_table("user_skill_counts"):
+        op.create_table(
+            "user_skill_counts",
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("skill", sa.String(), nullable=False),
+            sa.Column("match_count", sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("user_id", "skill"),
+        )
+
+    if not has_table("saved_searches"):
+        op.create_table(
+            "saved_searches",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("query", sa.String(), nullable=False),
+            sa.Column("last_run_at", sa.DateTime(), nullable=True),
+            sa.Column("last_new_count", sa.Integer(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_saved_searches_id", "saved_searches", ["id"])
+        op.create_index("ix_saved_searches_last_run_at", "saved_searches", ["last_run_at"])
+        op.create_index("ux_saved_searches_user_query", "saved_searches", ["user_id", "query"], unique=True)
+
+    if not has_table("outbound_emails"):
+        op.create_table(
+            "outbound_emails",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("to_email", sa.String(), nullable=False),
+            sa.Column("subject", sa.String(), nullable=False),
+            sa.Column("body", sa.Text(), nullable=False),
+            sa.Column("status", sa.String(length=16), nullable=False),
+            sa.Column("attempts", sa.Integer(), nullable=False),
+            sa.Column("next_attempt_at", sa.DateTime(), nullable=False),
+            sa.Column("last_error", sa.String(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("sent_at", sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_outbound_emails_id", "outbound_emails", ["id"])
+        op.create_index("ix_outbound_emails_status_due", "outbound_emails", ["status", "next_attempt_at"])
+
+    if _is_sqlite():
+        _upgrade_sqlite_search()
+    elif _is_postgres():
+        _upgrade_postgres_search()
+
+
+def _upgrade_job_matches() -> None:
+    existing = {column["name"]: column for column in sa.inspect(op.get_bind()).get_columns("job_matches")}
+    missing = [name for name, _ in MATCH_COLUMNS if name not in existing]
+    score_nullable = existing["score"]["nullable"]
+    needs_fk = not has_foreign_key("job_matches", ["description_id"], "job_descriptions")
+    if not (missing or score_nullable or needs_fk):
+        return
+
+    op.execute("UPDATE job_matches SET score = 0 WHERE score IS NULL")
+    # On SQLite this rebuilds the table (dropping its triggers); the full-text
+    # trigger is (re)created afterwards.
+    with op.batch_alter_table("job_matches") as batch_op:
+        for name, type_ in MATCH_COLUMNS:
+            if name in missing:
+                batch_op.add_column(sa.Column(name, type_(), nullable=True))
+        if score_nullable:
+            batch_op.alter_column("score", existing_type=sa.Float(), nullable=False)
+        if needs_fk:
+            batch_op.create_foreign_key(
+                "fk_job_matches_description_id", "job_descriptions", ["description_id"], ["id"]
+            )
+
+
+def _descriptions(bind):
+    """Yield batches of ``{"id": ..., "description": ...}`` for every stored description."""
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.text(
+                "SELECT id, compressed FROM job_descriptions WHERE id > :last_id ORDER BY id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": BACKFILL_BATCH_SIZE},
+        ).all()
+        if not rows:
+            return
+        last_id = rows[-1][0]
+        yield [{"id": i, "description": zlib.decompress(compressed).decode("utf-8")} for i, compressed in rows]
+
+
+# Full-text search, as in JobMatch's and JobDescription's DDL listeners.
+# Matches are indexed by their own fields and each description once.
+
+
+def _upgrade_sqlite_search() -> None:
+    bind = op.get_bind()
+    if has_table("job_matches_fts") and "description" in column_names("job_matches_fts"):
+        # Indexed a copy of the description per match; rebuilt below
+        op.execute("DROP TABLE job_matches_fts")
+    if not has_table("job_matches_fts"):
+        op.execute(
+            "CREATE VIRTUAL TABLE job_matches_fts USING fts5("
+            "owner, title, company, location, "
+            "tokenize = 'porter unicode61', prefix = '2 3')"
+        )
+        op.execute(
+            "INSERT INTO job_matches_fts (rowid, owner, title, company, location) "
+            "SELECT id, 'owner' || user_id, title, company, COALESCE(location, '') FROM job_matches"
+        )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS job_matches_fts_delete AFTER DELETE ON job_matches "
+        "BEGIN DELETE FROM job_matches_fts WHERE rowid = old.id; END"
+    )
+
+    if not has_table("job_descriptions_fts"):
+        op.execute(
+            "CREATE VIRTUAL TABLE job_descriptions_fts USING fts5("
+            "description, content = '', tokenize = 'porter unicode61', prefix = '2 3')"
+        )
+        for rows in _descriptions(bind):
+            bind.execute(
+                sa.text("INSERT INTO job_descriptions_fts (rowid, description) VALUES (:id, :description)"),
+                rows,
+            )
+
+
+_MATCH_DOCUMENT = (
+    "to_tsvector('simple', 'owner' || m.user_id) "
+    "|| setweight(to_tsvector('english', m.title), 'A') "
+    "|| setweight(to_tsvector('english', m.company), 'B') "
+    "|| setweight(to_tsvector('english', COALESCE(m.location, '')), 'C')"
+)
+
+
+def _upgrade_postgres_search() -> None:
+    bind = op.get_bind()
+    if not has_table("job_matches_search"):
+        op.execute(
+            "CREATE TABLE job_matches_search ("
+            "match_id INTEGER PRIMARY KEY REFERENCES job_matches (id) ON DELETE CASCADE, "
+            "user_id INTEGER NOT NULL, "
+            "document TSVECTOR NOT NULL)"
+        )
+        op.execute(
+            "INSERT INTO job_matches_search (match_id, user_id, document) "
+            f"SELECT m.id, m.user_id, {_MATCH_DOCUMENT} FROM job_matches m"
+        )
+    elif not has_table("job_descriptions_search"):
+        # Documents from before descriptions were indexed separately include them
+        op.execute(
+            f"UPDATE job_matches_search s SET document = {_MATCH_DOCUMENT} "
+            "FROM job_matches m WHERE m.id = s.match_id"
+        )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_job_matches_search_document ON job_matches_search USING GIN (document)"
+    )
+
+    if not has_table("job_descriptions_search"):
+        op.execute(
+            "CREATE TABLE job_descriptions_search ("
+            "description_id INTEGER PRIMARY KEY REFERENCES job_descriptions (id) ON DELETE CASCADE, "
+            "document TSVECTOR NOT NULL)"
+        )
+        for rows in _descriptions(bind):
+            bind.execute(
+                sa.text(
+                    "INSERT INTO job_descriptions_search (description_id, document) "
+                    "VALUES (:id, setweight(to_tsvector('english', :description), 'D'))"
+                ),
+                rows,
+            )
+
+
+def downgrade() -> None:
+    if _is_sqlite():
+        op.execute("DROP TABLE IF EXISTS job_descriptions_fts")
+        op.execute("DROP TRIGGER IF EXISTS job_matches_fts_delete")
+        op.execute("DROP TABLE IF EXISTS job_matches_fts")
+    elif _is_postgres():
+        op.execute("DROP TABLE IF EXISTS job_descriptions_search")
+        op.execute("DROP TABLE IF EXISTS job_matches_search")
+
+    op.drop_table("outbound_emails")
+    op.drop_table("saved_searches")
+    op.drop_table("user_skill_counts")
+    op.drop_table("job_match_skills")
+
+    for name in (
+        "ix_job_matches_user_score",
+        "ix_job_matches_user_geo_cell",
+        "ix_job_matches_description_id",
+        "ix_job_matches_user_created_at",
+        "ix_job_matches_user_posted_at",
+        "ix_job_matches_user_country",
+        "ix_job_matches_user_state",
+        "ix_job_matches_user_remote",
+        "ix_job_matches_user_employment_type",
+        "ux_job_matches_user_external",
+    ):
+        op.drop_index(name, table_name="job_matches")
+    with op.batch_alter_table("job_matches") as batch_op:
+        batch_op.drop_constraint("fk_job_matches_description_id", type_="foreignkey")
+        batch_op.alter_column("score", existing_type=sa.Float(), nullable=True)
+        for column in (
+            "description_id",
+            "geo_cell",
+            "longitude",
+            "latitude",
+            "country",
+            "state",
+            "posted_at",
+            "salary_period",
+            "salary_max",
+            "salary_min",
+            "is_remote",
+            "employment_type",
+            "external_id",
+        ):
+            batch_op.drop_column(column)
+
+    op.drop_table("job_descriptions")
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.drop_column("token_version")
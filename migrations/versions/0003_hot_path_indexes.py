@@ -0,0 +1,34 @@
+"""Composite indexes for per-user resume and interview prep lookups.
+
+"Latest resume" lookups filter on user_id and sort by created_at DESC;
+(user_id, created_at DESC) answers them from the index and also covers the
+plain user_id filters the old single-column index served. Interview preps
+had no index on user_id at all.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import create_index_if_missing, drop_index_if_exists
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    create_index_if_missing("ix_resumes_user_created_at", "resumes", ["user_id", sa.text("created_at DESC")])
+    drop_index_if_exists("ix_resumes_user_id", "resumes")
+    create_index_if_missing("ix_interview_preps_user_created_at", "interview_preps", ["user_id", "created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_interview_preps_user_created_at", table_name="interview_preps")
+    op.create_index("ix_resumes_user_id", "resumes", ["user_id"])
+    op.drop_index("ix_resumes_user_created_at", table_name="resumes")
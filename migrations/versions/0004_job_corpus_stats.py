@@ -0,0 +1,44 @@
+"""Corpus statistics for scoring jobs: per-term document counts and totals.
+
+They start empty (every term weighs the same) and fill as postings nobody
+has stored before come in.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import has_table
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # A database built with create_all of the current models already has them
+    if not has_table("job_term_stats"):
+        op.create_table(
+            "job_term_stats",
+            sa.Column("term", sa.String(), nullable=False),
+            sa.Column("document_count", sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint("term"),
+        )
+    if not has_table("job_corpus"):
+        op.create_table(
+            "job_corpus",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("documents", sa.Integer(), nullable=False),
+            sa.Column("total_length", sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("job_corpus")
+    op.drop_table("job_term_stats")
@@ -0,0 +1,72 @@
+"""Delete a user's skill index rows along with the user.
+
+job_match_skills and user_skill_counts referenced users without ON DELETE
+CASCADE, so deleting a user failed on Postgres. Databases that ran 0002
+before it created them with the cascade get their foreign keys rebuilt.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import dialect_name, foreign_key
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def _skill_tables(user_ondelete: str | None) -> list:
+    """The two tables as 0002 creates them, with the given user foreign key action."""
+    metadata = sa.MetaData()
+    match_skills = sa.Table(
+        "job_match_skills",
+        metadata,
+        sa.Column("match_id", sa.Integer(), nullable=False),
+        sa.Column("skill", sa.String(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["match_id"], ["job_matches.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete=user_ondelete),
+        sa.PrimaryKeyConstraint("match_id", "skill"),
+        sa.Index("ix_job_match_skills_user_skill", "user_id", "skill"),
+    )
+    skill_counts = sa.Table(
+        "user_skill_counts",
+        metadata,
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("skill", sa.String(), nullable=False),
+        sa.Column("match_count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete=user_ondelete),
+        sa.PrimaryKeyConstraint("user_id", "skill"),
+    )
+    return [match_skills, skill_counts]
+
+
+def _set_user_ondelete(ondelete: str | None) -> None:
+    for table in _skill_tables(ondelete):
+        fk = foreign_key(table.name, ["user_id"], "users")
+        if fk is not None and (fk["options"].get("ondelete") or "").upper() == (ondelete or ""):
+            continue
+        if dialect_name() == "sqlite":
+            # SQLite cannot alter a constraint (and leaves this one unnamed),
+            # so the table is rebuilt from its full definition.
+            with op.batch_alter_table(table.name, copy_from=table, recreate="always"):
+                pass
+        else:
+            name = fk["name"] if fk is not None else f"{table.name}_user_id_fkey"
+            if fk is not None:
+                op.drop_constraint(name, table.name, type_="foreignkey")
+            op.create_foreign_key(name, table.name, "users", ["user_id"], ["id"], ondelete=ondelete)
+
+
+def upgrade() -> None:
+    _set_user_ondelete("CASCADE")
+
+
+def downgrade() -> None:
+    _set_user_ondelete(None)
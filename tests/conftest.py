@@ -6,7 +6,6 @@ import tempfile
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 # Ensure the project root (which contains the ``app`` package) is on sys.path
@@ -14,10 +13,15 @@ PROJECT_ROOT = os.path.dirname(os.path.dirname(__file__))
 if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
+# Fail any request that blows its SQL query budget or repeats a statement (N+1)
+os.environ.setdefault("QUERY_BUDGET_MODE", "raise")
+
 from app.main import app
-from app.database import Base, get_db
+from app.database import Base, build_engine, get_db
+from app.auth.dependencies import get_read_db
 from app.models import User
 from app.auth.jwt import PasswordHandler
+from app.auth.admission import reset_admission
 
 
 @pytest.fixture(scope="session")
@@ -37,10 +41,7 @@ def test_db_url() -> str:
 def engine(test_db_url):
     """Create a SQLAlchemy engine bound to the test database."""
 
-    engine = create_engine(
-        test_db_url,
-        connect_args={"check_same_thread": False},
-    )
+    engine = build_engine(test_db_url)
     Base.metadata.create_all(bind=engine)
     try:
         yield engine
@@ -64,6 +65,13 @@ def db_session(engine):
         session.close()
 
 
+@pytest.fixture(autouse=True)
+def _reset_auth_admission():
+    """Every test logs in from the same client address; start each with a clean slate."""
+    reset_admission()
+    yield
+
+
 @pytest.fixture(scope="function")
 def client(db_session):
     """FastAPI TestClient with the application's get_db dependency overridden.
@@ -79,6 +87,8 @@ def client(db_session):
             pass
 
     app.dependency_overrides[get_db] = override_get_db
+    # Single database: read-only routes use the same session
+    app.dependency_overrides[get_read_db] = override_get_db
     with TestClient(app) as c:
         yield c
     app.dependency_overrides.clear()
@@ -1,7 +1,18 @@
 """Tests for authentication endpoints: registration, login, and /me profile."""
 
+import asyncio
+
+import pytest
 from fastapi import status
 
+from app.auth.jwt import JWTHandler, PasswordHandler, crypt_context
+from app.auth.principal_cache import PrincipalCache, snapshot_user
+from app.models import User
+from app.auth.password_pool import PasswordHashPool, PoolClosed, password_pool
+from app.core.config import get_settings
+
+settings = get_settings()
+
 
 def test_register_success(client):
     """Register a new user with valid data should succeed."""
@@ -99,3 +110,173 @@ def test_get_me_unauthorized(client):
 
     resp = client.get("/api/auth/me")
     assert resp.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_principal_cache_serves_repeat_requests_and_invalidates(client, auth_headers, db_session, test_user):
+    """Repeat requests skip the user query; password changes and deactivation evict the entry."""
+
+    from app.auth.principal_cache import principal_cache
+
+    client.get("/api/auth/me", headers=auth_headers)
+    hits = principal_cache.hits
+    assert client.get("/api/auth/me", headers=auth_headers).json()["username"] == test_user.username
+    assert principal_cache.hits == hits + 1
+
+    # The cached user has no password hash; change-password loads it on demand.
+    resp = client.post(
+        "/api/auth/change-password",
+        json={"current_password": "password123", "new_password": "newpassword456"},
+        headers=auth_headers,
+    )
+    assert resp.status_code == status.HTTP_200_OK
+    assert test_user.id not in principal_cache._entries
+    headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+    client.get("/api/auth/me", headers=headers)
+    test_user.is_active = False
+    db_session.commit()
+    assert client.get("/api/auth/me", headers=headers).status_code == status.HTTP_403_FORBIDDEN
+
+    metrics = client.get("/metrics").text
+    assert "auth_principal_cache_hits_total" in metrics
+    assert "auth_principal_cache_time_saved_seconds_total" in metrics
+
+
+class _RecordingRedis:
+    """Stands in for the Redis client, recording what the cache publishes."""
+
+    def __init__(self):
+        self.published = []
+
+    def pipeline(self):
+        return self
+
+    def delete(self, key):
+        pass
+
+    def publish(self, channel, payload):
+        self.published.append(payload)
+
+    def execute(self):
+        pass
+
+
+def test_principal_cache_broadcasts_invalidations_to_other_workers():
+    """Evictions are published, and a published eviction drops the local entry."""
+
+    cache = PrincipalCache(ttl_seconds=60, max_entries=10)
+    cache._redis = _RecordingRedis()
+    cache.put(1, {"id": 1}, 0.0)
+    cache.put(2, {"id": 2}, 0.0)
+
+    cache.invalidate(1)
+    cache.clear()
+    assert cache._redis.published == ["1", "*"]
+
+    # As delivered by the subscription from another worker
+    cache._redis = None
+    cache.put(2, {"id": 2}, 0.0)
+    cache.put(3, {"id": 3}, 0.0)
+    cache._on_invalidation(b"2")
+    assert cache.get(2) is None and cache.get(3) == {"id": 3}
+    cache._on_invalidation(b"*")
+    assert cache.get(3) is None
+
+
+def test_logout_revokes_existing_tokens(client, auth_headers, test_user):
+    """Logout bumps the token version, so tokens issued before it stop working."""
+
+    assert client.get("/api/jobs/matches/count", headers=auth_headers).status_code == status.HTTP_200_OK
+
+    resp = client.post("/api/auth/logout", headers=auth_headers)
+    assert resp.status_code == status.HTTP_200_OK
+
+    for path in ("/api/auth/me", "/api/jobs/matches/count"):
+        resp = client.get(path, headers=auth_headers)
+        assert resp.status_code == status.HTTP_401_UNAUTHORIZED
+        assert resp.json()["detail"] == "Token has been revoked"
+
+    login = client.post("/api/auth/login", json={"email": test_user.email, "password": "password123"})
+    fresh = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    assert client.get("/api/auth/me", headers=fresh).status_code == status.HTTP_200_OK
+
+
+def test_principal_cache_evicts_on_commit_and_reloads_newer_tokens(client, db_session, test_user):
+    """Entries survive an uncommitted flush, and a token newer than the cache is checked against the database."""
+
+    from app.auth.principal_cache import principal_cache
+
+    headers = {"Authorization": f"Bearer {JWTHandler.create_token(JWTHandler.user_claims(test_user))}"}
+    assert client.get("/api/auth/me", headers=headers).status_code == status.HTTP_200_OK
+
+    test_user.token_version = User.token_version + 1
+    db_session.flush()
+    assert test_user.id in principal_cache._entries
+    db_session.commit()
+    assert test_user.id not in principal_cache._entries
+
+    # Cache the old version again, as a request racing the commit could have
+    fresh = {"Authorization": f"Bearer {JWTHandler.create_token(JWTHandler.user_claims(test_user))}"}
+    principal_cache.put(test_user.id, {**snapshot_user(test_user), "token_version": 0}, 0.0)
+    assert client.get("/api/auth/me", headers=fresh).status_code == status.HTTP_200_OK
+    assert principal_cache.get(test_user.id)["token_version"] == 1
+
+    resp = client.get("/api/auth/me", headers=headers)
+    assert resp.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_login_failures_lock_the_account_before_hashing(client, test_user):
+    """Repeated bad passwords for one account are refused with 429 without running bcrypt."""
+
+    for _ in range(settings.LOGIN_MAX_FAILURES_PER_ACCOUNT):
+        resp = client.post("/api/auth/login", json={"email": test_user.email, "password": "wrong"})
+        assert resp.status_code == status.HTTP_401_UNAUTHORIZED
+
+    completed = password_pool.completed
+    resp = client.post("/api/auth/login", json={"email": test_user.email, "password": "password123"})
+    assert resp.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert "Retry-After" in resp.headers
+    assert password_pool.completed == completed
+
+    assert 'auth_admission_rejected_total{reason="account"}' in client.get("/metrics").text
+
+
+def test_password_pool_counts_failures_and_refuses_work_once_closed():
+    """Hashes that raise are not counted as completed, and a shut-down pool rejects new work."""
+
+    pool = PasswordHashPool(workers=1, max_pending=2, rounds=4)
+    try:
+        with pytest.raises(ValueError):
+            asyncio.run(pool.verify("password123", "not-a-hash"))
+        assert (pool.completed, pool.failed) == (0, 1)
+        assert asyncio.run(pool.hash("password123")).startswith("$2")
+        assert (pool.completed, pool.failed) == (1, 1)
+
+        pool.shutdown()
+        with pytest.raises(PoolClosed):
+            asyncio.run(pool.hash("password123"))
+    finally:
+        pool.shutdown()
+
+
+def test_login_rehashes_password_when_cost_changes(client, db_session, test_user):
+    """A hash made with another bcrypt cost is replaced on the next successful login."""
+
+    test_user.hashed_password = crypt_context(4).hash("password123")
+    db_session.commit()
+
+    resp = client.post("/api/auth/login", json={"email": test_user.email, "password": "password123"})
+    assert resp.status_code == status.HTTP_200_OK
+
+    db_session.refresh(test_user)
+    assert test_user.hashed_password.startswith(f"$2b${settings.BCRYPT_ROUNDS:02d}$")
+    assert PasswordHandler.verify_password("password123", test_user.hashed_password)
+
+
+def test_hashing_queue_full_returns_503(client, test_user, monkeypatch):
+    """With no hashing capacity left, login is shed with 503 instead of queueing."""
+
+    monkeypatch.setattr(password_pool, "max_pending", 0)
+    resp = client.post("/api/auth/login", json={"email": test_user.email, "password": "password123"})
+    assert resp.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert resp.headers["Retry-After"] == "1"
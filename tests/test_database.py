@@ -0,0 +1,288 @@
+"""Tests for engine construction, the SQLite profile, read-replica routing and migrations."""
+
+import os
+import re
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app import database
+from app.auth.dependencies import get_read_db
+from app.core.config import get_settings
+from app.core.metrics import registry
+from app.database import Base, build_engine, recent_writers
+from app.main import app
+from app.models import JobMatch, Resume, User
+from app.services.geo import geo_cell
+from app.services.job_store import upsert_job_matches
+from app.services.job_text_search import search_job_matches
+
+settings = get_settings()
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(__file__))
+
+
+def test_sqlite_file_engine_applies_pragmas(tmp_path):
+    """Every pooled connection to a SQLite file runs in WAL mode with the configured pragmas."""
+
+    engine = build_engine(f"sqlite:///{tmp_path / 'pragmas.db'}", "test-pragmas")
+    try:
+        with engine.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar().lower() == "wal"
+            assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+            assert conn.execute(text("PRAGMA busy_timeout")).scalar() == settings.SQLITE_BUSY_TIMEOUT_MS
+            assert conn.execute(text("PRAGMA cache_size")).scalar() == -settings.SQLITE_CACHE_SIZE_KB
+        assert engine.pool.size() == settings.SQLITE_POOL_SIZE
+    finally:
+        engine.dispose()
+
+
+def test_sqlite_writer_commits_while_a_reader_is_open(tmp_path):
+    """With WAL, a writer can commit during a read transaction, which keeps its snapshot."""
+
+    engine = build_engine(f"sqlite:///{tmp_path / 'wal.db'}", "test-wal")
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY)"))
+            conn.execute(text("INSERT INTO items (id) VALUES (1)"))
+
+        reader = engine.raw_connection()
+        try:
+            cursor = reader.cursor()
+            cursor.execute("BEGIN")
+            cursor.execute("SELECT COUNT(*) FROM items")
+            assert cursor.fetchone()[0] == 1
+
+            # A rollback journal would make this wait for the reader and time out
+            with engine.begin() as writer:
+                writer.execute(text("INSERT INTO items (id) VALUES (2)"))
+
+            cursor.execute("SELECT COUNT(*) FROM items")
+            assert cursor.fetchone()[0] == 1
+            reader.rollback()
+        finally:
+            reader.close()
+
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT COUNT(*) FROM items")).scalar() == 2
+    finally:
+        engine.dispose()
+
+
+def test_reads_use_replica_until_the_user_writes(client, auth_headers, db_session, engine, test_user, tmp_path, monkeypatch):
+    """Read-only routes query the replica; after the user's own write they read the primary."""
+
+    replica = build_engine(f"sqlite:///{tmp_path / 'replica.db'}", "test-replica")
+    Base.metadata.create_all(bind=replica)
+    ReplicaSession = sessionmaker(bind=replica)
+    with ReplicaSession() as replica_db:
+        # The replica has the user but has not caught up with the resume below
+        columns = ("id", "email", "username", "full_name", "hashed_password", "is_active", "token_version")
+        replica_db.add(User(**{name: getattr(test_user, name) for name in columns}))
+        replica_db.commit()
+
+    monkeypatch.setattr(database, "SessionLocal", sessionmaker(bind=engine))
+    monkeypatch.setattr(database, "ReplicaSessionLocal", ReplicaSession)
+    app.dependency_overrides.pop(get_read_db)
+    recent_writers.clear()
+
+    db_session.add(Resume(user_id=test_user.id, filename="cv.pdf", content="", analysis=""))
+    db_session.commit()
+    try:
+        assert client.get("/api/resume/list", headers=auth_headers).json() == []
+        assert client.get("/api/auth/me", headers=auth_headers).json()["username"] == test_user.username
+
+        # Any write by the user pins their reads to the primary for a while
+        assert client.delete("/api/interview/clear", headers=auth_headers).status_code == 204
+        assert recent_writers.is_recent(test_user.id)
+        assert [r["filename"] for r in client.get("/api/resume/list", headers=auth_headers).json()] == ["cv.pdf"]
+    finally:
+        recent_writers.clear()
+        db_session.query(Resume).delete()
+        db_session.commit()
+        replica.dispose()
+
+
+def _sample(name: str, pool: str, **labels) -> float:
+    label_text = ",".join(f'{k}="{v}"' for k, v in sorted({"pool": pool, **labels}.items()))
+    match = re.search(rf"^{re.escape(name)}{{{re.escape(label_text)}}} (\S+)$", registry.render(), re.M)
+    assert match, f"{name} not exported for pool {pool}"
+    return float(match.group(1))
+
+
+def test_pool_telemetry_is_exported(client, tmp_path):
+    """Pool events feed the checked-out, checkout, wait and age metrics on /metrics."""
+
+    engine = build_engine(f"sqlite:///{tmp_path / 'pool.db'}", "test-pool")
+    with engine.connect() as first, engine.connect() as second:
+        first.execute(text("SELECT 1"))
+        second.execute(text("SELECT 1"))
+        assert _sample("db_pool_checked_out", "test-pool") == 2
+        assert _sample("db_pool_connections_open", "test-pool") == 2
+
+    assert _sample("db_pool_checked_out", "test-pool") == 0
+    assert _sample("db_pool_checkouts_total", "test-pool") == 2
+    assert _sample("db_pool_checkout_wait_seconds_count", "test-pool") == 2
+    assert _sample("db_pool_checkout_wait_seconds_bucket", "test-pool", le="+Inf") == 2
+    assert _sample("db_pool_size", "test-pool") == settings.SQLITE_POOL_SIZE
+
+    engine.dispose()
+    assert _sample("db_pool_connections_open", "test-pool") == 0
+    assert _sample("db_pool_connection_age_seconds_count", "test-pool") == 2
+
+    metrics = client.get("/metrics").text
+    assert "# TYPE db_pool_checkout_wait_seconds histogram" in metrics
+    assert 'db_pool_checkouts_total{pool="primary"}' in metrics
+
+
+@pytest.fixture(params=["sqlite", "postgresql"])
+def migration_url(request, tmp_path):
+    """An empty database to migrate: a SQLite file, and a scratch Postgres
+    database when DATABASE_URL_POSTGRES_TEST points at a server."""
+
+    if request.param == "sqlite":
+        yield f"sqlite:///{tmp_path / 'migrated.db'}"
+        return
+
+    server_url = os.environ.get("DATABASE_URL_POSTGRES_TEST")
+    if not server_url:
+        pytest.skip("DATABASE_URL_POSTGRES_TEST is not set")
+    name = "careerlens_migrations_test"
+    admin = create_engine(server_url, isolation_level="AUTOCOMMIT", poolclass=NullPool)
+    with admin.connect() as conn:
+        conn.execute(text(f"DROP DATABASE IF EXISTS {name} WITH (FORCE)"))
+        conn.execute(text(f"CREATE DATABASE {name}"))
+    try:
+        yield make_url(server_url).set(database=name).render_as_string(hide_password=False)
+    finally:
+        with admin.connect() as conn:
+            conn.execute(text(f"DROP DATABASE IF EXISTS {name} WITH (FORCE)"))
+        admin.dispose()
+
+
+def _alembic_config(url: str) -> Config:
+    config = Config(os.path.join(PROJECT_ROOT, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(PROJECT_ROOT, "migrations"))
+    config.set_main_option("sqlalchemy.url", url.replace("%", "%%"))
+    return config
+
+
+def test_migrations_build_the_model_schema(migration_url):
+    """Upgrading an empty database to head yields exactly the models' tables and indexes."""
+
+    config = _alembic_config(migration_url)
+    command.upgrade(config, "head")
+    # Raises AutogenerateDiffsDetected if the models and migrations disagree
+    command.check(config)
+    command.downgrade(config, "base")
+    command.upgrade(config, "head")
+    command.check(config)
+
+
+def test_migrations_upgrade_a_pre_migration_baseline_database(migration_url):
+    """A database from the original create_all, with columns added by hand, upgrades in place."""
+
+    config = _alembic_config(migration_url)
+    # The baseline revision creates the original tables; without its version
+    # row the database looks like one the app created itself
+    command.upgrade(config, "0001")
+    engine = create_engine(migration_url, poolclass=NullPool)
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("DROP TABLE alembic_version"))
+            # As earlier release notes told operators to do
+            conn.execute(text("ALTER TABLE users ADD COLUMN token_version INTEGER NOT NULL DEFAULT 0"))
+            conn.execute(text("ALTER TABLE job_matches ADD COLUMN external_id VARCHAR"))
+            conn.execute(text(
+                "INSERT INTO users (id, email, username, hashed_password, is_active, created_at, updated_at) "
+                "VALUES (1, 'old@example.com', 'old', 'x', true, '2024-01-01', '2024-01-01')"
+            ))
+            conn.execute(text(
+                "INSERT INTO job_matches (id, user_id, title, company, location, score, created_at) "
+                "VALUES (1, 1, 'Python Developer', 'Acme', 'Austin', NULL, '2024-01-01')"
+            ))
+
+        command.upgrade(config, "head")
+        command.check(config)
+
+        with Session(engine) as db:
+            assert db.get(JobMatch, 1).score == 0
+            assert [m["id"] for m in search_job_matches(db, 1, "python")] == [1]
+    finally:
+        engine.dispose()
+
+
+def test_migrations_cascade_skill_rows_with_their_user(migration_url):
+    """Skill tables created without ON DELETE CASCADE get it, keeping their rows."""
+
+    config = _alembic_config(migration_url)
+    command.upgrade(config, "0005")
+    engine = create_engine(migration_url, poolclass=NullPool)
+    try:
+        with engine.begin() as conn:
+            # As 0002 used to create it
+            conn.execute(text("DROP TABLE user_skill_counts"))
+            conn.execute(text(
+                "CREATE TABLE user_skill_counts (user_id INTEGER NOT NULL REFERENCES users (id), "
+                "skill VARCHAR NOT NULL, match_count INTEGER NOT NULL, PRIMARY KEY (user_id, skill))"
+            ))
+            conn.execute(text(
+                "INSERT INTO users (id, email, username, hashed_password, is_active, token_version, "
+                "created_at, updated_at) VALUES (1, 'skills@example.com', 'skills', 'x', true, 0, "
+                "'2024-01-01', '2024-01-01')"
+            ))
+            conn.execute(text("INSERT INTO user_skill_counts VALUES (1, 'python', 3)"))
+
+        command.upgrade(config, "head")
+        command.check(config)
+
+        for table in ("job_match_skills", "user_skill_counts"):
+            (fk,) = [fk for fk in inspect(engine).get_foreign_keys(table) if fk["referred_table"] == "users"]
+            assert fk["options"]["ondelete"] == "CASCADE"
+        with engine.begin() as conn:
+            assert conn.execute(text("SELECT match_count FROM user_skill_counts")).scalar_one() == 3
+            if engine.dialect.name == "sqlite":
+                conn.execute(text("PRAGMA foreign_keys=ON"))
+            conn.execute(text("DELETE FROM users WHERE id = 1"))
+            assert conn.execute(text("SELECT COUNT(*) FROM user_skill_counts")).scalar_one() == 0
+    finally:
+        engine.dispose()
+
+
+def test_migrations_adopt_a_database_created_by_create_all(migration_url):
+    """A database the app built with create_all (no version table) upgrades without errors."""
+
+    engine = create_engine(migration_url, poolclass=NullPool)
+    try:
+        Base.metadata.create_all(bind=engine)
+        with Session(engine) as db:
+            user = User(email="early@example.com", username="early", hashed_password="x")
+            db.add(user)
+            db.commit()
+            user_id = user.id
+            upsert_job_matches(db, user_id, [
+                {"id": "p1", "title": "Data Engineer", "company": "Acme", "description": "Spark pipelines"},
+                {"id": "p2", "title": "Analyst", "company": "Acme", "location": "Austin", "state": "TX"},
+            ])
+            # Placed at the Texas centroid, as unlisted cities used to be
+            db.query(JobMatch).filter(JobMatch.external_id == "p1").update(
+                {"latitude": 31.5, "longitude": -99.3, "geo_cell": geo_cell(31.5, -99.3)}
+            )
+            db.commit()
+
+        config = _alembic_config(migration_url)
+        command.upgrade(config, "head")
+        command.check(config)
+        assert "ix_resumes_user_id" not in {index["name"] for index in inspect(engine).get_indexes("resumes")}
+
+        with Session(engine) as db:
+            assert [m["title"] for m in search_job_matches(db, user_id, "engineer pipelines")] == ["Data Engineer"]
+            located = {m.external_id: m.latitude for m in db.query(JobMatch)}
+            assert located["p1"] is None and located["p2"] is not None
+    finally:
+        engine.dispose()
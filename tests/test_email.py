@@ -0,0 +1,177 @@
+"""Tests for the outbound mail queue, delivered to a local SMTP sink."""
+
+import threading
+from datetime import datetime
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.auth.email_utils import EmailService
+from app.models import OutboundEmail
+from app.services.mail_queue import SMTPConnection, deliver_pending, retry_delay
+from app.services.smtp_sink import SMTPSink
+
+
+@pytest.fixture
+def sink(db_session):
+    db_session.query(OutboundEmail).delete()
+    db_session.commit()
+    with SMTPSink() as sink:
+        yield sink
+    db_session.query(OutboundEmail).delete()
+    db_session.commit()
+
+
+@pytest.fixture
+def connection(sink):
+    connection = SMTPConnection(sink.host, sink.port, starttls=False)
+    yield connection
+    connection.close()
+
+
+def test_queued_emails_are_sent_over_one_connection(db_session, sink, connection):
+    """Queuing does no SMTP work; delivery sends the whole batch in a single session."""
+
+    for i in range(3):
+        assert EmailService.send_password_reset_email(db_session, f"user{i}@example.com", f"token-{i}")
+    db_session.commit()
+    assert sink.messages == []
+
+    stats = deliver_pending(db_session, connection)
+    assert stats["sent"] == 3
+    assert sink.connections == 1
+    assert [m.rcpt_tos for m in sink.messages] == [[f"user{i}@example.com"] for i in range(3)]
+    assert "token-1" in sink.messages[1].data
+    assert {m.status for m in db_session.query(OutboundEmail)} == {"sent"}
+
+    # Nothing is left to send
+    assert deliver_pending(db_session, connection)["due"] == 0
+
+
+def test_transient_failure_is_retried_with_backoff(db_session, sink, connection):
+    """A 4xx reply reschedules the message; it goes out once the backoff has passed."""
+
+    EmailService.send_password_reset_email(db_session, "retry@example.com", "token")
+    db_session.commit()
+    sink.fail_next(1)
+
+    now = datetime.utcnow()
+    assert deliver_pending(db_session, connection, now=now)["retried"] == 1
+    message = db_session.query(OutboundEmail).one()
+    assert message.status == "pending"
+    assert message.attempts == 1
+    assert message.next_attempt_at == now + retry_delay(1)
+    assert "451" in message.last_error
+
+    # Not due yet
+    assert deliver_pending(db_session, connection, now=now)["due"] == 0
+
+    stats = deliver_pending(db_session, connection, now=now + retry_delay(1))
+    assert stats["sent"] == 1
+    assert len(sink.messages) == 1
+    assert sink.connections == 1
+
+
+def test_permanent_failure_is_not_retried(db_session, sink, connection):
+    """A 5xx reply to the message marks it failed straight away."""
+
+    EmailService.send_password_reset_email(db_session, "bounce@example.com", "token")
+    db_session.commit()
+    sink.fail_next(1, "554 Message rejected")
+
+    assert deliver_pending(db_session, connection)["failed"] == 1
+    assert db_session.query(OutboundEmail).one().status == "failed"
+
+
+def test_dropped_idle_session_is_reopened_without_backoff(db_session, sink, connection):
+    """A server hanging up on the kept-open session costs a reconnect, not a retry."""
+
+    EmailService.send_password_reset_email(db_session, "first@example.com", "token")
+    db_session.commit()
+    assert deliver_pending(db_session, connection)["sent"] == 1
+
+    sink.drop_connections()
+    EmailService.send_password_reset_email(db_session, "second@example.com", "token")
+    db_session.commit()
+
+    stats = deliver_pending(db_session, connection)
+    assert (stats["sent"], stats["retried"]) == (1, 0)
+    assert sink.connections == 2
+    assert [m.rcpt_tos for m in sink.messages] == [["first@example.com"], ["second@example.com"]]
+
+
+def test_enqueue_leaves_the_commit_to_the_caller(db_session, sink):
+    """A queued message disappears with its transaction when the caller rolls back."""
+
+    EmailService.send_password_reset_email(db_session, "rollback@example.com", "token")
+    db_session.rollback()
+    assert db_session.query(OutboundEmail).count() == 0
+
+
+class _PausingConnection:
+    """Signals ``sending`` and then waits for ``release`` before each message goes out."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.sending = threading.Event()
+        self.release = threading.Event()
+
+    def send(self, *args):
+        self.sending.set()
+        self.release.wait(5)
+        self.connection.send(*args)
+
+    def close(self):
+        self.connection.close()
+
+
+class _StartingConnection:
+    """Runs ``before_first_send`` just before the first message goes out."""
+
+    def __init__(self, connection, before_first_send):
+        self.connection = connection
+        self.before_first_send = before_first_send
+
+    def send(self, *args):
+        if self.before_first_send is not None:
+            before, self.before_first_send = self.before_first_send, None
+            before()
+        self.connection.send(*args)
+
+    def close(self):
+        self.connection.close()
+
+
+def test_concurrent_workers_send_each_message_once(db_session, engine, sink, connection):
+    """A worker that picks up the queue mid-batch never claims what the first one holds."""
+
+    for i in range(3):
+        EmailService.send_password_reset_email(db_session, f"a{i}@example.com", "token")
+    db_session.commit()
+
+    other_connection = _PausingConnection(SMTPConnection(sink.host, sink.port, starttls=False))
+    other_stats = {}
+
+    def other_worker():
+        other = sessionmaker(bind=engine)()
+        try:
+            other_stats.update(deliver_pending(other, other_connection))
+        finally:
+            other.close()
+            other_connection.close()
+
+    worker = threading.Thread(target=other_worker)
+
+    def start_other_worker():
+        # Let the second worker claim its share and hold it while sending
+        worker.start()
+        other_connection.sending.wait(5)
+
+    try:
+        stats = deliver_pending(db_session, _StartingConnection(connection, start_other_worker), batch_size=2)
+    finally:
+        other_connection.release.set()
+        worker.join(5)
+
+    assert (stats["sent"], other_stats["sent"]) == (2, 1)
+    assert sorted(m.rcpt_tos[0] for m in sink.messages) == [f"a{i}@example.com" for i in range(3)]
@@ -0,0 +1,664 @@
+"""Tests for the job search service and /api/jobs routes."""
+
+import asyncio
+import gzip
+import json
+import time
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from fastapi import status
+from sqlalchemy import text
+
+from app.models import (
+    JobCorpus,
+    JobDescription,
+    JobMatch,
+    JobMatchSkill,
+    JobTermStat,
+    Resume,
+    SavedSearch,
+    User,
+    UserSkillCount,
+)
+from app.services import job_providers, job_search
+from app.services.job_corpus import load_corpus_stats
+from app.services.job_dedup import NearDuplicateFilter
+from app.services.job_descriptions import prune_orphan_descriptions
+from app.services.job_retention import compact_job_matches
+from app.services.job_scoring import score_jobs
+from app.services.job_store import upsert_job_matches
+from app.services.job_text_search import search_job_matches
+from app.services.saved_searches import infer_best_fit_titles, refresh_saved_searches
+from app.services.taxonomy import get_taxonomy_matcher
+
+
+@pytest.fixture(autouse=True)
+def clear_job_data(db_session):
+    """Run every test without matches (or resumes) left over from other tests."""
+
+    def clear():
+        db_session.query(JobMatchSkill).delete()
+        db_session.query(UserSkillCount).delete()
+        db_session.query(JobMatch).delete()
+        db_session.query(Resume).delete()
+        db_session.query(SavedSearch).delete()
+        db_session.query(JobTermStat).delete()
+        db_session.query(JobCorpus).delete()
+        # Also drops their full-text entries, which the contentless index cannot do by itself
+        prune_orphan_descriptions(db_session)
+        db_session.query(User).filter(User.username != "testuser").delete()
+        db_session.commit()
+
+    clear()
+    yield
+    db_session.rollback()
+    clear()
+
+
+def _fake_jsearch_handler(delay: float = 0.0):
+    """Build a MockTransport handler returning two jobs per page.
+
+    Every page repeats job ``shared`` so the merge step has something to dedup.
+    """
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(delay)
+        page = request.url.params["page"]
+        query = request.url.params["query"]
+        data = [
+            {
+                "job_id": "shared",
+                "job_title": "Shared role",
+                "employer_name": "Acme",
+                "job_description": "Python and SQL",
+            },
+            {
+                "job_id": f"{query}-{page}",
+                "job_title": f"{query} #{page}",
+                "employer_name": "Acme",
+                "job_city": "Newark",
+                "job_description": "Python with Docker",
+            },
+        ]
+        return httpx.Response(200, json={"data": data})
+
+    return handler
+
+
+@pytest.fixture
+def fake_jsearch(monkeypatch):
+    """Point the shared JSearch client at an in-process mock transport."""
+
+    def install(delay: float = 0.0, handler=None):
+        job_search._page_cache.clear()
+        job_providers.get_providers.cache_clear()
+        monkeypatch.setattr(job_search.settings, "JSEARCH_API_KEY", "test-key")
+        monkeypatch.setattr(
+            job_providers,
+            "_client",
+            httpx.AsyncClient(transport=httpx.MockTransport(handler or _fake_jsearch_handler(delay))),
+        )
+
+    yield install
+    monkeypatch.setattr(job_providers, "_client", None)
+    job_search._page_cache.clear()
+    job_providers.get_providers.cache_clear()
+
+
+def test_search_jobs_for_titles_fetches_pages_concurrently(fake_jsearch):
+    """Six slow pages should take about as long as one, with duplicates merged."""
+
+    fake_jsearch(delay=0.2)
+
+    started = time.perf_counter()
+    jobs = asyncio.run(
+        job_search.search_jobs_for_titles(["Data Scientist", "ML Engineer"], num_pages=6)
+    )
+    elapsed = time.perf_counter() - started
+
+    ids = [job["id"] for job in jobs]
+    assert len(ids) == len(set(ids))
+    assert "shared" in ids
+    # 2 titles x 3 pages each, plus the single shared job
+    assert len(ids) == 7
+    assert elapsed < 0.6
+
+
+def test_search_jobs_without_api_key_returns_empty(monkeypatch):
+    """Without a JSearch key the service should not make any request."""
+
+    monkeypatch.setattr(job_search.settings, "JSEARCH_API_KEY", "")
+    assert asyncio.run(job_search.search_jobs_for_titles(["Engineer"], num_pages=3)) == []
+
+
+def test_search_route_stores_matches(client, auth_headers, fake_jsearch):
+    """/api/jobs/search should store one JobMatch per unique job."""
+
+    fake_jsearch()
+
+    resp = client.get("/api/jobs/search?num_pages=2", headers=auth_headers)
+    assert resp.status_code == status.HTTP_200_OK
+    body = resp.json()
+    assert body["total_matches"] == 3
+
+    resp = client.get("/api/jobs/matches", headers=auth_headers)
+    assert resp.status_code == status.HTTP_200_OK
+    assert len(resp.json()) == 3
+
+
+def test_search_stream_emits_batches_and_summary(client, auth_headers, fake_jsearch):
+    """/api/jobs/search/stream should send NDJSON batches then a summary."""
+
+    fake_jsearch()
+
+    resp = client.get("/api/jobs/search/stream?num_pages=2", headers=auth_headers)
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+
+    events = [json.loads(line) for line in resp.text.splitlines() if line]
+    batches = [e for e in events if e["type"] == "batch"]
+    assert len(batches) == 2
+    assert events[-1] == {"type": "summary", "total_matches": 3}
+    assert all(m["id"] for batch in batches for m in batch["matches"])
+
+
+def test_repeated_search_is_idempotent(client, auth_headers, fake_jsearch, db_session):
+    """Running the same search twice should update rather than duplicate rows."""
+
+    fake_jsearch()
+
+    first = client.get("/api/jobs/search?num_pages=2", headers=auth_headers).json()
+    second = client.get("/api/jobs/search?num_pages=2", headers=auth_headers).json()
+
+    assert sorted(m["id"] for m in first["matches"]) == sorted(m["id"] for m in second["matches"])
+    assert db_session.query(JobMatch).count() == 3
+    assert db_session.query(JobMatch).filter(JobMatch.external_id == "shared").count() == 1
+
+
+def test_score_jobs_ranks_relevant_jobs_first():
+    """Jobs sharing the resume's vocabulary should outscore unrelated ones."""
+
+    profile = "Data scientist with Python, pandas, machine learning and SQL experience."
+    jobs = [
+        {"title": "Line Cook", "description": "Prepare food in a busy kitchen."},
+        {"title": "Data Scientist", "description": "Build machine learning models in Python and SQL."},
+        {"title": "Data Analyst", "description": "SQL dashboards and reporting."},
+    ]
+
+    scores = score_jobs(profile, jobs)
+
+    assert scores.shape == (3,)
+    assert scores[1] > scores[2] > scores[0]
+    assert scores[0] == 0.0
+    assert all(0.0 <= s <= 1.0 for s in scores)
+
+
+def test_job_score_does_not_depend_on_its_batch(db_session, test_user):
+    """IDF and length come from every posting seen, not from the jobs scored together."""
+
+    profile = "Data scientist with Python, pandas, machine learning and SQL experience."
+    target = {"id": "t", "title": "Data Scientist", "description": "Machine learning in Python and SQL."}
+    similar = [
+        {"id": f"s{i}", "title": "Data Scientist", "description": f"Python and SQL analytics team {i}."}
+        for i in range(3)
+    ]
+    unrelated = [{"id": "u", "title": "Line Cook", "description": "Prepare food in a busy kitchen."}]
+
+    other = User(email="other@example.com", username="other", hashed_password="x")
+    db_session.add(other)
+    db_session.commit()
+    upsert_job_matches(db_session, test_user.id, [dict(j) for j in [target, *similar, *unrelated]])
+    # The same postings held by another user are not counted again
+    upsert_job_matches(db_session, other.id, [dict(j) for j in [target, *similar]])
+    db_session.commit()
+    assert db_session.query(JobCorpus.documents).scalar() == 5
+
+    corpus = load_corpus_stats(db_session, [profile])
+    alone = score_jobs(profile, [target], corpus)[0]
+    assert alone > 0
+    assert score_jobs(profile, [*similar, target], corpus)[-1] == pytest.approx(alone)
+    assert score_jobs(profile, [target, *unrelated], corpus)[0] == pytest.approx(alone)
+
+
+def test_score_jobs_handles_empty_profile():
+    """With no resume text every job should get a zero score."""
+
+    scores = score_jobs("", [{"title": "Engineer"}, {"title": "Designer"}])
+    assert scores.tolist() == [0.0, 0.0]
+
+
+def test_matches_keyset_pagination(client, auth_headers, db_session, test_user):
+    """Pages should follow X-Next-Cursor in score order without overlap."""
+
+    for i in range(5):
+        db_session.add(
+            JobMatch(user_id=test_user.id, title=f"Job {i}", company="Acme", score=i / 10)
+        )
+    db_session.add(JobMatch(user_id=test_user.id, title="Tie", company="Acme", score=0.2))
+    db_session.commit()
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 4}
+        if cursor:
+            params["cursor"] = cursor
+        resp = client.get("/api/jobs/matches", params=params, headers=auth_headers)
+        assert resp.status_code == status.HTTP_200_OK
+        seen.extend(resp.json())
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert len(seen) == 6
+    assert len({m["id"] for m in seen}) == 6
+    scores = [m["score"] for m in seen]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_matches_invalid_cursor(client, auth_headers):
+    """A garbage cursor should be rejected with 400."""
+
+    resp = client.get("/api/jobs/matches?cursor=not-a-cursor", headers=auth_headers)
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_matches_count(client, auth_headers, db_session, test_user):
+    """/api/jobs/matches/count should return the number of stored matches."""
+
+    db_session.add_all(
+        [JobMatch(user_id=test_user.id, title="A", company="Acme"),
+         JobMatch(user_id=test_user.id, title="B", company="Acme")]
+    )
+    db_session.commit()
+
+    resp = client.get("/api/jobs/matches/count", headers=auth_headers)
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.json() == {"count": 2}
+
+
+def test_saved_match_full_text_search(client, auth_headers, fake_jsearch):
+    """Stored matches should be searchable, and deleted ones should drop out."""
+
+    fake_jsearch()
+    client.get("/api/jobs/search?num_pages=2", headers=auth_headers)
+
+    resp = client.get("/api/jobs/matches/search?q=shared", headers=auth_headers)
+    assert resp.status_code == status.HTTP_200_OK
+    hits = resp.json()
+    assert [h["title"] for h in hits] == ["Shared role"]
+
+    # Prefix matching on the city
+    assert len(client.get("/api/jobs/matches/search?q=newa", headers=auth_headers).json()) == 2
+    # Terms may be split between a match's own fields and its shared description
+    assert len(client.get("/api/jobs/matches/search?q=docker+newark", headers=auth_headers).json()) == 2
+    assert client.get("/api/jobs/matches/search?q=docker+shared", headers=auth_headers).json() == []
+
+    client.delete(f"/api/jobs/match/{hits[0]['id']}", headers=auth_headers)
+    assert client.get("/api/jobs/matches/search?q=shared", headers=auth_headers).json() == []
+
+
+def test_description_search_is_scoped_to_the_user(db_session, test_user):
+    """Descriptions sharing a term with another user's matches only ever return the caller's own."""
+
+    other = User(email="other@example.com", username="other", hashed_password="x")
+    db_session.add(other)
+    db_session.commit()
+    upsert_job_matches(db_session, test_user.id, [
+        {"id": "mine", "title": "Platform Engineer", "company": "Acme", "description": "Kubernetes operators"},
+    ])
+    upsert_job_matches(db_session, other.id, [
+        {"id": "theirs", "title": "SRE", "company": "Initech", "description": "Kubernetes on call"},
+        {"id": "shared", "title": "Ops", "company": "Acme", "description": "Kubernetes operators"},
+    ])
+    db_session.commit()
+
+    assert [m["title"] for m in search_job_matches(db_session, test_user.id, "kubernetes")] == ["Platform Engineer"]
+    assert sorted(m["title"] for m in search_job_matches(db_session, other.id, "kubernetes")) == ["Ops", "SRE"]
+    assert search_job_matches(db_session, test_user.id, "call") == []
+
+
+def test_match_filters_and_facets(client, auth_headers, db_session, test_user):
+    """Filtering and facet counts should be computed from the stored columns."""
+
+    db_session.add_all(
+        [
+            JobMatch(user_id=test_user.id, title="A", company="Acme", employment_type="full-time", is_remote=True, state="NJ"),
+            JobMatch(user_id=test_user.id, title="B", company="Acme", employment_type="full-time", is_remote=False, state="NY"),
+            JobMatch(user_id=test_user.id, title="C", company="Acme", employment_type="contract", is_remote=True, state="NJ"),
+        ]
+    )
+    db_session.commit()
+
+    resp = client.get("/api/jobs/matches?employment_type=full-time&remote=true", headers=auth_headers)
+    assert [m["title"] for m in resp.json()] == ["A"]
+
+    facets = client.get("/api/jobs/matches/facets?employment_type=full-time", headers=auth_headers).json()
+    # The employment_type facet ignores its own filter...
+    assert {f["value"]: f["count"] for f in facets["employment_type"]} == {"full-time": 2, "contract": 1}
+    # ...while the other facets are narrowed by it.
+    assert {f["value"]: f["count"] for f in facets["state"]} == {"NJ": 1, "NY": 1}
+    assert {f["value"]: f["count"] for f in facets["remote"]} == {True: 1, False: 1}
+
+
+def test_near_duplicate_filter_collapses_reposts():
+    """Reposts of the same role under new ids should be dropped, others kept."""
+
+    description = (
+        "We are hiring a backend engineer to design and build scalable APIs in Python, "
+        "own our PostgreSQL data layer and mentor junior developers on the platform team."
+    )
+    jobs = [
+        {"id": "1", "title": "Backend Engineer", "company": "Acme", "description": description},
+        {"id": "2", "title": "Backend Engineer", "company": "Acme", "description": description + " Apply now."},
+        {"id": "3", "title": "Backend Engineer", "company": "Globex", "description": "Ruby on Rails monolith work."},
+        {"id": "4", "title": "Data Analyst", "company": "Acme", "description": "Excel and SQL reporting."},
+    ]
+
+    kept = NearDuplicateFilter().filter(jobs)
+
+    assert [job["id"] for job in kept] == ["1", "3", "4"]
+
+
+def test_taxonomy_matcher_extracts_titles_and_skills():
+    """One pass should find canonical titles and skills, respecting word boundaries."""
+
+    matcher = get_taxonomy_matcher()
+    found = matcher.extract(
+        "Senior back-end developer: Python, PostgreSQL, C++ and Node.js. Some JavaScript too."
+    )
+
+    assert found.titles == {"Backend Engineer": 1}
+    assert {"Python", "PostgreSQL", "C++", "Node.js", "JavaScript"} <= set(found.skills)
+    assert "Java" not in found.skills
+    assert matcher.canonical_title("Sr. Machine Learning Engineer (NLP)") == "Machine Learning Engineer"
+
+
+def test_best_fit_titles_fall_back_to_taxonomy():
+    """Without a Best-Fit section, titles come from the taxonomy, not an if-chain."""
+
+    resume = Resume(content="Worked as a data scientist and later as a data scientist lead.", analysis="")
+    assert infer_best_fit_titles(resume) == ["Data Scientist"]
+    assert infer_best_fit_titles(None) == ["Software Engineer"]
+
+
+def test_skill_gap_report_tracks_matches_incrementally(client, auth_headers, fake_jsearch, db_session, test_user):
+    """Skill counts follow stored and deleted matches; missing skills are those off the resume."""
+
+    fake_jsearch()
+    db_session.add(Resume(user_id=test_user.id, filename="cv.txt", content="Python developer", analysis=""))
+    db_session.commit()
+
+    for _ in range(2):
+        matches = client.get("/api/jobs/search?num_pages=2", headers=auth_headers).json()["matches"]
+
+    report = client.get("/api/jobs/skills/gap", headers=auth_headers).json()
+    assert report["total_matches"] == 3
+    assert report["resume_skills"] == ["Python"]
+    counts = {entry["skill"]: entry["match_count"] for entry in report["skills"]}
+    assert counts == {"Python": 3, "Docker": 2, "SQL": 1}
+    assert report["missing"] == ["Docker", "SQL"]
+
+    shared_id = next(m["id"] for m in matches if m["title"] == "Shared role")
+    client.delete(f"/api/jobs/match/{shared_id}", headers=auth_headers)
+
+    report = client.get("/api/jobs/skills/gap", headers=auth_headers).json()
+    counts = {entry["skill"]: entry["match_count"] for entry in report["skills"]}
+    assert counts == {"Python": 2, "Docker": 2}
+
+
+def test_compaction_enforces_age_and_cap_with_archive(db_session, test_user, tmp_path):
+    """Old matches and those beyond the cap are removed in batches and archived."""
+
+    jobs = [{"id": f"job-{i}", "title": f"Role {i}", "company": "Acme", "description": "Python"} for i in range(7)]
+    upsert_job_matches(db_session, test_user.id, jobs)
+    db_session.commit()
+
+    now = datetime.utcnow()
+    for i, match in enumerate(db_session.query(JobMatch).order_by(JobMatch.external_id)):
+        # job-0 is 100 days old, the rest one day apart
+        match.created_at = now - timedelta(days=100 if i == 0 else 10 - i)
+    db_session.commit()
+
+    removed = compact_job_matches(
+        db_session, max_per_user=4, max_age_days=30, batch_size=2, archive_dir=str(tmp_path)
+    )
+
+    assert removed == {test_user.id: 3}
+    remaining = [m.external_id for m in db_session.query(JobMatch).order_by(JobMatch.external_id)]
+    assert remaining == ["job-3", "job-4", "job-5", "job-6"]
+    assert db_session.query(UserSkillCount).one().match_count == 4
+
+    (archive,) = tmp_path.glob("job_matches_user*.ndjson.gz")
+    with gzip.open(archive, "rt") as fh:
+        archived = [json.loads(line)["external_id"] for line in fh]
+    assert sorted(archived) == ["job-0", "job-1", "job-2"]
+
+
+def test_saved_search_refresh_respects_budget_and_stores_only_new(
+    client, auth_headers, fake_jsearch, db_session, test_user, monkeypatch
+):
+    """Refresh runs the stalest queries within budget and reports only new postings."""
+
+    fake_jsearch()
+    content = "### Best-Fit Roles\n1. Data Scientist\n2. Backend Developer - APIs"
+    resume = Resume(user_id=test_user.id, filename="cv.txt", content=content, analysis="")
+    db_session.add(resume)
+    db_session.commit()
+
+    # Listing is read-only; the refresh backfills searches for this resume
+    assert client.get("/api/jobs/saved-searches", headers=auth_headers).json() == []
+
+    now = datetime.utcnow()
+    stats = asyncio.run(refresh_saved_searches(db_session, request_budget=1, now=now))
+    assert stats == {"queries": 1, "requests": 1, "new_matches": 2}
+
+    searches = client.get("/api/jobs/saved-searches", headers=auth_headers).json()
+    assert [s["query"] for s in searches] == ["data scientist", "backend engineer"]
+    assert [s["last_new_count"] for s in searches] == [2, 0]
+    assert searches[1]["last_run_at"] is None
+
+    between_runs = datetime.utcnow()
+    stats = asyncio.run(
+        refresh_saved_searches(db_session, request_budget=5, now=now + timedelta(hours=25))
+    )
+    # "shared" and the data scientist posting are already stored
+    assert stats == {"queries": 2, "requests": 2, "new_matches": 1}
+
+    resp = client.get(
+        "/api/jobs/matches/new", params={"since": between_runs.isoformat()}, headers=auth_headers
+    )
+    assert resp.status_code == status.HTTP_200_OK
+    assert [m["title"] for m in resp.json()] == ["backend engineer #1"]
+
+    # Every enabled provider costs a request per page
+    monkeypatch.setattr(job_providers.settings, "JOB_PROVIDERS", ["jsearch", "fixture"])
+    job_providers.get_providers.cache_clear()
+    stats = asyncio.run(
+        refresh_saved_searches(db_session, request_budget=3, now=now + timedelta(hours=50))
+    )
+    assert (stats["queries"], stats["requests"]) == (1, 2)
+
+    # Deleting the resume re-derives the searches straight away
+    assert client.delete(f"/api/resume/delete/{resume.id}", headers=auth_headers).status_code == status.HTTP_200_OK
+    searches = client.get("/api/jobs/saved-searches", headers=auth_headers).json()
+    assert [s["query"] for s in searches] == ["software engineer"]
+
+
+def test_jobs_without_provider_id_are_stored_once(db_session, test_user):
+    """A posting with no id is deduplicated on its identifying fields."""
+
+    jobs = [{"title": "Data Engineer", "company": "Acme", "location": "Austin", "description": "Spark"}]
+    assert len(upsert_job_matches(db_session, test_user.id, jobs, only_new=True)) == 1
+    assert upsert_job_matches(db_session, test_user.id, [dict(j) for j in jobs], only_new=True) == []
+    moved = [{**jobs[0], "location": "Dallas"}]
+    assert len(upsert_job_matches(db_session, test_user.id, moved, only_new=True)) == 1
+    db_session.commit()
+    assert db_session.query(JobMatch).count() == 2
+
+
+def test_descriptions_are_compressed_shared_and_loaded_on_detail(
+    client, auth_headers, db_session, test_user
+):
+    """Identical descriptions are stored once across users and only the detail view returns them."""
+
+    other = User(email="other@example.com", username="other", hashed_password="x")
+    db_session.add(other)
+    db_session.commit()
+
+    description = "Build data pipelines in Python. " * 50
+    job = {"id": "posting-1", "title": "Data Engineer", "company": "Acme", "description": description}
+    (stored,) = upsert_job_matches(db_session, test_user.id, [job])
+    upsert_job_matches(db_session, other.id, [dict(job)])
+    db_session.commit()
+
+    (row,) = db_session.query(JobDescription).all()
+    assert row.size == len(description) and len(row.compressed) < row.size // 10
+    assert db_session.query(JobMatch).filter(JobMatch.description_id == row.id).count() == 2
+    # Indexed for search once, without keeping a copy of the text
+    assert db_session.execute(text("SELECT count(*) FROM job_descriptions_fts_docsize")).scalar() == 1
+    assert db_session.execute(text("SELECT description FROM job_descriptions_fts")).scalar() is None
+    hits = client.get("/api/jobs/matches/search?q=pipelines", headers=auth_headers).json()
+    assert [h["id"] for h in hits] == [stored["id"]]
+
+    listed = client.get("/api/jobs/matches", headers=auth_headers).json()
+    assert "description" not in listed[0]
+    detail = client.get(f"/api/jobs/match/{stored['id']}", headers=auth_headers).json()
+    assert detail["description"] == description
+
+    client.delete(f"/api/jobs/match/{stored['id']}", headers=auth_headers)
+    compact_job_matches(db_session, max_per_user=0, max_age_days=0)
+    assert db_session.query(JobDescription).count() == 1
+    db_session.query(JobMatch).delete()
+    db_session.commit()
+    compact_job_matches(db_session, max_per_user=0, max_age_days=0)
+    assert db_session.query(JobDescription).count() == 0
+    assert db_session.execute(
+        text("SELECT count(*) FROM job_descriptions_fts WHERE job_descriptions_fts MATCH 'pipelines'")
+    ).scalar() == 0
+
+
+def test_provider_circuit_breaker_fails_fast(fake_jsearch, monkeypatch):
+    """Repeated provider errors open the circuit so later calls skip the network."""
+
+    calls = []
+
+    async def failing(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(503)
+
+    fake_jsearch(handler=failing)
+    monkeypatch.setattr(job_providers.settings, "JOB_PROVIDER_FAILURE_THRESHOLD", 2)
+    (provider,) = job_providers.get_providers()
+
+    for page in range(1, 5):
+        assert asyncio.run(provider.search_page("engineer", page)) == []
+
+    assert len(calls) == 2
+    status_ = provider.status()
+    assert status_["circuit"] == "open"
+    assert (status_["failures"], status_["rejected"], status_["last_error"]) == (2, 2, "HTTP 503")
+
+
+def test_cancelled_trial_call_reopens_the_circuit(fake_jsearch, monkeypatch):
+    """A half-open trial that is cancelled re-opens the breaker instead of wedging it."""
+
+    responses = ["error", "hang", "ok"]
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        outcome = responses.pop(0)
+        if outcome == "error":
+            raise RuntimeError("unexpected")
+        if outcome == "hang":
+            await asyncio.sleep(10)
+        return httpx.Response(200, json={"data": []})
+
+    fake_jsearch(handler=handler)
+    monkeypatch.setattr(job_providers.settings, "JOB_PROVIDER_FAILURE_THRESHOLD", 1)
+    (provider,) = job_providers.get_providers()
+    provider.breaker.reset_seconds = 0.05
+
+    async def scenario():
+        # Unexpected errors count as failures rather than escaping
+        assert await provider.search_page("engineer", 1) == []
+        assert provider.breaker.state == "open"
+
+        await asyncio.sleep(0.06)
+        trial = asyncio.create_task(provider.search_page("engineer", 1))
+        await asyncio.sleep(0.01)
+        assert provider.breaker.state == "half_open"
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+        assert provider.breaker.state == "open"
+        assert await provider.search_page("engineer", 1) == []  # rejected, fresh open period
+
+        await asyncio.sleep(0.06)
+        assert await provider.search_page("engineer", 1) == []
+        assert provider.breaker.state == "closed"
+
+    asyncio.run(scenario())
+    assert provider.status()["rejected"] == 1
+
+    # A trial that never reports back is superseded after another reset period
+    breaker = job_providers.CircuitBreaker(failure_threshold=1, reset_seconds=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow() and not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.allow()
+
+
+def test_slow_provider_times_out_without_blocking_others(fake_jsearch, monkeypatch):
+    """A provider past its timeout yields nothing while the fixture provider still answers."""
+
+    fake_jsearch(delay=0.5)
+    monkeypatch.setattr(job_providers.settings, "JOB_PROVIDERS", ["jsearch", "fixture"])
+    jsearch, fixture = job_providers.get_providers()
+    jsearch.timeout_seconds = 0.05
+
+    started = time.perf_counter()
+    jobs = asyncio.run(job_search.search_jobs_for_titles(["Data Engineer"]))
+    elapsed = time.perf_counter() - started
+
+    assert [job["id"] for job in jobs] == ["fixture-6"]
+    assert elapsed < 0.4
+    assert jsearch.status()["timeouts"] == 1
+    assert fixture.status()["requests"] == 1
+
+
+def test_matches_within_radius_of_place(client, auth_headers, db_session, test_user):
+    """Locations resolve offline on insert and `near` filters by distance."""
+
+    jobs = [
+        {"id": "austin", "title": "A", "company": "Acme", "location": "Austin", "state": "TX", "country": "US"},
+        {"id": "dallas", "title": "D", "company": "Acme", "location": "Dallas", "state": "TX", "country": "US"},
+        {"id": "texas", "title": "T", "company": "Acme", "location": "US", "state": "Texas", "country": "US"},
+        {"id": "unlisted", "title": "U", "company": "Acme", "location": "Round Rock", "state": "TX", "country": "US"},
+        {"id": "newark", "title": "N", "company": "Acme", "location": "Newark"},
+        {"id": "nowhere", "title": "X", "company": "Acme", "location": "Remote"},
+    ]
+    upsert_job_matches(db_session, test_user.id, jobs)
+    db_session.commit()
+
+    newark = db_session.query(JobMatch).filter(JobMatch.external_id == "newark").one()
+    assert (round(newark.latitude, 2), round(newark.longitude, 2)) == (40.74, -74.17)
+    # A state alone is too coarse to store as the job's position
+    unlocated = db_session.query(JobMatch.external_id).filter(JobMatch.geo_cell.is_(None))
+    assert sorted(row.external_id for row in unlocated) == ["nowhere", "texas", "unlisted"]
+    assert db_session.query(JobMatch).filter(JobMatch.latitude.isnot(None)).count() == 3
+
+    def titles(**params):
+        resp = client.get("/api/jobs/matches", params=params, headers=auth_headers)
+        assert resp.status_code == status.HTTP_200_OK
+        return sorted(m["title"] for m in resp.json())
+
+    assert titles(near="Austin, TX", radius_miles=100) == ["A"]
+    assert titles(near="austin", radius_miles=200) == ["A", "D"]
+    assert titles(near="Texas", radius_miles=200) == ["A", "D"]
+    assert titles(near="New Jersey", radius_miles=50) == ["N"]
+
+    resp = client.get("/api/jobs/matches", params={"near": "Atlantis"}, headers=auth_headers)
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST
@@ -1,6 +1,14 @@
 """Tests for high-level application routes such as /dashboard and /health."""
 
-from fastapi import status
+import logging
+
+import pytest
+from fastapi import FastAPI, status
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.core.query_stats import QueryBudgetExceeded, QueryCounterMiddleware
+from app.models import Resume
 
 
 def test_health_check(client):
@@ -32,3 +40,52 @@ def test_dashboard_requires_auth(client):
     resp = client.get("/dashboard")
     assert resp.status_code == status.HTTP_200_OK
     assert "text/html" in resp.headers["content-type"].lower()
+
+
+def test_responses_report_query_count(client, auth_headers, db_session, test_user):
+    """Every response says how many SQL statements it took and their total time."""
+
+    db_session.add(Resume(user_id=test_user.id, filename="cv.pdf", content="", analysis=""))
+    db_session.commit()
+    try:
+        resp = client.get("/api/resume/list", headers=auth_headers)
+        assert resp.status_code == status.HTTP_200_OK
+        assert int(resp.headers["X-DB-Query-Count"]) >= 1
+        assert float(resp.headers["X-DB-Time-Ms"]) >= 0
+
+        assert client.get("/health").headers["X-DB-Query-Count"] == "0"
+    finally:
+        db_session.query(Resume).delete()
+        db_session.commit()
+
+
+def _chatty_app(db_session, **options):
+    app = FastAPI()
+    app.add_middleware(QueryCounterMiddleware, **options)
+
+    @app.get("/n-plus-one")
+    def n_plus_one():
+        for i in range(5):
+            db_session.execute(text("SELECT :i"), {"i": i})
+        return {"ok": True}
+
+    return app
+
+
+def test_repeated_statement_fails_in_raise_mode(db_session):
+    """A statement run in a loop trips the N+1 detector, which fails the request in raise mode."""
+
+    app = _chatty_app(db_session, budget=50, repeat_threshold=5, mode="raise")
+    with pytest.raises(QueryBudgetExceeded, match="repeated 5 times"):
+        TestClient(app).get("/n-plus-one")
+
+
+def test_query_budget_only_warns_in_warn_mode(db_session, caplog):
+    """In warn mode an over-budget request still succeeds but is logged."""
+
+    app = _chatty_app(db_session, budget=3, repeat_threshold=0, mode="warn")
+    with caplog.at_level(logging.WARNING, logger="app.core.query_stats"):
+        resp = TestClient(app).get("/n-plus-one")
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.headers["X-DB-Query-Count"] == "5"
+    assert "5 queries (budget 3)" in caplog.text